@@ -4,26 +4,52 @@ api/main.py — FastAPI application serving the Flowzo quant pipeline.
 Run locally:
     uvicorn api.main:app --reload --port 8000
 
+Multi-worker (preloaded, copy-on-write shared model + data):
+    python -m api.serve --workers 4 --port 8000
+
+Endpoints are ``async def``. Single-row scoring awaits the micro-batching
+scheduler; heavier work runs on per-workload thread pools (src/executors.py)
+so slow SHAP / analytics calls cannot queue ahead of /api/score.
+
 Endpoints
 ---------
 POST /api/score              Credit score, PD, grade
+POST /api/score/batch        Credit score, PD, grade for up to 10k borrowers
 POST /api/explain            SHAP explanation waterfall data
+POST /api/explain/batch      SHAP top-k contributors for up to 5k borrowers (one SHAP pass)
+GET  /api/explain/global     Mean |SHAP|, SHAP distributions, dependence data (precomputed)
 GET  /api/lenders            Simulated lender pool
 GET  /api/backtest           Historical default rates by grade
+GET  /api/backtest/bootstrap Default rates by grade with bootstrap confidence intervals
 POST /api/stress-test        Score delta under income shock
+POST /api/stress-test/surface  PD/score/grade over a grid of shocks + grade transitions
+POST /api/stress-test/portfolio  Full-book macro scenarios: A/B/C migration, expected default rate
 GET  /api/returns            Portfolio yield & Sharpe ratio
+GET  /api/returns/losses     Monte Carlo credit-loss distribution: EL, VaR, CVaR, per-lender quantiles
 GET  /api/eda                EDA summary stats + correlation matrix
 GET  /api/forecast-accuracy  MAPE time-series mock
 POST /api/transaction        Ingest one transaction, return updated score
 POST /api/transaction/batch  Bootstrap from historical transactions, return score
+GET  /api/metrics            Scheduler queue/batch counters, cache stats, resident memory
+
+Admin (require X-Admin-Token when QUANT_ADMIN_TOKEN is set)
+-----
+GET  /api/admin/models                     Registered versions, active version, history
+POST /api/admin/models/{version}/activate  Load + warm a version, swap it in live
+POST /api/admin/models/rollback            Swap back to the previously served version
+GET  /api/admin/calibration                Grade thresholds in force, live-traffic sketch status
+POST /api/admin/calibration                Calibrate A/B/C cut-offs (dataset or live), optionally store + apply
 """
 
+import asyncio
+import hmac
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+from functools import partial
 import statistics
-from typing import Optional
+from typing import Literal, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, field_validator
 
@@ -44,39 +70,227 @@ from src.spending_forecast import (
 from datetime import date as _Date
 
 from src.analytics import (
-    calculate_backtest_stats,
+    backtest_from_pds,
+    bootstrap_backtest_stats,
     calculate_mape_mock,
     calculate_portfolio_returns,
-    generate_eda_stats,
+    eda_accumulator,
+    score_dataset,
+    stress_surface,
     stress_test_borrower,
 )
-from src.data_prep import load_data
-from src.explainability import get_shap_explanation
-from src.model_trainer import get_model, get_pd
-from src.scorecard import get_risk_grade, pd_to_score
+from src.analytics_cache import MISSING, analytics_cache, scenario_cache
+from src.calibration import (
+    DEFAULT_A_SHARE,
+    DEFAULT_C_SHARE,
+    apply_thresholds,
+    calibrate_pds,
+    live_calibrator,
+    sync_thresholds,
+    threshold_record,
+    write_thresholds,
+)
+from src.credit_loss import _MC_WORKERS, DEFAULT_LGD, DEFAULT_RHO, simulate_credit_losses
+from src.data_prep import FEATURE_NAMES, dataset_fingerprint, load_data
+from src.explainability import (
+    DEFAULT_BACKEND,
+    build_explainer,
+    get_shap_explanation,
+    get_shap_explanations_batch,
+    load_global_explanations,
+)
+from src.executors import executor_stats, run_in, shutdown_executors
+from src.inference_scheduler import InferenceScheduler
+from src.memory_report import resident_report
+from src.model_registry import registry
+from src.portfolio_stress import DEFAULT_SCENARIOS, portfolio_stress
+from src.pd_cache import pd_cache, shap_cache
+from src.model_trainer import get_active_bundle, get_engine, get_model, get_pd_batch
+from src.scorecard import (
+    get_risk_grade,
+    get_risk_grade_array,
+    grade_thresholds,
+    pd_to_score,
+    pd_to_score_array,
+)
 from src.simulation import simulate_lender_pool
 
 # ── Application state ─────────────────────────────────────────────────────────
 _state: dict = {}
 
+# Read-only artifacts loaded once per process tree (see preload / api/serve.py)
+_preloaded: dict = {}
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Pre-warm model and shared data on startup."""
-    import time
+# Coalesces concurrent single-borrower PD requests into batched model calls
+_scheduler = InferenceScheduler()
+
+# Admin endpoints are open when unset (local dev); set it in any shared deployment
+_ADMIN_TOKEN = os.environ.get("QUANT_ADMIN_TOKEN")
+
+# How often each worker checks models/versions/ACTIVE for an activation made
+# through a sibling worker (0 disables)
+_MODEL_POLL_S = float(os.environ.get("QUANT_MODEL_POLL_S", "5"))
+
+# Largest /api/returns/losses simulation served in a request. Each path draws
+# once per lender; with the 1 000-lender pool that measured ~0.1 ms per path on
+# one core (100k paths 10.1 s, 200k 20.1 s). The default budget is ~2 s of one
+# core per MC worker, so the cap scales with QUANT_MC_WORKERS; larger runs
+# belong in scripts/simulate_losses.py.
+_LOSS_PATHS_PER_WORKER = int(os.environ.get("QUANT_LOSS_PATHS_PER_WORKER", "20000"))
+_MAX_LOSS_PATHS = int(os.environ.get("QUANT_MAX_LOSS_PATHS", str(_LOSS_PATHS_PER_WORKER * _MC_WORKERS)))
+_DEFAULT_LOSS_PATHS = min(20_000, _MAX_LOSS_PATHS)
 
-    start = time.time()
-    print("Loading dataset and model...")
-    df = load_data()
-    get_model()  # loads pre-trained or trains from CSV
 
-    _state["df"] = df
-    _state["lenders"] = simulate_lender_pool()
+def preload() -> dict:
+    """
+    Load the model, tree engine, dataset and lender pool — once.
+
+    ``api/serve.py`` calls this in the master process before forking workers,
+    so every worker inherits the same pages copy-on-write. Under plain
+    ``uvicorn`` the lifespan calls it and it loads in-process as before.
+    No inference runs here: XGBoost's OpenMP pool must not exist pre-fork.
+    """
+    if not _preloaded:
+        import time
+
+        start = time.time()
+        print("Loading dataset and model...")
+        df = load_data()
+        get_model()  # loads pre-trained or trains from CSV
+        get_engine()
+
+        _preloaded["df"] = df
+        _preloaded["data_version"] = dataset_fingerprint(df)
+        _preloaded["lenders"] = simulate_lender_pool()
+        print(f"Model ready in {time.time() - start:.1f}s")
+    return _preloaded
+
+
+def _warm_up() -> None:
+    shared = preload()
+    _state["df"] = shared["df"]
+    _state["data_version"] = shared["data_version"]
+    _state["lenders"] = shared["lenders"]
     _state["model_loaded"] = True
 
-    elapsed = time.time() - start
-    print(f"Model ready in {elapsed:.1f}s")
+
+# ── Per-model derived caches (precomputed by the registry before a swap) ─────
+# Results that grade borrowers are keyed on ``bundle.grading_version`` (model +
+# grade cut-offs) and graded with the bundle's own cut-offs, so a version warmed
+# before activation, or recalibrated, never serves grades from other thresholds.
+
+def _pds_for(bundle):
+    # PD of every dataset row — shared by the backtest and portfolio stress
+    shared = preload()
+    return analytics_cache.get_or_compute(
+        "pds", bundle.version, shared["data_version"],
+        lambda: score_dataset(shared["df"], model=bundle.model),
+    )
+
+
+def _backtest_for(bundle) -> dict:
+    shared = preload()
+    return analytics_cache.get_or_compute(
+        "backtest", bundle.grading_version, shared["data_version"],
+        lambda: backtest_from_pds(_pds_for(bundle), shared["df"]["TARGET"].values, bundle.cutoffs),
+    )
+
+
+def _returns_for(bundle) -> dict:
+    shared = preload()
+    return analytics_cache.get_or_compute(
+        "returns", bundle.grading_version, shared["data_version"],
+        lambda: calculate_portfolio_returns(shared["lenders"], _backtest_for(bundle)),
+    )
+
+
+def _eda_for(_bundle=None):
+    # Model-independent: keyed on the dataset only
+    shared = preload()
+    return analytics_cache.get_or_compute(
+        "eda", "", shared["data_version"], lambda: eda_accumulator(shared["df"]),
+    )
+
+
+def _warm_thresholds(bundle) -> dict:
+    # Recommended cut-offs from every dataset row (applied only via /api/admin/calibration)
+    return threshold_record(calibrate_pds(_pds_for(bundle), bundle.version), "dataset")
+
+
+def _explain_sample():
+    # Same 5k-row sample scripts/pretrain.py explains
+    df = preload()["df"]
+    return df.sample(n=min(5_000, len(df)), random_state=42)[FEATURE_NAMES].values
+
+
+def _warm_global_explanations(bundle) -> dict:
+    return load_global_explanations(bundle, _explain_sample)
+
+
+if DEFAULT_BACKEND == "shap":
+    # The native backend needs no explainer (and must not import shap)
+    registry.register_warmer("shap_explainer", build_explainer)
+registry.register_warmer("backtest", _backtest_for)
+registry.register_warmer("returns", _returns_for)
+registry.register_warmer("thresholds", _warm_thresholds)
+registry.register_warmer("global_explanations", _warm_global_explanations)
+
+
+async def _memoized(name: str, compute) -> dict:
+    """
+    Serve a per-(model, cut-offs, dataset) analytics result — straight from
+    analytics_cache on the event loop when cached, else computed once on the
+    analytics pool.
+    """
+    await _ready()
+    bundle = get_active_bundle()
+    value = analytics_cache.peek(name, bundle.grading_version, _state["data_version"])
+    if value is MISSING:
+        value = await run_in("analytics", compute, bundle)
+    return value
+
+
+async def _prime_analytics() -> None:
+    """Compute backtest + returns (and the EDA accumulator) in the background."""
+    try:
+        await _memoized("returns", _returns_for)
+        await run_in("analytics", _eda_for)
+    except Exception as exc:  # noqa: BLE001 — endpoints will retry on demand
+        print(f"Analytics warm-up failed: {exc}")
+
+
+async def _watch_model_pointer() -> None:
+    """Follow activations made through another worker (see model_registry)."""
+    while True:
+        await asyncio.sleep(_MODEL_POLL_S)
+        try:
+            await run_in("admin", registry.sync_with_pointer)
+            await run_in("admin", sync_thresholds)
+        except Exception as exc:  # noqa: BLE001 — keep serving the current model
+            print(f"Model pointer sync failed: {exc}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start serving immediately and warm the model + data in the background.
+
+    /health answers as soon as the port binds (``model_loaded`` flips to true
+    when warm-up finishes); model/data endpoints await ``_ready()`` first.
+    Under api/serve.py the master binds the port and answers /health itself
+    while it preloads, so warm-up here is instant.
+    """
+    _state["warmup"] = asyncio.create_task(asyncio.to_thread(_warm_up))
+    _state["analytics_warmup"] = asyncio.create_task(_prime_analytics())
+    if _MODEL_POLL_S > 0:
+        _state["model_watch"] = asyncio.create_task(_watch_model_pointer())
+    _scheduler.start()
     yield
+    for task in ("model_watch", "analytics_warmup"):
+        if task in _state:
+            _state[task].cancel()
+    _scheduler.stop()
+    shutdown_executors()
     _state.clear()
 
 
@@ -115,6 +329,24 @@ class BorrowerFeatures(BaseModel):
         ]
 
 
+class ScoreBatchRequest(BaseModel):
+    borrowers: list[BorrowerFeatures] = Field(
+        ..., min_length=1, max_length=10_000,
+        description="Borrowers to score — results are returned in the same order.",
+    )
+
+
+class ExplainBatchRequest(BaseModel):
+    borrowers: list[BorrowerFeatures] = Field(
+        ..., min_length=1, max_length=5_000,
+        description="Borrowers to explain — results are returned in the same order.",
+    )
+    top_k: int = Field(3, ge=1, le=6, description="Contributors returned per sign")
+    backend: Optional[Literal["native", "shap"]] = Field(
+        None, description="Explanation backend (default QUANT_EXPLAIN_BACKEND)",
+    )
+
+
 # ── In-memory per-user transaction state ─────────────────────────────────────
 # Aligned with compute-borrower-features Edge Function feature semantics.
 
@@ -280,10 +512,10 @@ def _compute_features(state: dict) -> BorrowerFeatures:
     )
 
 
-def _score_response(user_id: str, state: dict, batch_size: int | None = None) -> dict:
+async def _score_response(user_id: str, state: dict, batch_size: int | None = None) -> dict:
     """Compute score from current state and return standard response shape."""
     features     = _compute_features(state)
-    pd_value     = get_pd(features.to_list())
+    pd_value     = await _scheduler.predict_async(features.to_list())
     credit_score = pd_to_score(pd_value)
     grade        = get_risk_grade(credit_score)
 
@@ -304,10 +536,22 @@ def _score_response(user_id: str, state: dict, batch_size: int | None = None) ->
     return out
 
 
+async def _ready() -> None:
+    """Wait for background warm-up — returns immediately once it has finished."""
+    warmup = _state.get("warmup")
+    if warmup is not None:
+        await warmup
+
+
+def _require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if _ADMIN_TOKEN and not hmac.compare_digest(x_admin_token or "", _ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Admin-Token")
+
+
 # ── Endpoints ─────────────────────────────────────────────────────────────────
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check for Railway / load balancers."""
     return {
         "status": "ok",
@@ -316,9 +560,11 @@ def health_check():
 
 
 @app.post("/api/score")
-def score_borrower(body: BorrowerFeatures):
+async def score_borrower(body: BorrowerFeatures):
     """Return Credit Score, Probability of Default, and Risk Grade."""
-    pd_value = get_pd(body.to_list())
+    await _ready()
+    pd_value = await _scheduler.predict_async(body.to_list())
+    live_calibrator.observe(get_active_bundle().version, [pd_value])
     credit_score = pd_to_score(pd_value)
     grade = get_risk_grade(credit_score)
     return {
@@ -328,28 +574,108 @@ def score_borrower(body: BorrowerFeatures):
     }
 
 
+@app.post("/api/score/batch")
+async def score_borrowers_batch(body: ScoreBatchRequest):
+    """Score N borrowers with a single vectorised model call."""
+    await _ready()
+    pds = await run_in("scoring", get_pd_batch, [b.to_list() for b in body.borrowers])
+    live_calibrator.observe(get_active_bundle().version, pds)
+    scores = pd_to_score_array(pds)
+    grades = get_risk_grade_array(scores)
+    results = [
+        {
+            "credit_score": round(score, 2),
+            "probability_of_default": round(pd_value, 6),
+            "risk_grade": grade,
+        }
+        for pd_value, score, grade in zip(pds.tolist(), scores.tolist(), grades.tolist())
+    ]
+    return {"results": results, "count": len(results)}
+
+
 @app.post("/api/explain")
-def explain_borrower(body: BorrowerFeatures):
+async def explain_borrower(
+    body: BorrowerFeatures,
+    backend: Optional[Literal["native", "shap"]] = Query(None),
+):
     """Return top-3 positive and top-3 negative SHAP contributors."""
+    await _ready()
     try:
-        explanation = get_shap_explanation(body.to_list())
+        explanation = await run_in("explain", get_shap_explanation, body.to_list(), backend=backend)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     return explanation
 
 
+@app.post("/api/explain/batch")
+async def explain_borrowers_batch(body: ExplainBatchRequest):
+    """Return top-k positive / negative SHAP contributors for N borrowers."""
+    await _ready()
+    try:
+        results = await run_in(
+            "explain",
+            get_shap_explanations_batch,
+            [b.to_list() for b in body.borrowers],
+            top_k=body.top_k,
+            backend=body.backend,
+        )
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return {"results": results, "count": len(results)}
+
+
+@app.get("/api/explain/global")
+async def explain_global():
+    """
+    Return global feature importance (mean |SHAP|), per-feature SHAP
+    distributions and dependence data for the serving model.
+
+    Read from the artifact stored with the model (built by pretrain.py or at
+    activation) — no SHAP work happens per request.
+    """
+    await _ready()
+    return await run_in("analytics", registry.derive, "global_explanations")
+
+
 @app.get("/api/lenders")
-def get_lenders():
+async def get_lenders():
     """Return the full simulated lender pool (1 000 lenders)."""
+    await _ready()
     return {"lenders": _state["lenders"], "count": len(_state["lenders"])}
 
 
 @app.get("/api/backtest")
-def backtest():
+async def backtest():
     """Return historical default rates by Risk Grade (A / B / C)."""
-    df = _state["df"]
-    stats = calculate_backtest_stats(df)
-    return {"backtest": stats}
+    return {"backtest": await _memoized("backtest", _backtest_for)}
+
+
+@app.get("/api/backtest/bootstrap")
+async def backtest_bootstrap(
+    replicates: int = Query(2_000, ge=100, le=100_000),
+    confidence: float = Query(0.95, gt=0.0, lt=1.0),
+    method: Literal["poisson", "index"] = Query("poisson"),
+    seed: int = Query(0),
+):
+    """
+    Per-grade default rates with bootstrap CIs, resampled from the cached
+    dataset PD vector (no re-scoring). Memoized per (model, dataset, parameters).
+    """
+    def bootstrap(bundle):
+        return bootstrap_backtest_stats(
+            _pds_for(bundle), preload()["df"]["TARGET"].values,
+            n_replicates=replicates, confidence=confidence, method=method, seed=seed,
+            thresholds=bundle.cutoffs,
+        )
+
+    await _ready()
+    bundle = get_active_bundle()
+    key = (f"backtest_bootstrap:{method}:{replicates}:{confidence}:{seed}", bundle.grading_version,
+           _state["data_version"])
+    value = scenario_cache.peek(*key)
+    if value is MISSING:
+        value = await run_in("analytics", scenario_cache.get_or_compute, *key, lambda: bootstrap(bundle))
+    return {"backtest": value}
 
 
 class StressTestRequest(BaseModel):
@@ -358,31 +684,132 @@ class StressTestRequest(BaseModel):
 
 
 @app.post("/api/stress-test")
-def stress_test(body: StressTestRequest):
+async def stress_test(body: StressTestRequest):
     """Return credit-score delta after applying an income-shock multiplier."""
-    result = stress_test_borrower(body.features.to_list(), body.income_multiplier)
+    await _ready()
+    result = await run_in(
+        "scoring",
+        stress_test_borrower,
+        body.features.to_list(),
+        body.income_multiplier,
+        predict_batch=_scheduler.predict_batch,
+    )
     return result
 
 
+class StressAxis(BaseModel):
+    feature: Literal[
+        "annual_inflow",
+        "avg_monthly_balance",
+        "days_since_account_open",
+        "primary_bank_health_score",
+        "secondary_bank_health_score",
+        "failed_payment_cluster_risk",
+    ]
+    mode: Literal["multiply", "add", "set"] = Field(
+        "multiply", description="Shocked value = base × v, base + v, or v",
+    )
+    values: list[float] = Field(..., min_length=1, max_length=1_000)
+
+
+class StressSurfaceRequest(BaseModel):
+    features: BorrowerFeatures
+    axes: list[StressAxis] = Field(
+        ..., min_length=1, max_length=3,
+        description="Grid = Cartesian product of the axes (at most 10,000 points)",
+    )
+
+
+@app.post("/api/stress-test/surface")
+async def stress_test_surface(body: StressSurfaceRequest):
+    """
+    Score every combination of the requested shocks in one vectorised model
+    call — e.g. a 100-point income-multiplier curve, or income × failed-payment
+    bucket — and return the PD/score/grade surface plus grade transitions.
+    """
+    await _ready()
+    bundle = get_active_bundle()
+    try:
+        return await run_in(
+            "scoring",
+            stress_surface,
+            body.features.to_list(),
+            [axis.model_dump() for axis in body.axes],
+            partial(get_pd_batch, bundle=bundle),
+            bundle.cutoffs,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+class StressScenario(BaseModel):
+    name: str = Field("scenario", max_length=64)
+    income_multiplier: float = Field(1.0, gt=0.0, description="annual_inflow × m")
+    balance_multiplier: float = Field(1.0, gt=0.0, description="avg_monthly_balance × m")
+    region_shift: float = Field(
+        0.0, ge=-2.0, le=2.0, description="Added to failed_payment_cluster_risk (clipped to 1–3)",
+    )
+
+
+class PortfolioStressRequest(BaseModel):
+    scenarios: Optional[list[StressScenario]] = Field(
+        None, min_length=1, max_length=16, description="Default: portfolio_stress.DEFAULT_SCENARIOS",
+    )
+    borrowers: Optional[list[BorrowerFeatures]] = Field(
+        None, min_length=1, max_length=100_000, description="Book to stress (default: the full dataset)",
+    )
+
+
+def _stress_book(scenarios: list[dict], borrowers: Optional[list[list[float]]]) -> dict:
+    bundle = get_active_bundle()
+    if borrowers is None:
+        X, baseline = preload()["df"][FEATURE_NAMES].to_numpy(), _pds_for(bundle)
+    else:
+        X, baseline = borrowers, None
+    return portfolio_stress(
+        X, scenarios, model=bundle.model,
+        grade_default_rates=_backtest_for(bundle), baseline_pds=baseline, thresholds=bundle.cutoffs,
+    )
+
+
+@app.post("/api/stress-test/portfolio")
+async def stress_test_portfolio(body: PortfolioStressRequest):
+    """
+    Apply macro scenarios (income shock, balance drawdown, regional risk shift)
+    to every borrower in the dataset — or the uploaded book — and return the
+    A/B/C migration matrix and expected default rate per scenario. Scenarios
+    are scored concurrently.
+    """
+    await _ready()
+    scenarios = [s.model_dump() for s in body.scenarios] if body.scenarios else DEFAULT_SCENARIOS
+    borrowers = [b.to_list() for b in body.borrowers] if body.borrowers else None
+    try:
+        return await run_in("analytics", _stress_book, scenarios, borrowers)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
 @app.post("/api/transaction")
-def ingest_transaction(txn: Transaction):
+async def ingest_transaction(txn: Transaction):
     """
     Ingest one Open Banking transaction for a user.
     Updates in-memory financial state, recomputes all 6 ML features,
     and returns a fresh credit score instantly.
     """
+    await _ready()
     state = _get_or_create_state(txn.user_id)
     _update_state(state, txn)
-    return _score_response(txn.user_id, state)
+    return await _score_response(txn.user_id, state)
 
 
 @app.post("/api/transaction/batch")
-def ingest_transaction_batch(body: TransactionBatch):
+async def ingest_transaction_batch(body: TransactionBatch):
     """
     Bootstrap a user's state from a list of historical transactions.
     Send oldest-first for correct account-age tracking.
     All transactions must share the same user_id.
     """
+    await _ready()
     user_ids = {t.user_id for t in body.transactions}
     if len(user_ids) > 1:
         raise HTTPException(
@@ -393,34 +820,170 @@ def ingest_transaction_batch(body: TransactionBatch):
     state = _get_or_create_state(user_id)
     for txn in body.transactions:
         _update_state(state, txn)
-    return _score_response(user_id, state, batch_size=len(body.transactions))
+    return await _score_response(user_id, state, batch_size=len(body.transactions))
 
 
 @app.get("/api/returns")
-def portfolio_returns():
+async def portfolio_returns():
     """Return portfolio yield metrics and Sharpe ratio."""
-    df = _state["df"]
-    backtest_stats = calculate_backtest_stats(df)
-    returns = calculate_portfolio_returns(_state["lenders"], backtest_stats)
-    return returns
+    return await _memoized("returns", _returns_for)
+
+
+@app.get("/api/returns/losses")
+async def portfolio_losses(
+    paths: int = Query(_DEFAULT_LOSS_PATHS, ge=1_000, le=_MAX_LOSS_PATHS),
+    rho: float = Query(DEFAULT_RHO, ge=0.0, lt=1.0, description="Asset correlation"),
+    lgd: float = Query(DEFAULT_LGD, gt=0.0, le=1.0, description="Loss given default"),
+    seed: int = Query(42),
+):
+    """
+    Simulate correlated defaults (one-factor Vasicek, grade PDs from the
+    backtest) across the lender pool and return the loss distribution.
+    Memoized per (model, dataset, parameters).
+    """
+    def simulate(bundle):
+        return simulate_credit_losses(
+            preload()["lenders"], _backtest_for(bundle), n_paths=paths, rho=rho, lgd=lgd, seed=seed,
+        )
+
+    await _ready()
+    bundle = get_active_bundle()
+    key = (f"credit_losses:{paths}:{rho}:{lgd}:{seed}", bundle.grading_version, _state["data_version"])
+    value = scenario_cache.peek(*key)
+    if value is MISSING:
+        value = await run_in("analytics", scenario_cache.get_or_compute, *key, lambda: simulate(bundle))
+    return value
 
 
 @app.get("/api/eda")
-def eda():
-    """Return EDA summary statistics and correlation matrix."""
-    df = _state["df"]
-    stats = generate_eda_stats(df)
-    return stats
+async def eda():
+    """
+    Return EDA summary statistics and correlation matrix from the incremental
+    accumulator — built once per dataset, then O(1) per request.
+    """
+    await _ready()
+    acc = analytics_cache.peek("eda", "", _state["data_version"])
+    if acc is MISSING:
+        acc = await run_in("analytics", _eda_for)
+    return acc.result()
+
+
+@app.get("/api/metrics")
+async def metrics():
+    """
+    Return scheduler counters, executor queues, result-cache hit/miss stats
+    and what the process keeps resident (dataset, model, caches).
+    """
+    loaded = _state.get("model_loaded")
+    return {
+        "inference": _scheduler.metrics(),
+        "executors": executor_stats(),
+        "pd_cache": pd_cache.stats(),
+        "shap_cache": shap_cache.stats(),
+        "analytics_cache": analytics_cache.stats(),
+        "scenario_cache": scenario_cache.stats(),
+        "model": registry.status()["active"] if loaded else None,
+        "memory": resident_report(
+            _state["df"] if loaded else None,
+            get_active_bundle() if loaded else None,
+            {"pd_cache": pd_cache, "shap_cache": shap_cache, "analytics_cache": analytics_cache,
+             "scenario_cache": scenario_cache},
+        ),
+    }
+
+
+# ── Model registry admin ──────────────────────────────────────────────────────
+
+@app.get("/api/admin/models", dependencies=[Depends(_require_admin)])
+async def list_models():
+    """Return registered versions, the active bundle and the rollback history."""
+    await _ready()
+    return {"versions": registry.list_versions(), **registry.status()}
+
+
+@app.post("/api/admin/models/{version}/activate", dependencies=[Depends(_require_admin)])
+async def activate_model(version: str):
+    """
+    Load, probe and warm ``version`` (SHAP explainer, backtest stats,
+    thresholds) on the admin pool, then swap it in atomically. Traffic keeps
+    being served by the current model until the swap.
+    """
+    await _ready()
+    try:
+        return await run_in("admin", registry.activate, version)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@app.post("/api/admin/models/rollback", dependencies=[Depends(_require_admin)])
+async def rollback_model():
+    """Swap back to the previously served (still warm) model version."""
+    await _ready()
+    try:
+        return await run_in("admin", registry.rollback)
+    except LookupError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+
+def _calibrate(source: str, a_share: float, c_share: float, write: bool) -> dict:
+    bundle = get_active_bundle()
+    if source == "live":
+        if live_calibrator.model_version != bundle.version or live_calibrator.n == 0:
+            raise ValueError("No live scores observed for the serving model yet")
+        record = threshold_record(live_calibrator, "live", a_share, c_share)
+    else:
+        pds = _pds_for(bundle)
+        record = threshold_record(calibrate_pds(pds, bundle.version), "dataset", a_share, c_share)
+    if write:
+        write_thresholds(record, bundle.label)
+        apply_thresholds(bundle, record)
+    return {"version": bundle.label, "thresholds": record, "applied": write}
+
+
+@app.get("/api/admin/calibration", dependencies=[Depends(_require_admin)])
+async def calibration_status():
+    """Return the grade cut-offs in force, where they came from and the live sketch."""
+    await _ready()
+    bundle = get_active_bundle()
+    return {
+        "version": bundle.label,
+        "thresholds": grade_thresholds(),
+        "stored": bundle.thresholds,
+        "recommended": bundle.derived.get("thresholds"),
+        "live": live_calibrator.status(),
+    }
+
+
+@app.post("/api/admin/calibration", dependencies=[Depends(_require_admin)])
+async def calibrate(
+    source: Literal["dataset", "live"] = Query("dataset"),
+    a_share: float = Query(DEFAULT_A_SHARE, gt=0.0, lt=1.0),
+    c_share: float = Query(DEFAULT_C_SHARE, gt=0.0, lt=1.0),
+    write: bool = Query(False, description="Store with the serving version and apply now"),
+):
+    """
+    Compute A/B/C cut-offs for the serving model from a score sketch over
+    every dataset row (``dataset``) or every PD served since activation
+    (``live``). With ``write`` they are stored next to the model artifact and
+    take effect immediately — here, and in sibling workers on their next poll.
+    """
+    await _ready()
+    try:
+        return await run_in("admin", _calibrate, source, a_share, c_share, write)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @app.get("/api/forecast-accuracy")
-def forecast_accuracy():
+async def forecast_accuracy():
     """Return 30-day mock cash-flow time series and MAPE score."""
     return calculate_mape_mock()
 
 
 @app.post("/api/forecast/spending")
-def spending_forecast(body: SpendingForecastRequest):
+async def spending_forecast(body: SpendingForecastRequest):
     """
     Classify historical transactions as RECURRING vs IRREGULAR, fit per-weekday
     Gamma distributions to irregular spend, and return a probabilistic daily forecast.
@@ -436,6 +999,10 @@ def spending_forecast(body: SpendingForecastRequest):
     - gamma_flat  : single overall Gamma fit (moderate history)
     - fallback_flat: flat mean ± percentile factors (very sparse history)
     """
+    return await run_in("forecast", _spending_forecast_sync, body)
+
+
+def _spending_forecast_sync(body: SpendingForecastRequest) -> dict:
     txn_records = [
         TxnRecord(
             amount=t.amount,
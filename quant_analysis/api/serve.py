@@ -0,0 +1,187 @@
+"""
+api/serve.py — Pre-fork multi-worker entry point for the Flowzo quant API.
+
+Run from quant_analysis/ directory:
+    python -m api.serve --workers 4 --port 8000
+
+Worker count defaults to $WEB_CONCURRENCY (else 1) and port to $PORT (else 8000).
+
+How it works
+------------
+1. The master binds the listening socket first. While step 2 runs, a
+   single thread answers on it: ``GET /health`` returns 200 with
+   ``model_loaded: false`` (so the platform health check passes during the
+   load) and every other path returns 503 with ``Retry-After: 1``.
+2. The master calls ``api.main.preload()``: XGBoost model, compiled tree
+   engine, the analytics DataFrame and the simulated lender pool are loaded
+   exactly once. The health thread is then stopped and joined, so no thread
+   is alive at fork.
+3. ``gc.freeze()`` moves every object created so far into the permanent
+   generation, so the cyclic GC never writes to their headers and the pages
+   stay shared after fork.
+4. The master forks N workers (or serves in-process with one). Each worker
+   runs its own event loop (uvicorn.Server) on the inherited socket; the
+   kernel load-balances accepted connections across them. Connections that
+   arrive between the health thread stopping and the workers starting wait
+   in the listen backlog.
+5. The master supervises: a crashed worker is re-forked from the same
+   preloaded image; SIGTERM / SIGINT are forwarded and awaited.
+
+The large read-only buffers (DataFrame blocks, tree-engine node arrays,
+booster memory) are shared copy-on-write, so N workers cost roughly one copy
+of the artifacts plus N small interpreter heaps — see
+scripts/benchmark_workers.py for the measured PSS and throughput.
+
+Per-worker state (USER_STATE, caches, scheduler, executors) is NOT shared:
+route a given user_id's /api/transaction calls to a single worker if
+cross-request transaction state matters.
+"""
+
+import argparse
+import gc
+import os
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+
+import uvicorn
+
+# Allow running from project root as well as quant_analysis/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.main import app, preload
+
+_RESPAWN_BACKOFF_S = 1.0
+
+_LOADING_HEALTH = b'{"status":"ok","model_loaded":false}'
+_LOADING_BUSY = b'{"detail":"model loading"}'
+
+
+def _answer_loading(conn: socket.socket) -> None:
+    """One minimal HTTP/1.1 reply while the master is still preloading."""
+    try:
+        conn.settimeout(1.0)
+        request_line = conn.recv(4096).split(b"\r\n", 1)[0].split()
+        if len(request_line) >= 2 and request_line[0] == b"GET" and request_line[1].split(b"?")[0] == b"/health":
+            status, body = b"200 OK", _LOADING_HEALTH
+        else:
+            status, body = b"503 Service Unavailable", _LOADING_BUSY
+        conn.sendall(
+            b"HTTP/1.1 " + status + b"\r\nContent-Type: application/json\r\n"
+            b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+            b"Retry-After: 1\r\nConnection: close\r\n\r\n" + body
+        )
+    except OSError:
+        pass
+    finally:
+        conn.close()
+
+
+def _serve_health_until(sock: socket.socket, loaded: threading.Event) -> None:
+    """Answer connections on ``sock`` until ``loaded`` is set (checked every 50 ms)."""
+    while not loaded.is_set():
+        ready, _, _ = select.select([sock], [], [], 0.05)
+        if not ready:
+            continue
+        try:
+            conn, _ = sock.accept()
+        except (BlockingIOError, InterruptedError):
+            continue
+        _answer_loading(conn)
+
+
+def _preload_answering_health(sock: socket.socket) -> None:
+    """Run ``preload()`` while a thread keeps /health answering on ``sock``."""
+    loaded = threading.Event()
+    responder = threading.Thread(target=_serve_health_until, args=(sock, loaded), daemon=True)
+    responder.start()
+    try:
+        preload()
+    finally:
+        loaded.set()
+        responder.join()
+
+
+def _run_worker(config: uvicorn.Config, sock) -> None:
+    """Child process body — serve on the inherited socket until signalled."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def _spawn(config: uvicorn.Config, sock) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(config, sock)
+        except BaseException:  # noqa: BLE001 — child must never return into the master loop
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork multi-worker Flowzo quant API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", "1")))
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    config = uvicorn.Config(app, host=args.host, port=args.port, log_level=args.log_level)
+    sock = config.bind_socket()
+    sock.set_inheritable(True)
+
+    _preload_answering_health(sock)
+    gc.collect()
+    gc.freeze()
+
+    if args.workers <= 1:
+        uvicorn.Server(config).run(sockets=[sock])
+        return
+
+    workers: dict[int, int] = {}  # pid -> slot
+    shutting_down = False
+
+    def _shutdown(signum, _frame):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    for slot in range(args.workers):
+        workers[_spawn(config, sock)] = slot
+    print(f"Master {os.getpid()} serving on {args.host}:{args.port} "
+          f"with {args.workers} workers: {sorted(workers)}")
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = workers.pop(pid, None)
+        if slot is None or shutting_down:
+            continue
+        print(f"Worker {pid} (slot {slot}) exited with status {status}; respawning")
+        time.sleep(_RESPAWN_BACKOFF_S)
+        workers[_spawn(config, sock)] = slot
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
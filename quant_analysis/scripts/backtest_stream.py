@@ -0,0 +1,97 @@
+"""
+backtest_stream.py — Streaming (chunked) vs in-memory backtest: time, peak memory, parity.
+
+Run from quant_analysis/ directory:
+    python scripts/backtest_stream.py [--path data/application_train.csv]
+                                      [--chunksize 100000] [--workers 1 4]
+
+Each mode runs in a fresh subprocess so peak RSS is measured in isolation:
+  memory   CSV parse + calculate_backtest_stats (whole file in pandas)
+  stream   stream_backtest_stats (one chunk at a time; --workers > 1 scores
+           chunks on a process pool — children's peak RSS is reported too)
+
+``--mode`` runs a single mode in-process and prints its result as JSON.
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data_prep import DATA_PATH, DEFAULT_CHUNKSIZE
+
+ROOT = Path(__file__).parent.parent
+
+
+def _run_mode(mode: str, path: Path, chunksize: int, workers: int) -> dict:
+    from src.model_trainer import get_model
+
+    model = get_model()
+    start = time.perf_counter()
+    if mode == "memory":
+        import src.data_prep as data_prep
+        from src.analytics import calculate_backtest_stats
+
+        data_prep.DATA_PATH = path
+        stats = calculate_backtest_stats(data_prep._load_from_csv(), model=model)
+    else:
+        from src.analytics import stream_backtest_stats
+
+        stats = stream_backtest_stats(path, chunksize, model=model, workers=workers)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "workers": workers,
+        "seconds": round(elapsed, 2),
+        # ru_maxrss is kB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "children_peak_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        "backtest": stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--path", type=Path, default=DATA_PATH)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--mode", choices=["memory", "stream"], default=None)
+    args = parser.parse_args()
+
+    if not args.path.exists():
+        sys.exit(f"{args.path} not found")
+
+    if args.mode:
+        print(json.dumps(_run_mode(args.mode, args.path, args.chunksize, args.workers[0])))
+        return
+
+    runs = [("memory", 1)] + [("stream", w) for w in args.workers]
+    results = []
+    for mode, workers in runs:
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--path", str(args.path),
+             "--chunksize", str(args.chunksize), "--workers", str(workers)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'mode':<8} {'workers':>7} {'seconds':>8} {'peak RSS MB':>12} {'children MB':>12}")
+    for r in results:
+        print(f"{r['mode']:<8} {r['workers']:>7} {r['seconds']:>8.2f} "
+              f"{r['peak_rss_mb']:>12.1f} {r['children_peak_rss_mb']:>12.1f}")
+
+    reference = results[0]["backtest"]
+    print("\nParity with in-memory backtest:",
+          "identical" if all(r["backtest"] == reference for r in results) else "MISMATCH")
+    for grade, row in reference.items():
+        print(f"  {grade}: default_rate={row['default_rate']:.4f} n={row['n_borrowers']:,}")
+
+
+if __name__ == "__main__":
+    main()
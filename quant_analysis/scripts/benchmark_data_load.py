@@ -0,0 +1,94 @@
+"""
+benchmark_data_load.py — Dataset load time and memory: CSV vs joblib sample vs .npy cache.
+
+Run from quant_analysis/ directory:
+    python scripts/benchmark_data_load.py [--repeats 3]
+
+Builds models/dataset/ from the CSV first if it is missing. Each format is
+loaded in a fresh interpreter (pandas already imported, so only the load is
+timed) and reports wall time, rows and RSS growth:
+
+  csv_full      pd.read_csv of every column (the original load path)
+  csv_usecols   data_prep._load_from_csv (7 columns + imputation)
+  joblib_sample models/sample_data.joblib (5k rows, if present)
+  npy_mmap      data_prep.load_dataset_cache — pages load lazily on access
+  npy_touched   npy_mmap plus one pass over every column (all pages resident)
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data_prep import DATA_PATH, DATASET_CACHE_DIR, MODELS_DIR
+
+ROOT = Path(__file__).parent.parent
+
+_LOADERS = {
+    "csv_full": "import pandas as pd; from src.data_prep import DATA_PATH; df = pd.read_csv(DATA_PATH)",
+    "csv_usecols": "from src.data_prep import _load_from_csv; df = _load_from_csv()",
+    "joblib_sample": "import joblib; from src.data_prep import MODELS_DIR; "
+                     "df = joblib.load(MODELS_DIR / 'sample_data.joblib')",
+    "npy_mmap": "from src.data_prep import load_dataset_cache; df = load_dataset_cache()",
+    "npy_touched": "from src.data_prep import load_dataset_cache; df = load_dataset_cache(); "
+                   "[float(df[c].sum()) for c in df.columns]",
+}
+
+_HARNESS = """
+import json, time, numpy, pandas
+def rss_kb():
+    for line in open("/proc/self/status"):
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1])
+before = rss_kb()
+t0 = time.perf_counter()
+{loader}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"ms": elapsed * 1000, "rows": len(df), "rss_delta_mb": (rss_kb() - before) / 1024}}))
+"""
+
+
+def _measure(name: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _HARNESS.format(loader=_LOADERS[name])],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if not (DATASET_CACHE_DIR / "manifest.json").exists():
+        if not DATA_PATH.exists():
+            sys.exit(f"Need {DATA_PATH} to build the dataset cache")
+        from src.data_prep import _load_from_csv, compact_frame, write_dataset_cache
+
+        print(f"Building {DATASET_CACHE_DIR} from {DATA_PATH}...")
+        write_dataset_cache(compact_frame(_load_from_csv()), source=DATA_PATH)
+
+    available = {
+        "csv_full": DATA_PATH.exists(),
+        "csv_usecols": DATA_PATH.exists(),
+        "joblib_sample": (MODELS_DIR / "sample_data.joblib").exists(),
+        "npy_mmap": True,
+        "npy_touched": True,
+    }
+
+    print(f"{'format':<14} {'rows':>9} {'best ms':>10} {'RSS +MB':>9}")
+    for name, ok in available.items():
+        if not ok:
+            print(f"{name:<14} {'(missing)':>9}")
+            continue
+        runs = [_measure(name) for _ in range(args.repeats)]
+        best = min(runs, key=lambda r: r["ms"])
+        print(f"{name:<14} {best['rows']:>9,} {best['ms']:>10.1f} {best['rss_delta_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+benchmark_explain.py — Latency and parity of the native vs shap explanation backends.
+
+Run from quant_analysis/ directory:
+    python scripts/benchmark_explain.py [--repeats 20]
+
+Reports, with the SHAP cache bypassed:
+  - cold import cost of ``shap`` (fresh interpreter) — the native backend never pays it
+  - max |Δ contribution| and |Δ base value| between backends over 1,000 rows
+  - p50 / p99 latency per call for batches of 1, 10, 100 and 1,000 rows,
+    plus the 1,000-row cost of explaining one row at a time
+Does NOT need the CSV — rows are synthetic.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.explainability import EXPLAIN_BACKENDS, contribution_matrix
+from src.model_trainer import get_active_bundle
+
+ROOT = Path(__file__).parent.parent
+
+
+def _synthetic_rows(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(15_000, 120_000, n),
+        rng.uniform(500, 15_000, n),
+        rng.uniform(100, 4_000, n),
+        rng.uniform(0.1, 1.0, n),
+        rng.uniform(0.1, 1.0, n),
+        rng.choice([1.0, 2.0, 3.0], n),
+    ])
+
+
+def _import_ms(module: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c",
+         f"import time; t = time.perf_counter(); import {module}; "
+         f"print((time.perf_counter() - t) * 1000)"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip())
+
+
+def _time_ms(fn, repeats: int) -> np.ndarray:
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        timings[i] = (time.perf_counter() - t0) * 1_000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Cold `import shap`: {_import_ms('shap'):.0f} ms "
+          f"(`import xgboost`: {_import_ms('xgboost'):.0f} ms)\n")
+
+    bundle = get_active_bundle()
+    rows = _synthetic_rows(1_000)
+    native, native_base = contribution_matrix(bundle, rows, "native")
+    shap_vals, shap_base = contribution_matrix(bundle, rows, "shap")
+    print(f"Parity over {len(rows):,} rows: max |Δ contribution| = "
+          f"{np.max(np.abs(native - shap_vals)):.2e}, |Δ base value| = "
+          f"{abs(native_base - shap_base):.2e}\n")
+
+    print(f"{'rows':>6}  {'backend':<8} {'p50 ms':>9} {'p99 ms':>9} {'µs/row':>9}")
+    for n in [1, 10, 100, 1_000]:
+        batch = rows[:n]
+        for backend in EXPLAIN_BACKENDS:
+            contribution_matrix(bundle, batch, backend)  # warm-up
+            t = _time_ms(lambda: contribution_matrix(bundle, batch, backend), args.repeats)
+            p50 = np.percentile(t, 50)
+            print(f"{n:>6}  {backend:<8} {p50:>9.2f} {np.percentile(t, 99):>9.2f} "
+                  f"{p50 * 1_000 / n:>9.1f}")
+
+    print("\n1,000 rows explained one call per row:")
+    for backend in EXPLAIN_BACKENDS:
+        t0 = time.perf_counter()
+        for row in rows:
+            contribution_matrix(bundle, row.reshape(1, -1), backend)
+        print(f"  {backend:<8} {(time.perf_counter() - t0) * 1_000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+benchmark_inference.py — Model-time latency of predict_proba vs the NumPy tree engine.
+
+Run from quant_analysis/ directory:
+    python scripts/benchmark_inference.py [--iterations 5000]
+
+Reports p50 / p99 per-call latency in microseconds for single rows and small
+batches, plus the max |Δ PD| between the two paths as a parity sanity check.
+The batch size where predict_proba overtakes the engine is the value for
+QUANT_ENGINE_MAX_ROWS (get_pd_batch's cut-over, default 8).
+Does NOT need the CSV — rows are synthetic.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data_prep import FEATURE_NAMES
+from src.model_trainer import _ENGINE_MAX_ROWS, get_engine, get_model
+
+
+def _synthetic_rows(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(15_000, 120_000, n),
+        rng.uniform(500, 15_000, n),
+        rng.uniform(100, 4_000, n),
+        rng.uniform(0.1, 1.0, n),
+        rng.uniform(0.1, 1.0, n),
+        rng.choice([1.0, 2.0, 3.0], n),
+    ])
+
+
+def _time_calls(fn, inputs: list[np.ndarray]) -> np.ndarray:
+    """Return per-call latencies in microseconds."""
+    timings = np.empty(len(inputs))
+    for i, x in enumerate(inputs):
+        t0 = time.perf_counter_ns()
+        fn(x)
+        timings[i] = (time.perf_counter_ns() - t0) / 1_000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=5_000)
+    args = parser.parse_args()
+
+    model = get_model()
+    engine = get_engine()
+    if engine is None:
+        sys.exit("Tree engine could not be compiled for this booster")
+
+    print(f"Engine: {engine.n_trees} trees, {engine.n_nodes} nodes, "
+          f"max depth {engine.max_depth}, {len(FEATURE_NAMES)} features")
+
+    rows = _synthetic_rows(args.iterations)
+    parity = np.max(np.abs(model.predict_proba(rows)[:, 1] - engine.predict_proba(rows)))
+    print(f"Parity: max |Δ PD| = {parity:.2e} over {len(rows):,} rows\n")
+
+    print(f"{'batch':>6}  {'path':<14} {'p50 µs':>10} {'p99 µs':>10} {'µs/row':>10}")
+    engine_wins = []
+    for batch in [1, 4, 8, 16, 32, 64, 256]:
+        inputs = [rows[i:i + batch] for i in range(0, len(rows) - batch + 1, batch)]
+        inputs = (inputs * (200 // len(inputs) + 1))[: max(len(inputs), 200)]
+        p50s = {}
+        for name, fn in [
+            ("predict_proba", lambda x: model.predict_proba(x)),
+            ("tree_engine", lambda x: engine.predict_proba(x)),
+        ]:
+            fn(inputs[0])  # warm-up
+            t = _time_calls(fn, inputs)
+            p50s[name] = p50 = np.percentile(t, 50)
+            print(f"{batch:>6}  {name:<14} {p50:>10.1f} {np.percentile(t, 99):>10.1f} "
+                  f"{p50 / batch:>10.2f}")
+        if p50s["tree_engine"] < p50s["predict_proba"]:
+            engine_wins.append(batch)
+
+    print(f"\nEngine faster up to {max(engine_wins) if engine_wins else 0} rows "
+          f"(QUANT_ENGINE_MAX_ROWS; get_pd_batch uses {_ENGINE_MAX_ROWS})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+benchmark_scheduler.py — Micro-batching scheduler vs one model call per request.
+
+Run from quant_analysis/ directory:
+    python scripts/benchmark_scheduler.py [--requests 2000] [--clients 1 8 32 64]
+                                          [--window-ms 2] [--max-batch-rows 256]
+
+Each client thread scores distinct single-borrower rows back to back, as
+concurrent /api/score requests do. pd_cache is bypassed, so every request
+reaches the model. Two modes run at each client count:
+
+  direct      get_pd_batch per request (one-row engine call)
+  scheduler   InferenceScheduler.submit — coalesced batches; get_pd_batch
+              sends batches of up to QUANT_ENGINE_MAX_ROWS rows to the engine
+              and larger ones to predict_proba
+
+Reports throughput, p50 / p99 request latency, mean coalesced batch size and
+the share of scheduler batches that took each path. Does NOT need the CSV —
+rows are synthetic.
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.inference_scheduler import InferenceScheduler
+from src.model_trainer import _ENGINE_MAX_ROWS, get_pd_batch
+
+from benchmark_inference import _synthetic_rows
+
+
+def _run(score, rows: np.ndarray, clients: int) -> tuple[float, np.ndarray]:
+    """(wall seconds, per-request latency in µs) for ``rows`` spread over ``clients`` threads."""
+    latencies = np.empty(len(rows))
+
+    def one(i: int) -> None:
+        t0 = time.perf_counter_ns()
+        score(rows[i])
+        latencies[i] = (time.perf_counter_ns() - t0) / 1_000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(one, range(len(rows))))
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch-rows", type=int, default=256)
+    args = parser.parse_args()
+
+    rows = _synthetic_rows(args.requests, seed=1)
+    get_pd_batch(rows[:1])  # load the model outside the timings
+    print(f"{args.requests:,} requests, window {args.window_ms} ms, "
+          f"max batch {args.max_batch_rows} rows, engine up to {_ENGINE_MAX_ROWS} rows\n")
+    print(f"{'clients':>7}  {'mode':<10} {'req/s':>9} {'p50 µs':>9} {'p99 µs':>9} "
+          f"{'mean batch':>10} {'engine %':>9}")
+
+    for clients in args.clients:
+        wall, lat = _run(lambda r: get_pd_batch(r.reshape(1, -1)), rows, clients)
+        print(f"{clients:>7}  {'direct':<10} {len(rows) / wall:>9,.0f} {np.percentile(lat, 50):>9.0f} "
+              f"{np.percentile(lat, 99):>9.0f} {1:>10.1f} {100:>8.0f}%")
+
+        sizes: list[int] = []
+
+        def predict_batch(X):
+            sizes.append(len(X))
+            return get_pd_batch(X)
+
+        sched = InferenceScheduler(predict_batch, window_ms=args.window_ms, max_batch_rows=args.max_batch_rows)
+        sched.start()
+        try:
+            wall, lat = _run(lambda r: sched.submit(r).result(), rows, clients)
+        finally:
+            sched.stop()
+        engine_pct = 100 * sum(n <= _ENGINE_MAX_ROWS for n in sizes) / len(sizes)
+        print(f"{clients:>7}  {'scheduler':<10} {len(rows) / wall:>9,.0f} {np.percentile(lat, 50):>9.0f} "
+              f"{np.percentile(lat, 99):>9.0f} {np.mean(sizes):>10.1f} {engine_pct:>8.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+benchmark_startup.py — Load time of each artifact read during API cold start.
+
+Run from quant_analysis/ directory:
+    python scripts/benchmark_startup.py [--repeats 5]
+
+Each artifact is loaded in a FRESH interpreter per repeat (import cost
+excluded, measured separately) so results reflect a Railway cold start rather
+than a warm in-process reload. Missing artifacts are reported as skipped, as
+is any case whose fresh interpreter fails (e.g. "full preload()" with neither
+data/application_train.csv nor models/sample_data.joblib present), with the
+last line of its error.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# name -> (setup statement, timed statement)
+_CASES = {
+    "import xgboost+sklearn": (
+        "",
+        "import xgboost, sklearn",
+    ),
+    "model: xgboost_model.joblib": (
+        "import joblib, xgboost",
+        "joblib.load('models/xgboost_model.joblib')",
+    ),
+    "model: xgboost_model.ubj": (
+        "from xgboost import XGBClassifier",
+        "m = XGBClassifier(); m.load_model('models/xgboost_model.ubj')",
+    ),
+    "sidecar: metadata.json": (
+        "import json",
+        "json.loads(open('models/metadata.json').read())",
+    ),
+    "data: sample_data.joblib": (
+        "import joblib, pandas",
+        "joblib.load('models/sample_data.joblib')",
+    ),
+    "tree engine compile": (
+        "from src.model_trainer import get_model; from src.tree_engine import compile_booster; "
+        "b = get_model().get_booster()",
+        "compile_booster(b, 6)",
+    ),
+    "full preload()": (
+        "from api.main import preload",
+        "preload()",
+    ),
+}
+
+_REQUIRES = {
+    "model: xgboost_model.joblib": "models/xgboost_model.joblib",
+    "model: xgboost_model.ubj": "models/xgboost_model.ubj",
+    "sidecar: metadata.json": "models/metadata.json",
+    "data: sample_data.joblib": "models/sample_data.joblib",
+}
+
+_RUNNER = """
+import json, sys, time
+sys.path.insert(0, '.')
+{setup}
+t0 = time.perf_counter()
+{stmt}
+print(json.dumps(time.perf_counter() - t0))
+"""
+
+
+def _time_fresh(setup: str, stmt: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", _RUNNER.format(setup=setup, stmt=stmt)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'artifact':<30} {'size MB':>8} {'min ms':>9} {'median ms':>10}")
+    for name, (setup, stmt) in _CASES.items():
+        required = _REQUIRES.get(name)
+        if required and not (ROOT / required).exists():
+            print(f"{name:<30} {'—':>8} {'skipped (missing)':>20}")
+            continue
+        size = f"{(ROOT / required).stat().st_size / (1024 * 1024):.2f}" if required else ""
+        try:
+            times = sorted(_time_fresh(setup, stmt) * 1_000 for _ in range(args.repeats))
+        except subprocess.CalledProcessError as exc:
+            reason = (exc.stderr.strip().splitlines() or ["failed"])[-1]
+            print(f"{name:<30} {'—':>8} {'skipped':>20}  ({reason})")
+            continue
+        print(f"{name:<30} {size:>8} {times[0]:>9.1f} {times[len(times) // 2]:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
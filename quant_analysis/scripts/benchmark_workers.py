@@ -0,0 +1,152 @@
+"""
+benchmark_workers.py — Memory and throughput of the pre-fork server by worker count.
+
+Run from quant_analysis/ directory (Linux — reads /proc for PSS):
+    python scripts/benchmark_workers.py [--workers 1 2 4] [--seconds 10] [--clients 32]
+
+For each worker count, starts ``python -m api.serve`` on a free port, waits for
+/health, then:
+  - sums PSS / RSS across master + workers (PSS splits shared pages fairly,
+    so it shows what copy-on-write sharing actually saves)
+  - hammers POST /api/score from ``--clients`` keep-alive connections with
+    random borrowers (cache misses) and reports requests/s and p50/p99 latency
+
+Compare "total PSS" against "N × single-process PSS" to see the sharing win.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _children(pid: int) -> list[int]:
+    path = Path(f"/proc/{pid}/task/{pid}/children")
+    return [int(p) for p in path.read_text().split()] if path.exists() else []
+
+
+def _mem_kb(pid: int) -> tuple[int, int]:
+    """Return (PSS, RSS) in kB for one process."""
+    pss = rss = 0
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        if line.startswith("Pss:"):
+            pss = int(line.split()[1])
+        elif line.startswith("Rss:"):
+            rss = int(line.split()[1])
+    return pss, rss
+
+
+def _wait_healthy(port: int, timeout_s: float = 120.0) -> None:
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/health")
+            body = json.loads(conn.getresponse().read())
+            if body.get("model_loaded"):
+                return
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.25)
+    raise TimeoutError(f"server on :{port} never became healthy")
+
+
+def _random_body(rng: random.Random) -> bytes:
+    return json.dumps({
+        "annual_inflow": round(rng.uniform(15_000, 120_000), 2),
+        "avg_monthly_balance": round(rng.uniform(500, 15_000), 2),
+        "days_since_account_open": round(rng.uniform(100, 4_000), 1),
+        "primary_bank_health_score": round(rng.uniform(0.1, 1.0), 4),
+        "secondary_bank_health_score": round(rng.uniform(0.1, 1.0), 4),
+        "failed_payment_cluster_risk": float(rng.choice([1, 2, 3])),
+    }).encode()
+
+
+def _client(port: int, stop_at: float, seed: int, latencies: list[float]) -> None:
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    headers = {"Content-Type": "application/json"}
+    while time.time() < stop_at:
+        t0 = time.perf_counter()
+        conn.request("POST", "/api/score", body=_random_body(rng), headers=headers)
+        conn.getresponse().read()
+        latencies.append(time.perf_counter() - t0)
+
+
+def _bench(n_workers: int, seconds: float, n_clients: int) -> dict:
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "api.serve", "--workers", str(n_workers),
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    try:
+        _wait_healthy(port)
+        pids = [proc.pid] + _children(proc.pid)
+        mem = [_mem_kb(pid) for pid in pids]
+
+        latencies: list[float] = []
+        stop_at = time.time() + seconds
+        threads = [
+            threading.Thread(target=_client, args=(port, stop_at, i, latencies))
+            for i in range(n_clients)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    latencies.sort()
+    return {
+        "workers": n_workers,
+        "processes": len(pids),
+        "pss_mb": sum(p for p, _ in mem) / 1024,
+        "rss_mb": sum(r for _, r in mem) / 1024,
+        "rps": len(latencies) / seconds,
+        "p50_ms": latencies[len(latencies) // 2] * 1_000 if latencies else float("nan"),
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1_000 if latencies else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=32)
+    args = parser.parse_args()
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        sys.exit("PSS measurement needs Linux /proc/<pid>/smaps_rollup")
+
+    print(f"CPU cores: {os.cpu_count()}\n")
+    print(f"{'workers':>7} {'procs':>5} {'PSS MB':>9} {'RSS MB':>9} "
+          f"{'naive MB':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    single_pss = None
+    for n in args.workers:
+        r = _bench(n, args.seconds, args.clients)
+        if single_pss is None:
+            single_pss = r["pss_mb"]
+        print(f"{r['workers']:>7} {r['processes']:>5} {r['pss_mb']:>9.1f} {r['rss_mb']:>9.1f} "
+              f"{single_pss * n:>9.1f} {r['rps']:>9.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,58 @@
 """
-calibrate_thresholds.py — Compute data-driven score thresholds from the
-pre-trained model and sample data.
+calibrate_thresholds.py — Compute data-driven A/B/C score thresholds for a model version.
 
 Run from quant_analysis/ directory:
-    python scripts/calibrate_thresholds.py
-
-Prints the recommended A/B/C threshold values for scorecard.py.
-Does NOT modify any files.
+    python scripts/calibrate_thresholds.py [--source sample|full] [--write]
+                                           [--version NAME] [--chunksize 100000]
+                                           [--a-share 0.20] [--c-share 0.45]
+
+  sample  5k-row sample of the loaded dataset, with score/PD percentiles and
+          default rates per grade (the original quick check)
+  full    every row of data/application_train.csv, streamed through a quantile
+          sketch in --chunksize chunks — memory stays flat however large the file
+
+Without --write this only prints. With --write the thresholds are stored next
+to the version's artifact (thresholds.json) and are used by get_risk_grade the
+next time that version is loaded or activated — running API workers pick them
+up on their next model poll. Use POST /api/admin/calibration to recalibrate a
+running service directly.
 """
 
+import argparse
 import sys
+import time
 from pathlib import Path
 
 import numpy as np
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.data_prep import FEATURE_NAMES, load_data
-from src.model_trainer import get_model
-from src.scorecard import pd_to_score
-
-
-def main():
-    print("Loading model and sample data...")
-    model = get_model()
+from src.calibration import (
+    CALIBRATION_K,
+    DEFAULT_A_SHARE,
+    DEFAULT_C_SHARE,
+    ScoreCalibrator,
+    calibrate_csv,
+    threshold_record,
+    write_thresholds,
+)
+from src.data_prep import DATA_PATH, DEFAULT_CHUNKSIZE, FEATURE_NAMES, load_data
+from src.model_trainer import (
+    get_active_bundle,
+    load_version,
+    model_fingerprint,
+    read_metadata,
+    version_paths,
+)
+from src.scorecard import pd_to_score_array
+
+
+def _sample_calibrator(model, fingerprint: str, a_share: float, c_share: float) -> ScoreCalibrator:
     df = load_data()
     sample = df.sample(n=min(5_000, len(df)), random_state=1).reset_index(drop=True)
 
-    X = sample[FEATURE_NAMES].values
-    proba = model.predict_proba(X)
-    pds = proba[:, 1]
-    scores = np.array([pd_to_score(float(p)) for p in pds])
+    pds = model.predict_proba(sample[FEATURE_NAMES].values)[:, 1]
+    scores = pd_to_score_array(pds)
 
     print(f"\nPD statistics (n={len(pds):,}):")
     print(f"  mean:   {pds.mean()*100:.2f}%")
@@ -42,14 +64,11 @@ def main():
     for p in [10, 25, 40, 50, 60, 75, 80, 90, 95]:
         print(f"  p{p:2d}: {np.percentile(scores, p):.1f}")
 
-    # Thresholds: top 20% → A, next 35% → B, bottom 45% → C
-    a_thresh = float(np.percentile(scores, 80))
-    b_thresh = float(np.percentile(scores, 45))
-
-    print(f"\nRecommended thresholds (20% A / 35% B / 45% C):")
-    print(f"  A >= {a_thresh:.1f}")
-    print(f"  B >= {b_thresh:.1f}")
-    print(f"  C <  {b_thresh:.1f}")
+    # k >= sample size keeps the sketch exact (same cut-offs as recommend_thresholds)
+    calibrator = ScoreCalibrator(k=max(CALIBRATION_K, len(scores)), model_version=fingerprint)
+    calibrator.update_scores(scores)
+    thresholds = calibrator.thresholds(a_share, c_share)
+    a_thresh, b_thresh = thresholds["A"], thresholds["B"]
 
     n_a = (scores >= a_thresh).sum()
     n_b = ((scores >= b_thresh) & (scores < a_thresh)).sum()
@@ -68,10 +87,54 @@ def main():
         if mask.sum() > 0:
             dr = targets[mask].mean()
             print(f"  Grade {label}: n={mask.sum():,}, default_rate={dr*100:.1f}%")
+    return calibrator
+
 
-    print(f"\n>>> Copy these into scorecard.py get_risk_grade():")
-    print(f"    A >= {a_thresh:.0f}")
-    print(f"    B >= {b_thresh:.0f}")
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", choices=["sample", "full"], default="sample")
+    parser.add_argument("--write", action="store_true", help="Store the thresholds with the model version")
+    parser.add_argument("--version", default=None, help="Registry version (default: the active one)")
+    parser.add_argument("--path", type=Path, default=DATA_PATH)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--a-share", type=float, default=DEFAULT_A_SHARE)
+    parser.add_argument("--c-share", type=float, default=DEFAULT_C_SHARE)
+    args = parser.parse_args()
+
+    print("Loading model...")
+    if args.version is None:
+        bundle = get_active_bundle()
+        model, label, fingerprint = bundle.model, bundle.label, bundle.version
+    else:
+        model, label = load_version(args.version), args.version
+        fingerprint = model_fingerprint(model)
+
+    start = time.perf_counter()
+    if args.source == "sample":
+        calibrator = _sample_calibrator(model, fingerprint, args.a_share, args.c_share)
+    else:
+        if not args.path.exists():
+            sys.exit(f"{args.path} not found")
+        medians = read_metadata(version_paths(label)[1]).get("imputation_medians")
+        print(f"Streaming {args.path} in {args.chunksize:,}-row chunks...")
+        calibrator = calibrate_csv(args.path, args.chunksize, medians, model, fingerprint)
+        status = calibrator.status()
+        print(f"  {status['n_rows']:,} rows scored, {status['retained']:,} scores retained "
+              f"in the sketch ({time.perf_counter() - start:.1f}s)")
+
+    record = threshold_record(calibrator, args.source, args.a_share, args.c_share)
+    c_pct = round(args.c_share * 100)
+    a_pct = round(args.a_share * 100)
+    print(f"\nRecommended thresholds for {label} ({a_pct}% A / {100 - a_pct - c_pct}% B / {c_pct}% C):")
+    print(f"  A >= {record['A']:.1f}")
+    print(f"  B >= {record['B']:.1f}")
+    print(f"  C <  {record['B']:.1f}")
+
+    if args.write:
+        path = write_thresholds(record, label)
+        print(f"\nWrote {path} — serving workers apply it on their next model poll")
+    else:
+        print("\nRe-run with --write to store these for the model version")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+"""
+convert_model.py — Convert the legacy pickled model to XGBoost's native format.
+
+Run from quant_analysis/ directory:
+    python scripts/convert_model.py
+
+Reads  models/xgboost_model.joblib (pickled sklearn wrapper)
+Writes models/xgboost_model.ubj    (native UBJSON booster + sklearn attributes)
+       models/metadata.json        (existing training metadata kept; artifact fields added)
+
+Verifies that both artifacts produce identical PDs before exiting. Once the
+.ubj exists it is loaded in preference to the .joblib, which can be deleted.
+"""
+
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.model_trainer import (
+    LEGACY_MODEL_PATH,
+    MODEL_PATH,
+    load_native,
+    read_metadata,
+    save_pretrained,
+)
+
+
+def main():
+    if not LEGACY_MODEL_PATH.exists():
+        sys.exit(f"No legacy model at {LEGACY_MODEL_PATH}")
+
+    legacy = joblib.load(LEGACY_MODEL_PATH)
+    save_pretrained(legacy)
+    native = load_native(MODEL_PATH, read_metadata())
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.uniform(15_000, 120_000, 1_000),
+        rng.uniform(500, 15_000, 1_000),
+        rng.uniform(100, 4_000, 1_000),
+        rng.uniform(0.1, 1.0, 1_000),
+        rng.uniform(0.1, 1.0, 1_000),
+        rng.choice([1.0, 2.0, 3.0], 1_000),
+    ])
+    delta = np.max(np.abs(legacy.predict_proba(X) - native.predict_proba(X)))
+    if delta > 0:
+        sys.exit(f"Converted model disagrees with legacy model (max |Δ PD| = {delta:.2e})")
+
+    legacy_mb = LEGACY_MODEL_PATH.stat().st_size / (1024 * 1024)
+    native_mb = MODEL_PATH.stat().st_size / (1024 * 1024)
+    print(f"Converted {LEGACY_MODEL_PATH.name} ({legacy_mb:.2f} MB) → "
+          f"{MODEL_PATH.name} ({native_mb:.2f} MB); predictions identical")
+
+
+if __name__ == "__main__":
+    main()
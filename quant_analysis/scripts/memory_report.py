@@ -0,0 +1,107 @@
+"""
+memory_report.py — Resident memory of the analytics table: compact vs wide dtypes.
+
+Run from quant_analysis/ directory:
+    python scripts/memory_report.py [--json out.json]
+
+Writes the cleaned table to two temporary .npy caches — wide (float64/int64,
+the original layout) and compact (float32 features, int8 TARGET and
+failed_payment_cluster_risk) — then, for each, in a fresh interpreter with
+pandas, xgboost and the model already loaded:
+
+  - loads the cache, touches every column and runs the backtest and EDA
+  - reports the table's bytes, RSS growth over the model-only baseline and
+    the process's final RSS (see src/memory_report.py)
+Finally reports the largest relative difference in backtest and EDA results
+between the layouts.
+Uses the CSV when present, otherwise models/sample_data.joblib.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+ROOT = Path(__file__).parent.parent
+
+_HARNESS = """
+import json, sys
+from pathlib import Path
+import pandas, xgboost
+from src.model_trainer import get_model
+from src.memory_report import frame_memory, process_memory
+get_model()
+baseline = process_memory()["rss_mb"]
+from src.data_prep import load_dataset_cache
+from src.analytics import calculate_backtest_stats, generate_eda_stats
+df = load_dataset_cache(Path(sys.argv[1]))
+[float(df[c].sum()) for c in df.columns]
+loaded = process_memory()["rss_mb"]
+backtest = calculate_backtest_stats(df)
+eda = generate_eda_stats(df)
+print(json.dumps({
+    "frame": frame_memory(df), "baseline_rss_mb": baseline, "loaded_rss_mb": loaded,
+    "final": process_memory(), "backtest": backtest, "eda": eda,
+}))
+"""
+
+
+def _measure(cache_dir: Path) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _HARNESS, str(cache_dir)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _max_rel_diff(a, b) -> float:
+    if isinstance(a, dict):
+        return max((_max_rel_diff(a[k], b[k]) for k in a), default=0.0)
+    if not isinstance(a, (int, float)):
+        return 0.0
+    return abs(float(a) - float(b)) / max(abs(float(a)), 1e-12)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--json", type=Path, default=None)
+    args = parser.parse_args()
+
+    from src.data_prep import DATA_PATH, _load_from_csv, _load_sample, compact_frame, write_dataset_cache
+
+    wide = _load_from_csv() if DATA_PATH.exists() else _load_sample()
+    if wide is None:
+        sys.exit(f"Need {DATA_PATH} or models/sample_data.joblib")
+
+    tmp = Path(tempfile.mkdtemp())
+    write_dataset_cache(wide, cache_dir=tmp / "wide")
+    write_dataset_cache(compact_frame(wide), cache_dir=tmp / "compact")
+    del wide
+
+    results = {layout: _measure(tmp / layout) for layout in ("wide", "compact")}
+
+    print(f"{'layout':<8} {'rows':>9} {'table MB':>9} {'RSS +MB':>9} {'final RSS MB':>13}")
+    for layout, r in results.items():
+        print(f"{layout:<8} {r['frame']['rows']:>9,} {r['frame']['mb']:>9.1f} "
+              f"{r['loaded_rss_mb'] - r['baseline_rss_mb']:>9.1f} {r['final']['rss_mb']:>13.1f}")
+
+    print("\nColumn dtypes (compact):")
+    for col, info in results["compact"]["frame"]["columns"].items():
+        print(f"  {col:<30} {info['dtype']:<8} {info['mb']:>8.2f} MB")
+
+    wide_r, compact_r = results["wide"], results["compact"]
+    print(f"\nTable size: {compact_r['frame']['mb'] / wide_r['frame']['mb']:.0%} of wide")
+    print(f"max relative Δ backtest: {_max_rel_diff(wide_r['backtest'], compact_r['backtest']):.2e}")
+    print(f"max relative Δ EDA:      {_max_rel_diff(wide_r['eda'], compact_r['eda']):.2e}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
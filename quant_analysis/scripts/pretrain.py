@@ -5,9 +5,13 @@ Run from quant_analysis/ directory:
     python scripts/pretrain.py
 
 Outputs:
-    models/xgboost_model.joblib  — trained XGBoost classifier
+    models/xgboost_model.ubj     — trained XGBoost classifier (native UBJSON)
     models/sample_data.joblib    — 5,000-row sample for analytics endpoints
-    models/metadata.json         — training metadata
+    models/metadata.json         — training metadata + artifact sidecar
+    models/global_explanations.json — mean |SHAP|, SHAP distributions and
+                                   dependence data over the sample
+    models/dataset/              — memory-mapped prepared table (written by
+                                   load_data() whenever it parses the CSV)
 """
 
 import json
@@ -20,7 +24,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import joblib
 from src.data_prep import FEATURE_NAMES, load_data
-from src.model_trainer import get_model
+from src.explainability import GLOBAL_EXPLANATIONS_FILE, compute_global_explanations
+from src.model_trainer import get_active_bundle, get_model, save_pretrained
 
 MODELS_DIR = Path(__file__).parent.parent / "models"
 
@@ -28,25 +33,19 @@ MODELS_DIR = Path(__file__).parent.parent / "models"
 def main():
     MODELS_DIR.mkdir(exist_ok=True)
 
-    print("Step 1/3: Loading and preparing data...")
+    print("Step 1/4: Loading and preparing data...")
     start = time.time()
     df = load_data()
     data_time = time.time() - start
     print(f"  Loaded {len(df)} rows in {data_time:.1f}s")
 
-    print("Step 2/3: Training XGBoost model...")
+    print("Step 2/4: Training XGBoost model...")
     start = time.time()
     model = get_model()
     train_time = time.time() - start
     print(f"  Model trained in {train_time:.1f}s")
 
-    print("Step 3/3: Saving artifacts...")
-
-    # Save model
-    model_path = MODELS_DIR / "xgboost_model.joblib"
-    joblib.dump(model, model_path, compress=3)
-    model_size = model_path.stat().st_size / (1024 * 1024)
-    print(f"  Model saved: {model_path} ({model_size:.1f} MB)")
+    print("Step 3/4: Saving artifacts...")
 
     # Save sample data for analytics endpoints
     sample = df.sample(n=min(5_000, len(df)), random_state=42).reset_index(drop=True)
@@ -55,20 +54,33 @@ def main():
     sample_size = sample_path.stat().st_size / (1024 * 1024)
     print(f"  Sample data saved: {sample_path} ({sample_size:.1f} MB)")
 
-    # Save metadata
+    # Save model (native UBJSON) with its metadata sidecar
     metadata = {
         "feature_names": FEATURE_NAMES,
         "training_rows": len(df),
         "sample_rows": len(sample),
         "model_type": "XGBClassifier",
-        "n_estimators": 200,
-        "max_depth": 4,
+        "n_estimators": model.get_booster().num_boosted_rounds(),  # after early stopping
+        "max_depth": int(json.loads(model.get_booster().save_config())
+                         ["learner"]["gradient_booster"]["tree_train_param"]["max_depth"]),
         "random_state": 42,
+        # Training-time imputation values — reused by streaming backtests
+        "imputation_medians": {col: float(df[col].median()) for col in FEATURE_NAMES},
         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
     }
-    metadata_path = MODELS_DIR / "metadata.json"
-    metadata_path.write_text(json.dumps(metadata, indent=2))
-    print(f"  Metadata saved: {metadata_path}")
+    model_path = save_pretrained(model, metadata)
+    model_size = model_path.stat().st_size / (1024 * 1024)
+    print(f"  Model saved: {model_path} ({model_size:.1f} MB)")
+    print(f"  Metadata saved: {MODELS_DIR / 'metadata.json'}")
+
+    print("Step 4/4: Computing global explanations over the sample...")
+    start = time.time()
+    global_explanations = compute_global_explanations(get_active_bundle(), sample[FEATURE_NAMES].values)
+    global_path = MODELS_DIR / GLOBAL_EXPLANATIONS_FILE
+    global_path.write_text(json.dumps(global_explanations))
+    top = global_explanations["importance"][0]
+    print(f"  Saved {global_path} in {time.time() - start:.1f}s "
+          f"(top feature: {top['feature']}, mean |SHAP| {top['mean_abs_shap']:.4f})")
 
     print(f"\nDone! Total artifacts: {model_size + sample_size:.1f} MB")
     print(f"Startup will now load in ~1s instead of ~{data_time + train_time:.0f}s")
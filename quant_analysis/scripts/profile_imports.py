@@ -0,0 +1,120 @@
+"""
+profile_imports.py — Import-time profile and time-to-first-healthy-response.
+
+Run from quant_analysis/ directory:
+    python scripts/profile_imports.py [--top 15] [--json out.json]
+
+1. Runs ``python -X importtime -c "import api.main"`` and reports total import
+   time plus the slowest top-level packages (cumulative µs).
+2. Lists which heavy modules (pandas, xgboost, sklearn, shap, scipy, joblib)
+   were pulled in by the import — the goal is none of them.
+3. Measures wall time from process spawn to the first 200 from /health for
+   plain uvicorn and for the Docker entry point (``python -m api.serve``),
+   which answers /health from the master while it preloads.
+
+``--json`` writes the numbers so successive runs can be diffed.
+"""
+
+import argparse
+import http.client
+import json
+import re
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+HEAVY_MODULES = ["pandas", "xgboost", "sklearn", "shap", "scipy", "joblib"]
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_import() -> tuple[int, list[tuple[str, int]], list[str]]:
+    """Return (total µs, [(top-level package, cumulative µs)], heavy modules loaded)."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         "import sys, api.main; print(' '.join(sorted(sys.modules)))"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    top_level: dict[str, int] = {}
+    for line in out.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        cumulative, indent, name = int(m.group(2)), len(m.group(3)), m.group(4)
+        if indent == 1:  # direct child of the root import
+            root = name.split(".")[0]
+            top_level[root] = top_level.get(root, 0) + cumulative
+
+    loaded = set(out.stdout.split())
+    heavy = [m for m in HEAVY_MODULES if m in loaded]
+    ranked = sorted(top_level.items(), key=lambda kv: kv[1], reverse=True)
+    return sum(top_level.values()), ranked, heavy
+
+
+ENTRY_POINTS = {
+    "uvicorn": ["-m", "uvicorn", "api.main:app"],
+    "api.serve": ["-m", "api.serve", "--workers", "1"],
+}
+
+
+def time_to_healthy(entry: str = "uvicorn", timeout_s: float = 60.0) -> float:
+    """Seconds from spawning ``entry`` (a key of ENTRY_POINTS) to the first 200 on /health."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, *ENTRY_POINTS[entry],
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    try:
+        while time.perf_counter() - start < timeout_s:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                conn.request("GET", "/health")
+                if conn.getresponse().status == 200:
+                    return time.perf_counter() - start
+            except OSError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError(f"/health never answered ({entry})")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", type=Path, default=None)
+    args = parser.parse_args()
+
+    total_us, ranked, heavy = profile_import()
+    print(f"interpreter start + import api.main: {total_us / 1_000:.1f} ms\n")
+    print(f"{'package':<28} {'cumulative ms':>14}")
+    for name, us in ranked[: args.top]:
+        print(f"{name:<28} {us / 1_000:>14.1f}")
+    print(f"\nHeavy modules loaded at import: {', '.join(heavy) if heavy else 'none'}")
+
+    healthy_s = {entry: time_to_healthy(entry) for entry in ENTRY_POINTS}
+    for entry, seconds in healthy_s.items():
+        print(f"Time to first healthy /health ({entry}): {seconds * 1_000:.0f} ms")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "import_ms": round(total_us / 1_000, 1),
+            "top_packages_ms": {n: round(us / 1_000, 1) for n, us in ranked[: args.top]},
+            "heavy_modules_loaded": heavy,
+            "time_to_healthy_ms": {entry: round(sec * 1_000) for entry, sec in healthy_s.items()},
+        }, indent=2))
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
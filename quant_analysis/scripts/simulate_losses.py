@@ -0,0 +1,64 @@
+"""
+simulate_losses.py — Offline Monte Carlo credit losses: large path counts and timing.
+
+Run from quant_analysis/ directory:
+    python scripts/simulate_losses.py [--paths 100000 1000000] [--rho 0.12] [--lgd 0.65]
+                                      [--seed 42] [--workers 4] [--pool thread|process]
+                                      [--out losses.json]
+
+GET /api/returns/losses serves at most QUANT_MAX_LOSS_PATHS paths (default
+20 000 per QUANT_MC_WORKERS worker) so one request cannot hold the analytics
+worker for long. This runs
+the same simulate_credit_losses over the serving model's backtest PDs and the
+simulated lender pool, for any number of paths. For each --paths value it
+prints wall time, draws per second, EL and VaR / CVaR, which is also how to
+benchmark a cap for the endpoint on the serving hardware. --out writes the
+full result of the largest run as JSON.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analytics import calculate_backtest_stats
+from src.credit_loss import _MC_WORKERS, DEFAULT_LGD, DEFAULT_RHO, simulate_credit_losses
+from src.data_prep import load_data
+from src.simulation import simulate_lender_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paths", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--rho", type=float, default=DEFAULT_RHO)
+    parser.add_argument("--lgd", type=float, default=DEFAULT_LGD)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=_MC_WORKERS)
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    print("Scoring the dataset for grade PDs...")
+    backtest = calculate_backtest_stats(load_data())
+    lenders = simulate_lender_pool()
+
+    print(f"\n{'paths':>10} {'wall s':>8} {'Mdraws/s':>9} {'EL £':>12} {'VaR99 £':>12} {'CVaR99 £':>12}")
+    result = None
+    for n_paths in sorted(args.paths):
+        result = simulate_credit_losses(
+            lenders, backtest, n_paths=n_paths, rho=args.rho, lgd=args.lgd, seed=args.seed,
+            workers=args.workers, pool=args.pool,
+        )
+        rate = n_paths * len(lenders) / result["elapsed_s"] / 1e6 if result["elapsed_s"] else float("inf")
+        print(f"{n_paths:>10,} {result['elapsed_s']:>8.2f} {rate:>9.1f} {result['expected_loss_gbp']:>12,.2f} "
+              f"{result['var_gbp']['99']:>12,.2f} {result['cvar_gbp']['99']:>12,.2f}")
+
+    if args.out and result is not None:
+        args.out.write_text(json.dumps(result, indent=2))
+        print(f"\nWrote {args.out} ({result['n_paths']:,} paths)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,29 @@
 test_all.py — Comprehensive test suite for the Flowzo quant pipeline.
 
 Covers:
-  Section 1: scorecard.py        (S01–S12)  — pd_to_score, get_risk_grade
+  Section 1: scorecard.py        (S01–S15)  — pd_to_score, get_risk_grade (+ array forms)
   Section 2: simulation.py       (SIM01–SIM08) — lender pool properties
   Section 3: analytics.py        (AN01–AN11) — MAPE, Sharpe, stress-test, EDA
-  Section 4: model pipeline      (M01–M08)  — get_pd, consistency, direction
+  Section 4: model pipeline      (M01–M18)  — get_pd, get_pd_batch, tree engine, UBJSON artifact
   Section 5: API state management(ST01–ST08) — _update_state, _compute_features
+  Section 6: inference scheduler (SC01–SC06) — micro-batching, fan-out, metrics
+  Section 7: result cache        (C01–C07)  — quantized keys, LRU/TTL, invalidation
+  Section 8: workload executors  (EX01–EX04) — bounded pools, async scoring
+  Section 9: import-time budget  (IM01)     — heavy modules deferred to first use
+  Section 10: model registry     (MR01–MR08) — versions, warm-up, atomic swap, rollback
+  Section 11: explanations       (XP01–XP08) — batched SHAP, top-k, backends, global artifacts
+  Section 12: analytics cache    (AC01–AC06) — (model, dataset) memo, single-flight, fingerprints
+  Section 13: streaming backtest (SB01–SB04) — chunked reader, exact medians, counter parity
+  Section 14: dataset cache      (DC01–DC08) — .npy round trip, mmap without copies, staleness,
+                                              compact dtypes, memory report
+  Section 15: streaming EDA      (SK01–SK07) — KLL quantiles, co-moments, mergeable accumulator
+  Section 16: stress surface     (SS01–SS06) — grid shocks in one model call, grade transitions
+  Section 17: portfolio stress   (PS01–PS06) — full-book scenarios, migration matrix, parallel runs
+  Section 18: credit-loss MC     (CL01–CL06) — Vasicek paths, EL/VaR/CVaR, lender quantiles, seeding
+  Section 19: bootstrap CIs      (BS01–BS05) — Poisson / index bootstrap over a cached PD vector
+  Section 20: threshold calibration (TC01–TC07) — sketch cut-offs, runtime thresholds, storage
+  Section 21: training search     (TR01–TR05) — hist + early stopping, parallel grid, latency
+  Section 22: out-of-core training (OC01–OC05) — DataIter over CSV / cache chunks, external memory
 
 Run:
     python scripts/test_all.py
@@ -15,6 +33,7 @@ Run:
 import sys
 import os
 import warnings
+from pathlib import Path
 from datetime import datetime, timezone, timedelta
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
@@ -114,6 +133,23 @@ check("S11 score=850 → grade A", get_risk_grade(850) == "A",
 check("S12 score=300 → grade C", get_risk_grade(300) == "C",
       f"got {get_risk_grade(300)}")
 
+# S13–S15: vectorised scorecard matches the scalar functions
+from src.scorecard import pd_to_score_array, get_risk_grade_array
+
+pd_grid = np.concatenate([np.linspace(0.0, 1.0, 2_001), [1e-9, 1 - 1e-9, np.nan, np.inf, -np.inf]])
+score_arr = pd_to_score_array(pd_grid)
+check("S13 pd_to_score_array matches pd_to_score",
+      np.allclose(score_arr, [pd_to_score(float(p)) for p in pd_grid], atol=1e-9),
+      f"max |Δ|={np.max(np.abs(score_arr - [pd_to_score(float(p)) for p in pd_grid])):.2e}")
+
+edge_scores = [300, 494, 494.999, 495, 520, 520.999, 521, 850, float("nan")]
+check("S14 get_risk_grade_array matches get_risk_grade at boundaries",
+      get_risk_grade_array(edge_scores).tolist() == [get_risk_grade(x) for x in edge_scores],
+      f"got {get_risk_grade_array(edge_scores).tolist()}")
+check("S15 get_risk_grade_array matches get_risk_grade over score grid (NaN PD → 300 / C)",
+      get_risk_grade_array(score_arr).tolist() == [get_risk_grade(float(x)) for x in score_arr]
+      and score_arr[-3] == 300.0 and get_risk_grade_array(pd_to_score_array([np.nan])).tolist() == ["C"])
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Section 2: simulation.py
@@ -253,6 +289,7 @@ check("AN17 EDA summary values have mean/median/std",
 # ──────────────────────────────────────────────────────────────────────────────
 print("\n── Section 4: model pipeline ─────────────────────────────────────────────")
 
+from src.data_prep import FEATURE_NAMES
 from src.model_trainer import get_pd
 
 # Representative borrower feature vectors
@@ -315,6 +352,83 @@ check("M08 higher annual income → lower PD",
       pd_low_inc > pd_high_inc,
       f"low_income_PD={pd_low_inc:.4f}, high_income_PD={pd_high_inc:.4f}")
 
+# M09–M11: batch scoring matches single-row scoring
+from src.model_trainer import get_pd_batch
+
+batch_rows = [LOW_RISK, HIGH_RISK, MID_RISK, feat_low_income, feat_high_income]
+pd_batch = get_pd_batch(batch_rows)
+check("M09 get_pd_batch returns one PD per row",
+      pd_batch.shape == (len(batch_rows),),
+      f"shape={pd_batch.shape}")
+check("M10 get_pd_batch matches get_pd row-by-row",
+      all(abs(pd_batch[i] - get_pd(r)) < 1e-9 for i, r in enumerate(batch_rows)),
+      f"batch={pd_batch.round(6).tolist()}")
+check("M11 get_pd_batch on empty input → empty array",
+      get_pd_batch([]).shape == (0,))
+
+# M12–M15: NumPy tree engine parity against predict_proba
+from src.model_trainer import get_engine, get_model
+
+engine = get_engine()
+check("M12 tree engine compiles from the loaded booster",
+      engine is not None and engine.n_trees > 0,
+      f"engine={engine}")
+
+X_parity = make_synthetic_df(500, seed=7)[FEATURE_NAMES].values
+X_parity = np.vstack([X_parity, np.array(batch_rows)])
+ref = get_model().predict_proba(X_parity)[:, 1]
+got = engine.predict_proba(X_parity)
+check("M13 engine batch PDs match predict_proba (|Δ| < 1e-5)",
+      np.max(np.abs(ref - got)) < 1e-5,
+      f"max |Δ|={np.max(np.abs(ref - got)):.2e}")
+
+row_deltas = [abs(engine.predict_proba(x)[0] - r) for x, r in zip(X_parity[:50], ref[:50])]
+check("M14 engine single-row PDs match predict_proba (|Δ| < 1e-5)",
+      max(row_deltas) < 1e-5,
+      f"max |Δ|={max(row_deltas):.2e}")
+
+X_nan = X_parity[:20].copy()
+X_nan[::2, 1] = np.nan
+X_nan[1::2, 3] = np.nan
+ref_nan = get_model().predict_proba(X_nan)[:, 1]
+got_nan = engine.predict_proba(X_nan)
+check("M15 engine follows default direction for missing values",
+      np.max(np.abs(ref_nan - got_nan)) < 1e-5,
+      f"max |Δ|={np.max(np.abs(ref_nan - got_nan)):.2e}")
+
+# M16–M17: native UBJSON round-trip preserves predictions and writes the sidecar
+import json as _json
+import tempfile
+from src.model_trainer import load_native, read_metadata, save_pretrained
+
+with tempfile.TemporaryDirectory() as tmp:
+    ubj_path = Path(tmp) / "model.ubj"
+    meta_path = Path(tmp) / "metadata.json"
+    save_pretrained(get_model(), {"note": "test"}, model_path=ubj_path, metadata_path=meta_path)
+    sidecar = read_metadata(meta_path)
+    reloaded = load_native(ubj_path, sidecar)
+    check("M16 UBJSON round-trip gives identical PDs",
+          np.array_equal(reloaded.predict_proba(X_parity), get_model().predict_proba(X_parity)))
+    check("M17 sidecar records format, hash and feature names",
+          sidecar.get("artifact_format") == "ubj"
+          and len(sidecar.get("artifact_sha256", "")) == 64
+          and sidecar.get("feature_names") == FEATURE_NAMES
+          and sidecar.get("note") == "test",
+          f"sidecar={_json.dumps(sidecar)[:200]}")
+
+# M18: tree depth comes from a walk from the root, not from node-id order
+from src.tree_engine import _tree_depth
+
+# root 0 → (3, 1); node 3 → (2, 4): node 2's parent has the higher id
+_m_left, _m_right = np.array([3, -1, -1, 2, -1]), np.array([1, -1, -1, 4, -1])
+try:
+    _tree_depth(np.array([1, 2, -1]), np.array([2, -1, -1]))  # node 2 reached twice
+    _m_raised = False
+except ValueError:
+    _m_raised = True
+check("M18 tree depth independent of node numbering; malformed trees raise",
+      _tree_depth(_m_left, _m_right) == 2 and _tree_depth(np.array([-1]), np.array([-1])) == 0 and _m_raised)
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Section 5: API state management (_update_state, _compute_features)
@@ -400,6 +514,1162 @@ check("ST08 primary_bank_health_score in [0, 1]",
       f"got {feats.primary_bank_health_score}")
 
 
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 6: inference scheduler (micro-batching)
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 6: inference scheduler ────────────────────────────────────────")
+
+from concurrent.futures import ThreadPoolExecutor
+from src.inference_scheduler import InferenceScheduler
+
+sched_rows = make_synthetic_df(64, seed=3)[FEATURE_NAMES].values.tolist()
+expected = [get_pd(r) for r in sched_rows]
+
+# SC01: without a running worker, predict() scores inline
+idle = InferenceScheduler(window_ms=2, max_batch_rows=256)
+check("SC01 idle scheduler scores inline",
+      abs(idle.predict(sched_rows[0]) - expected[0]) < 1e-9)
+
+from src.pd_cache import pd_cache
+pd_cache.clear()  # force every request below through the queue
+
+sched = InferenceScheduler(window_ms=20, max_batch_rows=256)
+sched.start()
+with ThreadPoolExecutor(max_workers=32) as pool:
+    got = list(pool.map(sched.predict, sched_rows))
+m = sched.metrics()
+
+# SC02: results fan back to the right requests
+check("SC02 coalesced PDs match get_pd per request",
+      all(abs(g - e) < 1e-9 for g, e in zip(got, expected)),
+      f"max |Δ|={max(abs(g - e) for g, e in zip(got, expected)):.2e}")
+
+# SC03: concurrent requests share model calls
+check("SC03 64 concurrent requests → fewer than 64 model calls",
+      m["rows_total"] == 64 and m["batches_total"] < 64,
+      f"batches={m['batches_total']}, rows={m['rows_total']}")
+
+# SC04: queue drains completely
+check("SC04 queue depth returns to 0", m["queue_depth_rows"] == 0,
+      f"queue_depth_rows={m['queue_depth_rows']}")
+
+# SC05: multi-row submit (stress-test shape) returns one PD per row
+pair = sched.predict_batch(np.array(sched_rows[:2]))
+check("SC05 predict_batch returns one PD per row",
+      pair.shape == (2,) and np.allclose(pair, get_pd_batch(sched_rows[:2]), atol=1e-9))
+
+# SC06: stop() joins the worker
+sched.stop()
+check("SC06 stop() shuts down the worker", not sched.running)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 7: PD / SHAP result cache
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 7: result cache ───────────────────────────────────────────────")
+
+import time as _time
+from src.pd_cache import ResultCache, quantize_features
+from src.model_trainer import get_model_version
+
+# C01: quantization absorbs float noise
+check("C01 quantize_features collapses float noise",
+      quantize_features([42_000.0000001, 2_000.0, 730.0, 0.72, 0.68, 1.0])
+      == quantize_features([42_000.0, 2_000.0, 730.0, 0.72, 0.68, 1.0]))
+
+# C02: LRU eviction at maxsize, least-recently-used first
+lru = ResultCache(maxsize=2, ttl_s=0)
+lru.put("v1", ("a",), 1.0)
+lru.put("v1", ("b",), 2.0)
+lru.get("v1", ("a",))          # touch a → b becomes LRU
+lru.put("v1", ("c",), 3.0)
+check("C02 LRU evicts least-recently-used entry",
+      lru.get("v1", ("b",)) is None and lru.get("v1", ("a",)) == 1.0,
+      f"stats={lru.stats()}")
+
+# C03: TTL expiry
+ttl = ResultCache(maxsize=10, ttl_s=0.01)
+ttl.put("v1", ("a",), 1.0)
+_time.sleep(0.02)
+check("C03 entries expire after ttl_s", ttl.get("v1", ("a",)) is None)
+
+# C04: model version change invalidates everything
+inv = ResultCache(maxsize=10, ttl_s=0)
+inv.put("v1", ("a",), 1.0)
+check("C04 new model version invalidates cached entries",
+      inv.get("v2", ("a",)) is None and inv.stats()["invalidations"] == 1)
+
+# C05: repeat get_pd is a cache hit with an identical value
+pd_cache.clear()
+first = get_pd(MID_RISK)
+hits_before = pd_cache.stats()["hits"]
+second = get_pd(MID_RISK)
+check("C05 repeat get_pd served from cache",
+      second == first and pd_cache.stats()["hits"] == hits_before + 1,
+      f"stats={pd_cache.stats()}")
+
+# C06: cache is keyed on the loaded model's version
+check("C06 pd_cache tracks current model version",
+      pd_cache.stats()["model_version"] == get_model_version())
+
+# C07: the key is quantized, the scored row is not — off-grid features score as in the batch path
+_c_off_grid = [41_999.996, 1_999.994, 730.04, 0.723456, 0.681234, 1.04]
+_c_reference = float(get_pd_batch([_c_off_grid])[0])
+pd_cache.clear()
+_c_single = get_pd(_c_off_grid)
+pd_cache.clear()
+_c_scheduled = InferenceScheduler(window_ms=2, max_batch_rows=256).predict(_c_off_grid)
+check("C07 get_pd / scheduler score off-grid rows as given (== get_pd_batch)",
+      abs(_c_single - _c_reference) < 1e-9 and abs(_c_scheduled - _c_reference) < 1e-9,
+      f"single={_c_single:.6f}, scheduled={_c_scheduled:.6f}, batch={_c_reference:.6f}")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 8: workload executors + async scoring path
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 8: workload executors ─────────────────────────────────────────")
+
+import asyncio
+import threading
+from src.executors import WORKLOAD_POOL_SIZES, get_executor, run_in, shutdown_executors
+
+# EX01: run_in executes on the named pool's threads
+thread_name = asyncio.run(run_in("explain", lambda: threading.current_thread().name))
+check("EX01 run_in runs work on the workload's pool",
+      thread_name.startswith("explain-worker"),
+      f"thread={thread_name}")
+
+# EX02: pools are bounded by configuration
+check("EX02 pool sizes match WORKLOAD_POOL_SIZES",
+      all(get_executor(w)._max_workers == n for w, n in WORKLOAD_POOL_SIZES.items()))
+
+# EX03: unknown workload classes are rejected
+try:
+    get_executor("bogus")
+    check("EX03 unknown workload raises KeyError", False)
+except KeyError:
+    check("EX03 unknown workload raises KeyError", True)
+
+# EX04: awaitable scheduler path matches get_pd
+pd_cache.clear()
+async_pd = asyncio.run(InferenceScheduler().predict_async(MID_RISK))
+check("EX04 predict_async matches get_pd",
+      abs(async_pd - get_pd(MID_RISK)) < 1e-9,
+      f"async={async_pd:.6f}")
+shutdown_executors()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 9: import-time budget
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 9: import-time budget ─────────────────────────────────────────")
+
+import subprocess
+
+_probe = subprocess.run(
+    [sys.executable, "-c", "import sys, api.main; print(' '.join(sorted(sys.modules)))"],
+    cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    capture_output=True, text=True,
+)
+_loaded = set(_probe.stdout.split())
+
+# IM01: importing the API defers every heavy dependency to first use
+_heavy = [m for m in ("pandas", "xgboost", "sklearn", "shap", "scipy", "joblib") if m in _loaded]
+check("IM01 import api.main loads no heavy modules",
+      _probe.returncode == 0 and not _heavy,
+      f"loaded={_heavy} stderr={_probe.stderr[-300:]}")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 10: model registry (hot swap)
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 10: model registry ────────────────────────────────────────────")
+
+from xgboost import XGBClassifier
+from src.model_registry import ModelRegistry
+from src.model_trainer import get_active_bundle
+
+_reg_dir = Path(tempfile.mkdtemp())
+reg = ModelRegistry(versions_dir=_reg_dir)
+reg.register_warmer("n_trees", lambda b: b.engine.n_trees if b.engine else None)
+
+_syn = make_synthetic_df(500, seed=3)
+_candidate = XGBClassifier(n_estimators=10, max_depth=2, random_state=0)
+_candidate.fit(_syn[FEATURE_NAMES], _syn["TARGET"])
+_original = get_active_bundle()
+
+# MR01: register writes a loadable version that is not yet active
+_v = reg.register(_candidate, {"training_rows": len(_syn)})
+_listed = {v["version"]: v for v in reg.list_versions()}
+check("MR01 register saves an inactive version",
+      _v in _listed and not _listed[_v]["active"] and get_active_bundle() is _original,
+      f"listed={list(_listed)}")
+
+# MR02: activation warms derived caches before the swap and persists the pointer
+pd_cache.clear()
+get_pd(MID_RISK)
+_res = reg.activate(_v)
+_new = get_active_bundle()
+check("MR02 activate swaps in a warmed bundle",
+      _res["swapped"] and _new.label == _v and _new.derived.get("n_trees") == 10
+      and (_reg_dir / "ACTIVE").read_text() == _v,
+      f"result={_res}")
+
+# MR03: serving follows the new model and the PD cache drops old-version entries
+check("MR03 get_pd uses the activated model",
+      abs(get_pd(MID_RISK) - float(_candidate.predict_proba(np.array([quantize_features(MID_RISK)]))[0, 1])) < 1e-5
+      and pd_cache.stats()["model_version"] == _new.version)
+
+# MR04: re-activating the serving version is a no-op
+check("MR04 activating the active version does not swap",
+      not reg.activate(_v)["swapped"] and get_active_bundle() is _new)
+
+# MR05: rollback restores the previous bundle object (still warm, no reload)
+_rb = reg.rollback()
+check("MR05 rollback restores the previous bundle",
+      get_active_bundle() is _original and _rb["rolled_back_from"] == _v,
+      f"result={_rb}")
+
+# MR06: nothing left to roll back to
+try:
+    reg.rollback()
+    check("MR06 empty history raises LookupError", False)
+except LookupError:
+    check("MR06 empty history raises LookupError", True)
+
+# MR07: unknown / malformed versions leave the serving model untouched
+_errors = []
+for _bad in ("does-not-exist", "../models"):
+    try:
+        reg.activate(_bad)
+    except (FileNotFoundError, ValueError) as exc:
+        _errors.append(type(exc).__name__)
+check("MR07 bad versions are rejected without swapping",
+      _errors == ["FileNotFoundError", "ValueError"] and get_active_bundle() is _original,
+      f"errors={_errors}")
+
+# MR08: register refuses the root artifact's name and an existing version
+_errors = []
+for _name in ("default", _v):
+    try:
+        reg.check_new_version(_name)
+    except ValueError:
+        _errors.append(_name)
+    try:
+        reg.register(_candidate, {}, version=_name)
+    except ValueError:
+        _errors.append(_name)
+check("MR08 reserved and existing version names are rejected",
+      _errors == ["default", "default", _v, _v] and reg.check_new_version("fresh-version") is None,
+      f"rejected={_errors}")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 11: explanations
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 11: explanations ──────────────────────────────────────────────")
+
+from src.explainability import (
+    compute_global_explanations,
+    contribution_matrix,
+    get_shap_explanation,
+    get_shap_explanations_batch,
+    load_global_explanations,
+)
+from src.pd_cache import shap_cache
+
+_xp_rows = [LOW_RISK, HIGH_RISK, MID_RISK, LOW_RISK]
+
+# XP01: one vectorised call explains every row, duplicates computed once
+shap_cache.clear()
+_xp_batch = get_shap_explanations_batch(_xp_rows)
+check("XP01 batch returns one explanation per row, caching distinct rows",
+      len(_xp_batch) == 4 and _xp_batch[0] == _xp_batch[3] and shap_cache.stats()["size"] == 3,
+      f"size={shap_cache.stats()['size']}")
+
+# XP02: batch rows match the single-borrower explanation
+_xp_single = [get_shap_explanation(r) for r in _xp_rows]
+check("XP02 batch matches get_shap_explanation row by row", _xp_batch == _xp_single)
+
+# XP03: SHAP values + base value reconstruct the model margin
+_xp_full = get_shap_explanations_batch([HIGH_RISK], top_k=6)[0]
+_xp_margin = _xp_full["base_value"] + sum(
+    c["shap_value"] for c in _xp_full["positive"] + _xp_full["negative"]
+)
+_xp_pd = get_pd(HIGH_RISK)
+check("XP03 contributions sum to the log-odds of the PD",
+      abs(_xp_margin - np.log(_xp_pd / (1 - _xp_pd))) < 1e-3,
+      f"margin={_xp_margin:.5f} pd={_xp_pd:.5f}")
+
+# XP04: top_k bounds each side
+_xp_k1 = get_shap_explanations_batch(_xp_rows, top_k=1)
+check("XP04 top_k limits contributors per sign",
+      all(len(e["positive"]) <= 1 and len(e["negative"]) <= 1 for e in _xp_k1))
+
+
+# XP05: native pred_contribs matches shap.TreeExplainer
+_xp_bundle = get_active_bundle()
+_xp_native, _xp_native_base = contribution_matrix(_xp_bundle, batch_rows, "native")
+_xp_shap, _xp_shap_base = contribution_matrix(_xp_bundle, batch_rows, "shap")
+check("XP05 native backend matches shap.TreeExplainer",
+      np.allclose(_xp_native, _xp_shap, atol=1e-4) and abs(_xp_native_base - _xp_shap_base) < 1e-4,
+      f"max|Δ|={np.max(np.abs(_xp_native - _xp_shap)):.2e}")
+
+# XP06: the native backend never imports shap
+_xp_probe = subprocess.run(
+    [sys.executable, "-c",
+     "import sys; from src.explainability import get_shap_explanation; "
+     "get_shap_explanation([42000, 2000, 730, 0.72, 0.68, 1.0], backend='native'); "
+     "print('shap' in sys.modules)"],
+    cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    capture_output=True, text=True,
+)
+check("XP06 native explanations do not import shap",
+      _xp_probe.returncode == 0 and _xp_probe.stdout.strip().endswith("False"),
+      f"stdout={_xp_probe.stdout[-200:]} stderr={_xp_probe.stderr[-300:]}")
+
+
+# XP07: global explanations rank features by mean |SHAP| over the sample
+_xp_sample = make_synthetic_df(300, seed=5)[FEATURE_NAMES].values
+_xp_global = compute_global_explanations(_xp_bundle, _xp_sample)
+_xp_contribs, _ = contribution_matrix(_xp_bundle, _xp_sample)
+_xp_top = _xp_global["importance"][0]
+check("XP07 global importance = mean |SHAP|, with distributions + dependence per feature",
+      _xp_global["n_rows"] == 300
+      and abs(_xp_top["mean_abs_shap"] - np.abs(_xp_contribs).mean(axis=0).max()) < 1e-6
+      and all(sum(f["distribution"]["counts"]) == 300 and sum(f["dependence"]["curve"]["n"]) == 300
+              for f in _xp_global["features"].values()),
+      f"top={_xp_top}")
+
+# XP08: the stored artifact is served without recomputing
+_xp_path = Path(tempfile.mkdtemp()) / "global_explanations.json"
+load_global_explanations(_xp_bundle, lambda: _xp_sample, path=_xp_path)
+_xp_calls = []
+_xp_cached = load_global_explanations(_xp_bundle, lambda: _xp_calls.append(1), path=_xp_path)
+check("XP08 global explanations are read back from the stored artifact",
+      _xp_path.exists() and not _xp_calls and _xp_cached["model_version"] == _xp_bundle.version)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 12: analytics cache
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 12: analytics cache ───────────────────────────────────────────")
+
+from src.analytics_cache import MISSING, AnalyticsCache
+from src.data_prep import dataset_fingerprint
+
+_ac = AnalyticsCache(maxsize=4)
+_ac_calls = []
+
+def _ac_compute():
+    _ac_calls.append(1)
+    _time.sleep(0.05)
+    return {"A": 1}
+
+# AC01: computed once, then served by peek / get_or_compute
+_ac.get_or_compute("backtest", "m1", "d1", _ac_compute)
+check("AC01 result computed once then cached",
+      _ac.get_or_compute("backtest", "m1", "d1", _ac_compute) == {"A": 1}
+      and _ac.peek("backtest", "m1", "d1") == {"A": 1} and len(_ac_calls) == 1)
+
+# AC02: concurrent misses on one key share a single computation
+_ac_calls.clear()
+with ThreadPoolExecutor(max_workers=8) as _pool:
+    _ac_results = list(_pool.map(lambda _: _ac.get_or_compute("returns", "m1", "d1", _ac_compute), range(8)))
+check("AC02 concurrent misses are single-flight",
+      len(_ac_calls) == 1 and all(r == {"A": 1} for r in _ac_results),
+      f"computations={len(_ac_calls)}")
+
+# AC03: a new model or dataset version is a different key
+check("AC03 model / dataset version are part of the key",
+      _ac.peek("backtest", "m2", "d1") is MISSING and _ac.peek("backtest", "m1", "d2") is MISSING)
+
+# AC04: dataset fingerprint is content-based
+_ac_df = make_synthetic_df(100, seed=9)
+_ac_changed = _ac_df.copy()
+_ac_changed.loc[0, "annual_inflow"] += 1.0
+check("AC04 dataset_fingerprint tracks content, not identity",
+      dataset_fingerprint(_ac_df) == dataset_fingerprint(_ac_df.copy())
+      and dataset_fingerprint(_ac_df) != dataset_fingerprint(_ac_changed))
+
+# AC05: failures propagate and are not cached
+try:
+    _ac.get_or_compute("eda", "m1", "d1", lambda: 1 / 0)
+except ZeroDivisionError:
+    pass
+check("AC05 failed computations are retried, not cached",
+      _ac.peek("eda", "m1", "d1") is MISSING
+      and _ac.get_or_compute("eda", "m1", "d1", lambda: 42) == 42)
+
+# AC06: parametrised results have their own LRU — many seeds never evict core entries
+from src.analytics_cache import analytics_cache, scenario_cache
+
+analytics_cache.get_or_compute("pds", "ac-model", "ac-data", lambda: "pd vector")
+for _seed in range(3 * scenario_cache.maxsize):
+    scenario_cache.get_or_compute(f"credit_losses:1000:0.1:0.6:{_seed}", "ac-model", "ac-data", lambda: _seed)
+check("AC06 scenario_cache is bounded and leaves analytics_cache entries in place",
+      scenario_cache.stats()["size"] == scenario_cache.maxsize
+      and analytics_cache.peek("pds", "ac-model", "ac-data") == "pd vector")
+scenario_cache.clear()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 13: streaming backtest
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 13: streaming backtest ────────────────────────────────────────")
+
+import src.data_prep as data_prep
+from src.analytics import stream_backtest_stats
+from src.data_prep import COLUMN_RENAME_MAP, iter_chunks, streaming_medians
+
+# Raw-format CSV: negative DAYS_EMPLOYED and missing values, like application_train.csv
+_sb_df = make_synthetic_df(1_000, seed=11)
+_sb_raw = _sb_df.rename(columns={v: k for k, v in COLUMN_RENAME_MAP.items()})
+_sb_raw["DAYS_EMPLOYED"] *= -1
+_sb_rng = np.random.default_rng(11)
+for _col in ["AMT_CREDIT", "EXT_SOURCE_2", "EXT_SOURCE_3"]:
+    _sb_raw.loc[_sb_rng.random(len(_sb_raw)) < 0.1, _col] = np.nan
+_sb_path = Path(tempfile.mkdtemp()) / "loans.csv"
+_sb_raw.to_csv(_sb_path, index=False)
+
+_sb_saved_path = data_prep.DATA_PATH
+data_prep.DATA_PATH = _sb_path
+try:
+    _sb_loaded = data_prep._load_from_csv()
+finally:
+    data_prep.DATA_PATH = _sb_saved_path
+
+# SB01: streaming medians equal pandas medians over the whole file
+_sb_medians = streaming_medians(_sb_path, chunksize=64)
+_sb_expected = _sb_raw.assign(DAYS_EMPLOYED=_sb_raw["DAYS_EMPLOYED"].abs()).median()
+check("SB01 streaming_medians are exact",
+      all(abs(_sb_medians[COLUMN_RENAME_MAP[c]] - _sb_expected[c]) < 1e-9 for c in COLUMN_RENAME_MAP),
+      f"medians={_sb_medians}")
+
+# SB02: chunks reassemble into the in-memory cleaned frame
+_sb_chunks = list(iter_chunks(_sb_path, chunksize=64, medians=_sb_medians))
+_sb_joined = pd.concat(_sb_chunks, ignore_index=True)
+check("SB02 iter_chunks matches _load_from_csv (float32 features)",
+      len(_sb_chunks) == 16
+      and np.allclose(_sb_joined[FEATURE_NAMES].values, _sb_loaded[FEATURE_NAMES].values.astype(np.float32))
+      and (_sb_joined["TARGET"].values == _sb_loaded["TARGET"].values).all())
+
+# SB03: streaming counters reproduce the in-memory backtest exactly
+_sb_reference = calculate_backtest_stats(_sb_loaded)
+check("SB03 stream_backtest_stats == calculate_backtest_stats",
+      stream_backtest_stats(_sb_path, chunksize=37, medians=_sb_medians) == _sb_reference,
+      f"reference={_sb_reference}")
+
+# SB04: process-pool scoring gives the same counters (own interpreter: spawned
+# workers would otherwise re-run this script as their __main__)
+_sb_probe = subprocess.run(
+    [sys.executable, "-c",
+     "import json, sys; from pathlib import Path; from src.analytics import stream_backtest_stats; "
+     "print(json.dumps(stream_backtest_stats(Path(sys.argv[1]), chunksize=100, "
+     "medians=json.loads(sys.argv[2]), workers=2)))",
+     str(_sb_path), _json.dumps(_sb_medians)],
+    cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    capture_output=True, text=True,
+)
+check("SB04 stream_backtest_stats(workers=2) matches",
+      _sb_probe.returncode == 0 and _json.loads(_sb_probe.stdout.strip().splitlines()[-1]) == _sb_reference,
+      f"stderr={_sb_probe.stderr[-300:]}")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 14: prepared-table cache (.npy, memory-mapped)
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 14: dataset cache ─────────────────────────────────────────────")
+
+from src.data_prep import load_dataset_cache, write_dataset_cache
+
+_dc_dir = Path(tempfile.mkdtemp())
+_dc_source = _dc_dir / "source.csv"
+_dc_source.write_text("placeholder")
+write_dataset_cache(_sb_loaded, cache_dir=_dc_dir, source=_dc_source)
+_dc_df = load_dataset_cache(_dc_dir, source=_dc_source)
+
+# DC01: round trip preserves the table; features stay a read-only file mapping
+check("DC01 cache round-trips FEATURE_NAMES + TARGET via mmap",
+      _dc_df is not None
+      and np.array_equal(_dc_df[FEATURE_NAMES].values, _sb_loaded[FEATURE_NAMES].values.astype(float))
+      and np.array_equal(_dc_df["TARGET"].values, _sb_loaded["TARGET"].values)
+      and not _dc_df["annual_inflow"].values.flags.writeable)
+
+# DC02: analytics on the cached frame match the parsed frame
+check("DC02 backtest on cached frame matches parsed CSV",
+      calculate_backtest_stats(_dc_df) == calculate_backtest_stats(_sb_loaded))
+
+# DC03: a changed source CSV invalidates the cache
+_dc_source.write_text("placeholder, now longer")
+check("DC03 stale cache is ignored", load_dataset_cache(_dc_dir, source=_dc_source) is None)
+
+from src.analytics import generate_eda_stats
+from src.data_prep import COMPACT_DTYPES, compact_frame
+from src.memory_report import frame_memory
+
+_dc_compact = compact_frame(_sb_loaded)
+
+# DC04: compact layout — column order kept, float32 features, int8 TARGET / region rating
+check("DC04 compact_frame dtypes and values",
+      list(_dc_compact.columns) == ["TARGET"] + FEATURE_NAMES
+      and all(str(_dc_compact[c].dtype) == t for c, t in COMPACT_DTYPES.items())
+      and np.array_equal(_dc_compact[FEATURE_NAMES].values,
+                         _sb_loaded[FEATURE_NAMES].values.astype(np.float32))
+      and np.array_equal(_dc_compact["TARGET"].values, _sb_loaded["TARGET"].values),
+      f"dtypes={dict(_dc_compact.dtypes.astype(str))}")
+
+# DC05: XGBoost scores in float32, so the backtest is unchanged
+check("DC05 backtest on compact frame matches wide frame",
+      calculate_backtest_stats(_dc_compact) == calculate_backtest_stats(_sb_loaded))
+
+# DC06: EDA statistics agree within float32 tolerance
+_dc_eda_wide, _dc_eda_compact = generate_eda_stats(_sb_loaded), generate_eda_stats(_dc_compact)
+_dc_eda_drift = max(
+    abs(_dc_eda_compact[part][f][k] - v) / max(abs(v), 1.0)
+    for part in ("summary", "correlation")
+    for f, row in _dc_eda_wide[part].items()
+    for k, v in row.items()
+)
+check("DC06 EDA on compact frame within 1e-4", _dc_eda_drift < 1e-4, f"max relative drift={_dc_eda_drift:.2e}")
+
+# DC07: the cache keeps the compact dtypes, memory-mapped, and is layout-checked
+_dc_compact_dir = Path(tempfile.mkdtemp())
+write_dataset_cache(_dc_compact, cache_dir=_dc_compact_dir)
+_dc_mapped = load_dataset_cache(_dc_compact_dir, layout="compact")
+check("DC07 compact cache round-trips via mmap",
+      _dc_mapped is not None
+      and dict(_dc_mapped.dtypes.astype(str)) == dict(_dc_compact.dtypes.astype(str))
+      and np.array_equal(_dc_mapped.values, _dc_compact.values)
+      and frame_memory(_dc_mapped)["columns"]["annual_inflow"]["memory_mapped"]
+      and load_dataset_cache(_dc_compact_dir, layout="wide") is None)
+
+# DC08: the compact table is at most half the wide one
+_dc_mb = frame_memory(_dc_compact)["mb"], frame_memory(_sb_loaded)["mb"]
+check("DC08 compact table <= 50% of wide", _dc_mb[0] <= 0.5 * _dc_mb[1], f"compact/wide MB={_dc_mb}")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 15: streaming EDA (sketches + co-moments)
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 15: streaming EDA ─────────────────────────────────────────────")
+
+from src.analytics import EDAAccumulator, eda_accumulator, stream_eda_stats
+from src.sketches import KLLSketch, StreamingMoments
+
+_sk_rng = np.random.default_rng(15)
+_sk_values = _sk_rng.lognormal(10, 1, 200_000)
+_sk_sorted = np.sort(_sk_values)
+
+
+def _sk_rank_error(sketch, q):
+    return abs(np.searchsorted(_sk_sorted, sketch.quantile(q), side="right") / len(_sk_sorted) - q)
+
+
+# SK01: below k items the sketch is exact (pandas-style interpolated median)
+_sk_small = KLLSketch(k=400).update(_sk_values[:301])
+check("SK01 KLL exact below k", _sk_small.exact and _sk_small.quantile(0.5) == float(np.median(_sk_values[:301])))
+
+# SK02: bounded size, rank error well inside 1% on 200k values fed in batches
+_sk = KLLSketch(k=400)
+for _batch in np.array_split(_sk_values, 37):
+    _sk.update(_batch)
+_sk_err = max(_sk_rank_error(_sk, q) for q in (0.1, 0.5, 0.9))
+check("SK02 KLL rank error < 1% with O(k) items",
+      _sk_err < 0.01 and _sk.num_retained() < 4_000 and len(_sk) == len(_sk_values),
+      f"rank error={_sk_err:.4f}, retained={_sk.num_retained()}")
+
+# SK03: sketches built on halves merge into a sketch of the whole
+_sk_merged = KLLSketch(k=400, seed=1).update(_sk_values[:120_000]).merge(
+    KLLSketch(k=400, seed=2).update(_sk_values[120_000:]))
+check("SK03 KLL merge",
+      len(_sk_merged) == len(_sk_values) and _sk_rank_error(_sk_merged, 0.5) < 0.01
+      and _sk_merged.min == _sk_sorted[0] and _sk_merged.max == _sk_sorted[-1])
+
+# SK04: chunked + merged co-moments equal the batch covariance / correlation
+_sk_X = _sk_rng.normal([1e5, 5e3, 1.0], [3e4, 1e3, 0.2], size=(5_000, 3))
+_sk_m = StreamingMoments(3)
+for _batch in np.array_split(_sk_X[:3_000], 7):
+    _sk_m.update(_batch)
+_sk_m.merge(StreamingMoments(3).update(_sk_X[3_000:]))
+check("SK04 StreamingMoments == np.cov / np.corrcoef",
+      np.allclose(_sk_m.mean, _sk_X.mean(axis=0))
+      and np.allclose(_sk_m.variance(), np.var(_sk_X, axis=0, ddof=1))
+      and np.allclose(_sk_m.correlation(), np.corrcoef(_sk_X, rowvar=False)))
+
+
+def _sk_close(a, b, tol=2e-4):  # both sides rounded to 4 dp
+    return all(
+        abs(a[part][f][k] - v) <= tol * max(abs(v), 1.0)
+        for part, stats in (("summary", ("mean", "std")), ("correlation", None))
+        for f, row in b[part].items()
+        for k, v in row.items() if stats is None or k in stats
+    )
+
+
+# SK05: accumulator matches generate_eda_stats (medians within sketch rank error)
+_sk_acc = eda_accumulator(_sb_loaded, chunksize=128)
+_sk_eda = _sk_acc.result()
+_sk_exact = generate_eda_stats(_sb_loaded)
+
+
+def _sk_median_rank_ok(x, m, tol=0.03):
+    # Tie-aware: median-imputed columns put ~10% of rows exactly on the median,
+    # so 0.5 must fall between the strict and inclusive ranks (m is rounded to 4 dp)
+    eps = 1e-4 * max(abs(m), 1.0)
+    return (x < m - eps).mean() - tol <= 0.5 <= (x <= m + eps).mean() + tol
+
+
+_sk_median_ok = all(
+    _sk_median_rank_ok(_sb_loaded[f].to_numpy(dtype=float), _sk_eda["summary"][f]["median"])
+    for f in _sk_eda["summary"]
+)
+check("SK05 EDAAccumulator matches generate_eda_stats",
+      _sk_eda["n_rows"] == len(_sb_loaded) and _sk_close(_sk_eda, _sk_exact) and _sk_median_ok)
+
+# SK06: merged partial accumulators == one pass; result() is memoized until update
+_sk_parts = EDAAccumulator().update(_sb_loaded.iloc[:400]).merge(EDAAccumulator().update(_sb_loaded.iloc[400:]))
+_sk_again = _sk_acc.result()
+check("SK06 EDA accumulators merge; result memoized",
+      _sk_close(_sk_parts.result(), _sk_exact) and _sk_again is _sk_eda
+      and _sk_acc.update(_sb_loaded.iloc[:10]).result()["n_rows"] == len(_sb_loaded) + 10)
+
+# SK07: streaming from the CSV (float32 chunks) agrees with the in-memory frame
+check("SK07 stream_eda_stats matches in-memory accumulator",
+      _sk_close(stream_eda_stats(_sb_path, chunksize=64, medians=_sb_medians).result(), _sk_exact))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 16: stress-test surface
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 16: stress surface ────────────────────────────────────────────")
+
+from src.analytics import MAX_SURFACE_POINTS, stress_surface
+from src.scorecard import grade_thresholds
+
+_ss_calls = []
+
+
+def _ss_predict(X):
+    _ss_calls.append(len(X))
+    return get_pd_batch(X)
+
+
+# SS01: a 100-point income curve is one model call (plus the base row)
+_ss_multipliers = np.linspace(0.05, 3.0, 100).tolist()
+_ss_curve = stress_surface(low_risk, [{"feature": "annual_inflow", "mode": "multiply", "values": _ss_multipliers}],
+                           predict_batch=_ss_predict)
+check("SS01 100-point curve scored in one call",
+      _ss_calls == [101] and _ss_curve["shape"] == [100] and len(_ss_curve["score"]) == 100,
+      f"calls={_ss_calls}")
+
+# SS02: each point equals stress_test_borrower at the same multiplier
+check("SS02 surface matches stress_test_borrower",
+      all(abs(stress_test_borrower(low_risk, _ss_multipliers[i])["stressed_score"] - _ss_curve["score"][i]) <= 0.011
+          for i in range(0, 100, 11)))
+
+# SS03: every grade change along the curve is reported, with a crossing inside its interval
+_ss_changes = sum(a != b for a, b in zip(_ss_curve["grade"], _ss_curve["grade"][1:]))
+check("SS03 grade transitions bracket the threshold",
+      len(_ss_curve["transitions"]) >= _ss_changes
+      and all(min(t["between"]) <= t["crossing"] <= max(t["between"]) and t["from"] != t["to"]
+              and t["threshold"] in grade_thresholds().values()
+              for t in _ss_curve["transitions"]),
+      f"changes={_ss_changes}, transitions={_ss_curve['transitions']}")
+
+# SS04: 2-D grid (income × failed-payment bucket), first axis slowest
+_ss_grid = stress_surface(low_risk, [
+    {"feature": "annual_inflow", "mode": "multiply", "values": [0.25, 0.5, 1.0, 1.5, 2.0]},
+    {"feature": "failed_payment_cluster_risk", "mode": "set", "values": [1, 2, 3]},
+])
+_ss_row = list(low_risk)
+_ss_row[0] *= 1.5
+_ss_row[5] = 2
+check("SS04 2-D surface shape and cell values",
+      _ss_grid["shape"] == [5, 3]
+      and abs(_ss_grid["pd"][3][1] - float(get_pd_batch([_ss_row])[0])) < 1e-6
+      and all("at" in t for t in _ss_grid["transitions"]))
+
+# SS05: invalid axes are rejected before scoring
+_ss_bad = [
+    [{"feature": "annual_inflow", "mode": "scale", "values": [1.0]}],
+    [{"feature": "annual_inflow", "mode": "add", "values": [1.0]},
+     {"feature": "annual_inflow", "mode": "set", "values": [1.0]}],
+    [{"feature": "annual_inflow", "mode": "multiply", "values": [1.0] * 101},
+     {"feature": "avg_monthly_balance", "mode": "multiply", "values": [1.0] * (MAX_SURFACE_POINTS // 100)}],
+]
+_ss_raised = 0
+for _axes in _ss_bad:
+    try:
+        stress_surface(low_risk, _axes)
+    except ValueError:
+        _ss_raised += 1
+check("SS05 bad mode / repeated feature / oversized grid raise ValueError", _ss_raised == len(_ss_bad))
+
+# SS06: explicit cut-offs (another version's) grade the surface and its transitions
+from src.scorecard import GRADE_LABELS, grade_indices
+
+# Cut-offs halfway between 0.01 steps, so the rounded scores in the response grade as the exact ones
+_ss_scores = np.asarray(_ss_curve["score"])
+_ss_cut = {g: round(float(np.quantile(_ss_scores, q)), 2) + 0.005 for g, q in (("A", 0.7), ("B", 0.3))}
+_ss_own = stress_surface(low_risk, [{"feature": "annual_inflow", "mode": "multiply", "values": _ss_multipliers}],
+                         thresholds=_ss_cut)
+check("SS06 stress_surface grades with the given cut-offs, not those in force",
+      _ss_own["grade"] == GRADE_LABELS[grade_indices(_ss_scores, _ss_cut)].tolist()
+      and _ss_own["transitions"]
+      and all(t["threshold"] in _ss_cut.values() for t in _ss_own["transitions"])
+      and grade_thresholds() != _ss_cut)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 17: portfolio stress
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 17: portfolio stress ──────────────────────────────────────────")
+
+from src.analytics import score_dataset
+from src.portfolio_stress import apply_scenario, normalise_scenario, portfolio_stress
+from src.scorecard import get_risk_grade_array
+
+_ps_X = _sb_loaded[FEATURE_NAMES].to_numpy(dtype=np.float32)
+_ps_X_before = _ps_X.copy()
+_ps_backtest = calculate_backtest_stats(_sb_loaded)
+_ps_scenarios = [
+    {"name": "identity"},
+    {"name": "income_half", "income_multiplier": 0.5},
+    {"name": "severe", "income_multiplier": 0.7, "balance_multiplier": 0.6, "region_shift": 1},
+]
+_ps = portfolio_stress(_ps_X, _ps_scenarios, grade_default_rates=_ps_backtest, chunksize=37, workers=1)
+_ps_by_name = {r["name"]: r for r in _ps["scenarios"]}
+
+
+def _ps_grades(scenario):
+    X = apply_scenario(_ps_X.copy(), normalise_scenario(scenario))
+    return get_risk_grade_array(pd_to_score_array(get_pd_batch(X)))
+
+
+# PS01: the identity scenario keeps everyone in place; the input is never modified
+_ps_identity = _ps_by_name["identity"]["migration"]
+check("PS01 identity scenario → diagonal migration, X untouched",
+      all(_ps_identity[g][h] == 0 for g in "ABC" for h in "ABC" if g != h)
+      and _ps_by_name["identity"]["downgraded_pct"] == 0.0
+      and np.array_equal(_ps_X, _ps_X_before))
+
+# PS02: migration matrix equals grading the shocked book row by row
+_ps_base_g, _ps_sev_g = _ps_grades({}), _ps_grades(_ps_scenarios[2])
+check("PS02 migration matches direct scoring",
+      all(_ps_by_name["severe"]["migration"][g][h] == int(((_ps_base_g == g) & (_ps_sev_g == h)).sum())
+          for g in "ABC" for h in "ABC"))
+
+# PS03: expected default rate = Σ grade share × historical default rate
+_ps_sev = _ps_by_name["severe"]
+check("PS03 expected_default_rate from grade mix",
+      abs(_ps_sev["expected_default_rate"]
+          - sum(_ps_sev["grade_mix"][g] * _ps_backtest[g]["default_rate"] for g in "ABC")) < 1e-6
+      and abs(sum(_ps_sev["grade_mix"].values()) - 1.0) < 1e-3
+      and _ps["n_borrowers"] == len(_sb_loaded))
+
+# PS04: parallel scenarios and a cached baseline give identical results
+_ps_par = portfolio_stress(_ps_X, _ps_scenarios, grade_default_rates=_ps_backtest,
+                           baseline_pds=score_dataset(_sb_loaded), workers=3)
+
+
+def _ps_strip(result):
+    return [{k: v for k, v in r.items() if k != "elapsed_s"} for r in result["scenarios"]]
+
+
+check("PS04 workers=3 + baseline_pds == sequential",
+      _ps_strip(_ps_par) == _ps_strip(_ps) and _ps_par["baseline"] == _ps["baseline"])
+
+# PS05: invalid scenarios are rejected
+_ps_raised = 0
+for _bad in ({"income_multiplier": 0}, {"inflation": 0.1}):
+    try:
+        portfolio_stress(_ps_X, [_bad])
+    except ValueError:
+        _ps_raised += 1
+check("PS05 invalid scenario raises ValueError", _ps_raised == 2)
+
+# PS06: explicit cut-offs grade baseline and scenarios alike
+_ps_scores = pd_to_score_array(score_dataset(_sb_loaded))
+_ps_cut = {"A": float(np.quantile(_ps_scores, 0.7)), "B": float(np.quantile(_ps_scores, 0.3))}
+_ps_own = portfolio_stress(_ps_X, [_ps_scenarios[2]], chunksize=37, workers=1, thresholds=_ps_cut)
+_ps_own_base = GRADE_LABELS[grade_indices(_ps_scores, _ps_cut)]
+_ps_own_sev = GRADE_LABELS[grade_indices(pd_to_score_array(get_pd_batch(
+    apply_scenario(_ps_X.copy(), normalise_scenario(_ps_scenarios[2])))), _ps_cut)]
+check("PS06 portfolio_stress migration uses the given cut-offs",
+      all(_ps_own["scenarios"][0]["migration"][g][h] == int(((_ps_own_base == g) & (_ps_own_sev == h)).sum())
+          for g in "ABC" for h in "ABC")
+      and _ps_own["scenarios"][0]["migration"] != _ps_by_name["severe"]["migration"])
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 18: Monte Carlo credit losses
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 18: credit-loss Monte Carlo ───────────────────────────────────")
+
+from src.credit_loss import simulate_credit_losses
+from src.simulation import simulate_lender_pool
+
+_cl_lenders = simulate_lender_pool(200, seed=1)
+_cl_rates = {"A": {"default_rate": 0.023}, "B": {"default_rate": 0.053}, "C": {"default_rate": 0.124}}
+_cl = simulate_credit_losses(_cl_lenders, _cl_rates, n_paths=20_000, chunk_paths=1_500, workers=1)
+
+# CL01: Vasicek preserves the unconditional PD — simulated EL ≈ Σ exposure × PD × LGD
+check("CL01 simulated expected loss within 3% of analytic",
+      abs(_cl["expected_loss_gbp"] / _cl["analytic_expected_loss_gbp"] - 1) < 0.03,
+      f"mc={_cl['expected_loss_gbp']}, analytic={_cl['analytic_expected_loss_gbp']}")
+
+# CL02: tail measures are ordered
+_cl_var, _cl_cvar = _cl["var_gbp"], _cl["cvar_gbp"]
+check("CL02 EL <= VaR95 <= VaR99 <= VaR99.9, CVaR >= VaR",
+      _cl["expected_loss_gbp"] <= _cl_var["95"] <= _cl_var["99"] <= _cl_var["99.9"]
+      and all(_cl_cvar[k] >= _cl_var[k] for k in _cl_var),
+      f"var={_cl_var}, cvar={_cl_cvar}")
+
+# CL03: chunk-level seeding — same result for any number of workers
+_cl_par = simulate_credit_losses(_cl_lenders, _cl_rates, n_paths=20_000, chunk_paths=1_500, workers=4)
+check("CL03 workers=4 reproduces workers=1",
+      {k: v for k, v in _cl_par.items() if k != "elapsed_s"} == {k: v for k, v in _cl.items() if k != "elapsed_s"})
+
+# CL04: correlation fattens the tail but leaves EL unchanged
+_cl_indep = simulate_credit_losses(_cl_lenders, _cl_rates, n_paths=20_000, rho=0.0)
+_cl_corr = simulate_credit_losses(_cl_lenders, _cl_rates, n_paths=20_000, rho=0.3)
+check("CL04 higher rho → larger VaR99, same EL",
+      _cl_corr["var_gbp"]["99"] > _cl_indep["var_gbp"]["99"]
+      and abs(_cl_corr["expected_loss_gbp"] / _cl_indep["expected_loss_gbp"] - 1) < 0.1)
+
+# CL05: per-lender quantiles are ordered and add up to the portfolio EL
+check("CL05 lender loss quantiles ordered, sum of lender EL == portfolio EL",
+      len(_cl["lenders"]) == 200
+      and all(r["loss_p50_gbp"] <= r["loss_p95_gbp"] <= r["loss_p99_gbp"] for r in _cl["lenders"])
+      and abs(sum(g["expected_loss_gbp"] for g in _cl["by_grade"].values()) - _cl["expected_loss_gbp"]) < 1.0)
+
+# CL06: out-of-range parameters are rejected
+_cl_raised = 0
+for _kwargs in ({"rho": 1.0}, {"lgd": 0.0}, {"pool": "gpu"}):
+    try:
+        simulate_credit_losses(_cl_lenders, _cl_rates, n_paths=10, **_kwargs)
+    except ValueError:
+        _cl_raised += 1
+check("CL06 invalid rho / lgd / pool raise ValueError", _cl_raised == 3)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 19: bootstrap confidence intervals for the backtest
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 19: bootstrap CIs ─────────────────────────────────────────────")
+
+from src.analytics import bootstrap_backtest_stats
+
+_bs_pds = score_dataset(_sb_loaded)
+_bs_targets = _sb_loaded["TARGET"].values
+_bs_poisson = bootstrap_backtest_stats(_bs_pds, _bs_targets, n_replicates=4_000, method="poisson")
+_bs_index = bootstrap_backtest_stats(_bs_pds, _bs_targets, n_replicates=1_000, method="index")
+_bs_point = calculate_backtest_stats(_sb_loaded)
+
+# BS01: point estimates are the plain backtest
+check("BS01 bootstrap point estimates == calculate_backtest_stats",
+      all({k: _bs_poisson[g][k] for k in ("default_rate", "n_borrowers")} == _bs_point[g] for g in "ABC"))
+
+# BS02: intervals bracket the point estimate
+check("BS02 CIs contain the point estimate",
+      all(_bs_poisson[g]["ci_low"] <= _bs_poisson[g]["default_rate"] <= _bs_poisson[g]["ci_high"]
+          for g in "ABC" if _bs_point[g]["n_borrowers"] > 0))
+
+# BS03: standard errors match the binomial sqrt(p(1-p)/n)
+_bs_se_ok = all(
+    abs(_bs_poisson[g]["std_error"] / np.sqrt(p * (1 - p) / n) - 1) < 0.25
+    for g in "ABC"
+    for p, n in [(_bs_point[g]["default_rate"], _bs_point[g]["n_borrowers"])]
+    if n >= 50 and 0 < p < 1
+)
+check("BS03 bootstrap SE ≈ binomial SE", _bs_se_ok,
+      f"se={[_bs_poisson[g]['std_error'] for g in 'ABC']}")
+
+# BS04: Poisson weights and index resampling agree
+check("BS04 poisson and index CIs agree within 0.02",
+      all(abs(_bs_poisson[g][k] - _bs_index[g][k]) < 0.02 for g in "ABC" for k in ("ci_low", "ci_high")),
+      f"poisson={_bs_poisson}, index={_bs_index}")
+
+# BS05: seeded and validated
+_bs_raised = 0
+for _kwargs in ({"method": "jackknife"}, {"confidence": 1.0}):
+    try:
+        bootstrap_backtest_stats(_bs_pds, _bs_targets, **_kwargs)
+    except ValueError:
+        _bs_raised += 1
+check("BS05 same seed → same CIs; bad method / confidence raise",
+      bootstrap_backtest_stats(_bs_pds, _bs_targets, n_replicates=4_000) == _bs_poisson and _bs_raised == 2)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 20: grade threshold calibration
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 20: threshold calibration ─────────────────────────────────────")
+
+from src.calibration import (
+    ScoreCalibrator,
+    apply_thresholds,
+    calibrate_pds,
+    sync_thresholds,
+    threshold_record,
+    write_thresholds,
+)
+from src.model_trainer import ModelBundle, read_thresholds, thresholds_path
+from src.scorecard import (
+    get_risk_grade,
+    grade_indices,
+    grade_thresholds,
+    recommend_thresholds,
+    set_grade_thresholds,
+)
+from src.analytics import backtest_from_pds
+
+_tc_active = get_active_bundle()
+_tc_prior = _tc_active.thresholds
+
+# TC01: while exact, the sketch reproduces recommend_thresholds
+_tc_scores = pd_to_score_array(_bs_pds[:1_500])
+_tc_exact = ScoreCalibrator().update_scores(_tc_scores).thresholds()
+_tc_ref = recommend_thresholds(_tc_scores)
+check("TC01 exact sketch cut-offs == recommend_thresholds",
+      all(abs(_tc_exact[g] - _tc_ref[g]) < 1e-9 for g in "AB"), f"{_tc_exact} vs {_tc_ref}")
+
+# TC02: 1M streamed scores — bounded sketch, shares within rank error, mergeable
+_tc_rng = np.random.default_rng(7)
+_tc_stream = _tc_rng.normal(505, 20, size=1_000_000)
+_tc_halves = [ScoreCalibrator(), ScoreCalibrator()]
+for _i in range(0, len(_tc_stream), 100_000):
+    _tc_halves[(_i // 100_000) % 2].update_scores(_tc_stream[_i:_i + 100_000])
+_tc_merged = _tc_halves[0].merge(_tc_halves[1])
+_tc_cut = _tc_merged.thresholds()
+_tc_a_share = float((_tc_stream >= _tc_cut["A"]).mean())
+_tc_c_share = float((_tc_stream < _tc_cut["B"]).mean())
+check("TC02 1M-row merged sketch: ≤ 10k retained, A/C shares within 0.5%",
+      _tc_merged.n == len(_tc_stream) and _tc_merged.status()["retained"] <= 10_000
+      and abs(_tc_a_share - 0.20) < 0.005 and abs(_tc_c_share - 0.45) < 0.005,
+      f"retained={_tc_merged.status()['retained']}, A={_tc_a_share:.4f}, C={_tc_c_share:.4f}")
+
+# TC03: runtime thresholds drive every grading function; None restores defaults
+set_grade_thresholds({"A": 560.0, "B": 540.0})
+_tc_runtime = (get_risk_grade(550.0), list(grade_indices([530.0, 550.0, 570.0])))
+set_grade_thresholds(None)
+_tc_default = (get_risk_grade(550.0), grade_thresholds())
+try:
+    set_grade_thresholds({"A": 400.0, "B": 500.0})
+    _tc_raised = False
+except ValueError:
+    _tc_raised = True
+check("TC03 set_grade_thresholds regrades; None restores 521/495; B > A raises",
+      _tc_runtime == ("B", [0, 1, 2]) and _tc_default == ("A", {"A": 521.0, "B": 495.0}) and _tc_raised,
+      f"runtime={_tc_runtime}, default={_tc_default}")
+
+# TC04: stored thresholds load with their model; another model's are ignored
+_tc_record = threshold_record(calibrate_pds(_bs_pds, _tc_active.version), "dataset")
+with tempfile.TemporaryDirectory() as _tc_tmp:
+    _tc_path = write_thresholds(_tc_record, "tc", Path(_tc_tmp))
+    _tc_read = read_thresholds(thresholds_path("tc", Path(_tc_tmp)))
+_tc_own = ModelBundle(_tc_active.model, "tc", _tc_read)
+_tc_foreign = ModelBundle(_tc_active.model, "tc", {**_tc_read, "fingerprint": "000000000000"})
+check("TC04 thresholds.json round-trips; foreign fingerprint ignored",
+      _tc_path.name == "thresholds.json" and _tc_read == _tc_record
+      and _tc_own.cutoffs == {"A": _tc_record["A"], "B": _tc_record["B"]}
+      and _tc_foreign.thresholds is None and _tc_foreign.cutoffs == {"A": 521.0, "B": 495.0})
+
+# TC05: applying to the serving bundle regrades live; sync follows the file
+apply_thresholds(_tc_active, {"A": 600.0, "B": 550.0})
+_tc_applied = get_risk_grade(580.0)
+apply_thresholds(_tc_active, _tc_prior)
+try:
+    apply_thresholds(_tc_active, {"A": 600.0, "B": 550.0, "fingerprint": "000000000000"})
+    _tc_raised = False
+except ValueError:
+    _tc_raised = True
+_tc_standby = ModelBundle(_tc_active.model, "tc")
+with tempfile.TemporaryDirectory() as _tc_tmp:
+    write_thresholds(_tc_record, "tc", Path(_tc_tmp))
+    _tc_synced = (sync_thresholds(_tc_standby, Path(_tc_tmp)), sync_thresholds(_tc_standby, Path(_tc_tmp)))
+check("TC05 apply_thresholds regrades serving model; sync picks up a written file once",
+      _tc_applied == "B" and get_risk_grade(580.0) == "A" and _tc_raised
+      and _tc_synced == (True, False) and _tc_standby.thresholds == _tc_record
+      and grade_thresholds() == _tc_active.cutoffs)
+
+# TC06: explicit cut-offs grade a non-serving version consistently; live sketch resets per model
+_tc_cutoffs = {"A": _tc_record["A"], "B": _tc_record["B"]}
+_tc_explicit = backtest_from_pds(_bs_pds, _bs_targets, _tc_cutoffs)
+set_grade_thresholds(_tc_cutoffs)
+_tc_global = backtest_from_pds(_bs_pds, _bs_targets)
+set_grade_thresholds(_tc_prior)
+_tc_live = ScoreCalibrator()
+_tc_live.observe("m1", _bs_pds[:100])
+_tc_live.observe("m2", _bs_pds[:10])
+check("TC06 backtest with explicit cut-offs == with them in force; live sketch resets on new model",
+      _tc_explicit == _tc_global and _tc_live.status() == {"model_version": "m2", "n_rows": 10, "retained": 10})
+
+# TC07: spawned backtest workers grade with the parent's cut-offs, not the defaults
+_tc_sb_cut = {k: round(v, 1) for k, v in recommend_thresholds(
+    pd_to_score_array(score_dataset(_sb_loaded))).items()}
+set_grade_thresholds(_tc_sb_cut)
+_tc_serial = stream_backtest_stats(_sb_path, chunksize=100, medians=_sb_medians)
+set_grade_thresholds(_tc_prior)
+_tc_probe = subprocess.run(
+    [sys.executable, "-c",
+     "import json, sys; from pathlib import Path; from src.analytics import stream_backtest_stats; "
+     "from src.scorecard import set_grade_thresholds; set_grade_thresholds(json.loads(sys.argv[3])); "
+     "print(json.dumps(stream_backtest_stats(Path(sys.argv[1]), chunksize=100, "
+     "medians=json.loads(sys.argv[2]), workers=2)))",
+     str(_sb_path), _json.dumps(_sb_medians), _json.dumps(_tc_sb_cut)],
+    cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    capture_output=True, text=True,
+)
+check("TC07 stream_backtest_stats workers=1 == workers=2 under non-default cut-offs",
+      _tc_serial != _sb_reference and _tc_probe.returncode == 0
+      and _json.loads(_tc_probe.stdout.strip().splitlines()[-1]) == _tc_serial,
+      f"cut-offs={_tc_sb_cut}, stderr={_tc_probe.stderr[-300:]}")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 21: training pipeline and parallel parameter search
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 21: training search ───────────────────────────────────────────")
+
+from sklearn.metrics import roc_auc_score
+from src.tree_engine import compile_booster
+from src.training import (
+    fit_candidate,
+    load_candidate,
+    param_grid,
+    search,
+    select_candidate,
+    split_dataset,
+)
+
+_tr_split = split_dataset(_sb_loaded)
+_tr_X_train, _tr_X_valid, _tr_y_train, _tr_y_valid = _tr_split
+_tr_grid = {"max_depth": [2, 3], "learning_rate": [0.1, 0.3], "n_estimators": [150]}
+
+# TR01: grid expansion
+check("TR01 param_grid expands every combination in order",
+      param_grid({"a": [1, 2], "b": ["x", "y"]})
+      == [{"a": 1, "b": "x"}, {"a": 1, "b": "y"}, {"a": 2, "b": "x"}, {"a": 2, "b": "y"}])
+
+# TR02: early-stopped fit is cut back to its best iteration; engine agrees
+_tr_model, _ = fit_candidate({"n_estimators": 400, "learning_rate": 0.3, "early_stopping_rounds": 10},
+                             _tr_X_train, _tr_y_train, _tr_X_valid, _tr_y_valid, n_jobs=1)
+_tr_trees = _tr_model.get_booster().num_boosted_rounds()
+_tr_engine = compile_booster(_tr_model.get_booster(), len(FEATURE_NAMES))
+check("TR02 hist fit early-stops, keeps best trees only; engine parity",
+      _tr_trees < 400 and _tr_engine.n_trees == _tr_trees
+      and np.abs(_tr_engine.predict_proba(_tr_X_valid) - _tr_model.predict_proba(_tr_X_valid)[:, 1]).max() < 1e-5,
+      f"trees={_tr_trees}")
+
+# TR03: search reports accuracy, time and latency for every candidate, best AUC first
+_tr_result = search(*[_tr_split[i] for i in (0, 2, 1, 3)], _tr_grid, workers=1, threads_per_job=1)
+_tr_cands = _tr_result["candidates"]
+_tr_best_auc = roc_auc_score(_tr_y_valid, load_candidate(_tr_cands[0]).predict_proba(_tr_X_valid)[:, 1])
+check("TR03 search: 4 candidates sorted by AUC, Gini/latency reported, AUC reproducible",
+      len(_tr_cands) == 4
+      and [c["auc"] for c in _tr_cands] == sorted((c["auc"] for c in _tr_cands), reverse=True)
+      and all(abs(c["gini"] - (2 * c["auc"] - 1)) < 1e-4 and c["fit_s"] > 0
+              and c["latency"]["predict_row_us"] > 0 and c["latency"]["batch_row_us"] > 0 for c in _tr_cands)
+      and any(c["pareto"] for c in _tr_cands) and _tr_cands[0]["pareto"]
+      and abs(_tr_best_auc - _tr_cands[0]["auc"]) < 1e-4,
+      f"aucs={[c['auc'] for c in _tr_cands]}")
+
+# TR04: selection within a latency budget
+_tr_fastest = min(_tr_cands, key=lambda c: c["latency"]["engine_row_us"])
+try:
+    select_candidate(_tr_cands, max_latency_us=0.0)
+    _tr_raised = False
+except ValueError:
+    _tr_raised = True
+_tr_budget = select_candidate(_tr_cands, max_latency_us=_tr_fastest["latency"]["engine_row_us"])
+check("TR04 select_candidate: best AUC overall, within budget, raises if none fits",
+      select_candidate(_tr_cands) is _tr_cands[0] and _tr_raised
+      and _tr_budget["latency"]["engine_row_us"] <= _tr_fastest["latency"]["engine_row_us"])
+
+# TR05: the process pool gives the same candidates (own interpreter, as SB04)
+_tr_npz = Path(tempfile.mkdtemp()) / "split.npz"
+np.savez(_tr_npz, *_tr_split)
+_tr_probe = subprocess.run(
+    [sys.executable, "-c",
+     "import json, sys; import numpy as np; from src.training import search; "
+     "d = np.load(sys.argv[1]); X, Xv, y, yv = (d[f'arr_{i}'] for i in range(4)); "
+     "r = search(X, y, Xv, yv, json.loads(sys.argv[2]), workers=2, threads_per_job=1); "
+     "print(json.dumps([[c['params'], c['auc'], c['n_trees']] for c in r['candidates']]))",
+     str(_tr_npz), _json.dumps(_tr_grid)],
+    cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    capture_output=True, text=True,
+)
+_tr_expected = sorted([[c["params"], c["auc"], c["n_trees"]] for c in _tr_cands], key=str)
+check("TR05 search(workers=2) on a process pool == sequential",
+      _tr_probe.returncode == 0
+      and sorted(_json.loads(_tr_probe.stdout.strip().splitlines()[-1]), key=str) == _tr_expected,
+      f"stderr={_tr_probe.stderr[-300:]}")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Section 22: out-of-core training through a DataIter
+# ──────────────────────────────────────────────────────────────────────────────
+print("\n── Section 22: out-of-core training ──────────────────────────────────────")
+
+from src.out_of_core import CacheChunks, CSVChunks, train_out_of_core, valid_mask
+
+# OC01: the hashed split is chunk-size independent and close to the asked fraction
+_oc_ids = np.arange(200_000)
+_oc_mask = valid_mask(_oc_ids, 0.2)
+check("OC01 valid_mask: deterministic per row, ~20% valid",
+      (np.concatenate([valid_mask(_oc_ids[i:i + 777], 0.2) for i in range(0, len(_oc_ids), 777)]) == _oc_mask).all()
+      and abs(_oc_mask.mean() - 0.2) < 0.005,
+      f"fraction={_oc_mask.mean():.4f}")
+
+# OC02: CSV and cache chunk sources yield the cleaned table, in order
+_oc_csv = CSVChunks(_sb_path, chunksize=128)
+_oc_dir = Path(tempfile.mkdtemp())
+# Cache built from the same float32 chunks, so both sources feed identical values
+write_dataset_cache(pd.concat(list(iter_chunks(_sb_path, 128, _sb_medians)), ignore_index=True), cache_dir=_oc_dir)
+_oc_cache = CacheChunks(_oc_dir, chunksize=128)
+_oc_X = np.concatenate([X for X, _ in _oc_csv])
+_oc_y = np.concatenate(list(_oc_csv.labels()))
+check("OC02 CSVChunks / CacheChunks == cleaned table (medians from one streaming pass)",
+      _oc_csv.medians == _sb_medians
+      and np.allclose(_oc_X, _sb_loaded[FEATURE_NAMES].values.astype(np.float32))
+      and (np.concatenate([X for X, _ in _oc_cache]) == _oc_X).all()
+      and (_oc_y == _sb_loaded["TARGET"].values).all()
+      and (np.concatenate(list(_oc_cache.labels())) == _oc_y).all())
+
+# OC03: external-memory training — split sizes, trimmed booster, AUC as scored in memory
+_oc_params = {"n_estimators": 200, "learning_rate": 0.2, "early_stopping_rounds": 10}
+_oc_model, _oc_eval = train_out_of_core(_oc_csv, _oc_params, dmatrix="external", cache_dir=Path(tempfile.mkdtemp()))
+_oc_valid = valid_mask(np.arange(len(_sb_loaded)), 0.2)
+_oc_auc = roc_auc_score(_sb_loaded["TARGET"].values[_oc_valid], _oc_model.predict_proba(_oc_X[_oc_valid])[:, 1])
+check("OC03 external-memory fit: rows split by hash, best trees kept, AUC reproducible",
+      _oc_eval["valid_rows"] == int(_oc_valid.sum())
+      and _oc_eval["train_rows"] == len(_sb_loaded) - int(_oc_valid.sum())
+      and _oc_model.get_booster().num_boosted_rounds() == _oc_eval["n_trees"] < 200
+      and abs(_oc_auc - _oc_eval["auc"]) < 1e-3,
+      f"eval={_oc_eval}, sklearn_auc={_oc_auc:.5f}")
+
+# OC04: the cache source trains the same model as the CSV source
+_oc_cache_model, _oc_cache_eval = train_out_of_core(_oc_cache, _oc_params, dmatrix="external")
+check("OC04 cache source == CSV source (same trees, same PDs)",
+      _oc_cache_eval["n_trees"] == _oc_eval["n_trees"]
+      and np.array_equal(_oc_cache_model.predict_proba(_oc_X), _oc_model.predict_proba(_oc_X)))
+
+# OC05: in-memory quantised mode trains comparably; bad arguments raise
+_oc_q_model, _oc_q_eval = train_out_of_core(_oc_csv, _oc_params, dmatrix="quantile")
+_oc_raised = 0
+for _kwargs in ({"dmatrix": "dense"}, {"valid_fraction": 1.0}):
+    try:
+        train_out_of_core(_oc_csv, _oc_params, **_kwargs)
+    except ValueError:
+        _oc_raised += 1
+check("OC05 QuantileDMatrix mode: same split, AUC within 0.03; invalid mode / fraction raise",
+      _oc_q_eval["valid_rows"] == _oc_eval["valid_rows"]
+      and abs(_oc_q_eval["auc"] - _oc_eval["auc"]) < 0.03 and _oc_raised == 2,
+      f"external={_oc_eval['auc']}, quantile={_oc_q_eval['auc']}")
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Summary
 # ──────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,109 @@
+"""
+train_search.py — Parallel hyperparameter search: accuracy vs training time vs serving latency.
+
+Run from quant_analysis/ directory:
+    python scripts/train_search.py [--workers 4] [--threads 2]
+                                   [--max-depth 3 4 6] [--learning-rate 0.05 0.1]
+                                   [--min-child-weight 1 20]
+                                   [--max-latency-us 40] [--save VERSION]
+
+Every grid point is fitted with tree_method="hist" and early stopping on the
+held-out 20%, on a spawned process pool (--workers jobs × --threads XGBoost
+threads each). The table lists fit time, trees kept, held-out AUC / Gini and
+single-row / batch inference latency; * marks the accuracy–latency Pareto
+front. The selected candidate is the most accurate one within --max-latency-us
+(single-row tree-engine latency). With --save it is registered through the
+model registry as models/versions/VERSION for
+POST /api/admin/models/VERSION/activate; "default" and existing versions are
+rejected before any fitting.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data_prep import FEATURE_NAMES, load_data
+from src.model_registry import registry
+from src.training import (
+    DEFAULT_GRID,
+    DEFAULT_PARAMS,
+    _SEARCH_THREADS,
+    _SEARCH_WORKERS,
+    load_candidate,
+    search,
+    select_candidate,
+    split_dataset,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=_SEARCH_WORKERS)
+    parser.add_argument("--threads", type=int, default=_SEARCH_THREADS, help="XGBoost threads per job")
+    parser.add_argument("--max-depth", type=int, nargs="+", default=DEFAULT_GRID["max_depth"])
+    parser.add_argument("--learning-rate", type=float, nargs="+", default=DEFAULT_GRID["learning_rate"])
+    parser.add_argument("--min-child-weight", type=float, nargs="+", default=DEFAULT_GRID["min_child_weight"])
+    parser.add_argument("--max-latency-us", type=float, default=None)
+    parser.add_argument("--save", metavar="VERSION", default=None)
+    args = parser.parse_args()
+    if args.save:
+        try:
+            registry.check_new_version(args.save)
+        except ValueError as exc:
+            sys.exit(str(exc))
+
+    grid = {
+        "max_depth": args.max_depth,
+        "learning_rate": args.learning_rate,
+        "min_child_weight": args.min_child_weight,
+    }
+
+    df = load_data()
+    X_train, X_valid, y_train, y_valid = split_dataset(df)
+    n_candidates = len(args.max_depth) * len(args.learning_rate) * len(args.min_child_weight)
+    print(f"{n_candidates} candidates on {len(X_train):,} train / {len(X_valid):,} valid rows, "
+          f"{args.workers} workers × {args.threads} threads")
+
+    result = search(X_train, y_train, X_valid, y_valid, grid, args.workers, args.threads)
+    candidates = result["candidates"]
+
+    print(f"\n{'depth':>5} {'lr':>6} {'mcw':>5} {'fit s':>7} {'trees':>6} {'AUC':>7} {'Gini':>7} "
+          f"{'engine µs':>10} {'predict µs':>11} {'batch µs/row':>13}")
+    for c in candidates:
+        p, lat = c["params"], c["latency"]
+        engine = f"{lat['engine_row_us']:.1f}" if lat["engine_row_us"] is not None else "n/a"
+        print(f"{p['max_depth']:>5} {p['learning_rate']:>6g} {p['min_child_weight']:>5g} "
+              f"{c['fit_s']:>7.1f} {c['n_trees']:>6} {c['auc']:>7.4f} {c['gini']:>7.4f} "
+              f"{engine:>10} {lat['predict_row_us']:>11.1f} {lat['batch_row_us']:>13.3f}"
+              f"{' *' if c['pareto'] else ''}")
+
+    total_fit = sum(c["fit_s"] for c in candidates)
+    print(f"\nWall time {result['wall_s']:.1f}s for {total_fit:.1f}s of fitting "
+          f"({total_fit / result['wall_s']:.1f}× parallel speed-up)")
+
+    try:
+        best = select_candidate(candidates, args.max_latency_us)
+    except ValueError as exc:
+        sys.exit(str(exc))
+    print(f"\nSelected: {best['params']} — AUC {best['auc']:.4f}, {best['n_trees']} trees")
+
+    if args.save:
+        version = registry.register(load_candidate(best), {
+            "training_rows": len(X_train),
+            "model_type": "XGBClassifier",
+            **{k: v for k, v in DEFAULT_PARAMS.items() if k != "n_estimators"},
+            **best["params"],
+            "n_estimators": best["n_trees"],
+            "validation": {"auc": best["auc"], "gini": best["gini"]},
+            "latency": best["latency"],
+            "imputation_medians": {col: float(df[col].median()) for col in FEATURE_NAMES},
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }, version=args.save)
+        print(f"Registered {version}")
+
+
+if __name__ == "__main__":
+    main()
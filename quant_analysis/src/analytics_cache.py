@@ -0,0 +1,125 @@
+"""
+analytics_cache.py — Memoized analytics results keyed on (model, dataset).
+
+Backtest stats and portfolio returns only change when the model or the data
+changes, yet each call used to re-score the whole dataset. Results here are
+keyed on
+
+    (name, model version, dataset fingerprint)
+
+where the model version is the booster's content hash (``ModelBundle.version``)
+and the dataset fingerprint comes from ``data_prep.dataset_fingerprint``.
+
+- ``peek`` is a lock-protected dict lookup, cheap enough to call on the event
+  loop, so a cached result is returned without an executor hop.
+- ``get_or_compute`` is single-flight: concurrent misses on one key wait for
+  a single computation instead of each re-scoring 307k rows.
+- The model registry fills entries for a candidate model before swapping it
+  in, and the previous model's entries stay cached (up to ``maxsize``), so
+  neither activation nor rollback ever serves a cold backtest.
+
+Results whose key includes client-chosen parameters (seed, paths,
+replicates, ...) go in ``scenario_cache`` instead. Its LRU is separate, so a
+stream of distinct parameters evicts other scenarios, never the dataset PD
+vector, backtest or EDA that every other endpoint depends on.
+
+Configuration (env vars):
+    QUANT_SCENARIO_CACHE_SIZE   max parametrised results (default 16)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable
+
+# Returned by ``peek`` on a miss (None can be a legitimate result)
+MISSING = object()
+
+
+class AnalyticsCache:
+    """Thread-safe, single-flight memo of analytics results."""
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self._results: OrderedDict[tuple, Any] = OrderedDict()
+        self._inflight: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.compute_s: dict[str, float] = {}
+
+    def peek(self, name: str, model_version: str, data_version: str) -> Any:
+        """Return the cached result, or ``MISSING`` — never computes."""
+        key = (name, model_version, data_version)
+        with self._lock:
+            value = self._results.get(key, MISSING)
+            if value is not MISSING:
+                self._results.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def get_or_compute(
+        self,
+        name: str,
+        model_version: str,
+        data_version: str,
+        compute: Callable[[], Any],
+    ) -> Any:
+        """Return the cached result for the key, computing it once on a miss."""
+        key = (name, model_version, data_version)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return self._results[key]
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = Future()
+                self.misses += 1
+
+        if not owner:
+            return pending.result()
+
+        start = time.perf_counter()
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            pending.set_exception(exc)
+            raise
+
+        with self._lock:
+            self._results[key] = value
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+            del self._inflight[key]
+            self.compute_s[name] = round(time.perf_counter() - start, 4)
+        pending.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._results),
+                "maxsize": self.maxsize,
+                "keys": [list(k) for k in self._results],
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "last_compute_s": dict(self.compute_s),
+            }
+
+
+analytics_cache = AnalyticsCache()
+scenario_cache = AnalyticsCache(int(os.environ.get("QUANT_SCENARIO_CACHE_SIZE", "16")))
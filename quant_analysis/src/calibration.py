@@ -0,0 +1,241 @@
+"""
+calibration.py — Grade cut-offs calibrated from the full score distribution.
+
+The A / B / C thresholds are quantiles of the credit-score distribution: A
+starts at the (1 − a_share) quantile, B at the c_share quantile (20 % / 35 % /
+45 % by default, as in ``scorecard.recommend_thresholds``). Instead of sorting
+a sample, scores stream through a mergeable KLL sketch (sketches.py), so
+calibrating on the full dataset, a CSV of any length or live traffic keeps a
+few thousand floats in memory. Sketches built on separate chunks, workers or
+processes ``merge`` into the sketch of the union.
+
+Storage and activation
+----------------------
+A calibration is stored as ``thresholds.json`` next to the model artifact it
+was computed for (``model_trainer.thresholds_path``) and carries that model's
+fingerprint. The bundle loaded for a version picks it up, and activating the
+bundle applies it to ``scorecard.get_risk_grade`` — recalibrating needs no
+code edit or redeploy. ``sync_thresholds`` lets sibling API workers follow a
+calibration written by another process.
+
+Sources
+-------
+``calibrate_pds``     an in-memory PD vector (the API's cached dataset PDs)
+``calibrate_chunks``  DataFrame chunks, scored one at a time
+``calibrate_csv``     the raw CSV via ``data_prep.iter_chunks`` (constant memory)
+``live_calibrator``   every PD served by /api/score and /api/score/batch
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
+
+from .data_prep import DATA_PATH, DEFAULT_CHUNKSIZE, FEATURE_NAMES, iter_chunks
+from .model_trainer import (
+    VERSIONS_DIR,
+    get_active_bundle,
+    get_model,
+    read_thresholds,
+    set_bundle_thresholds,
+    thresholds_path,
+)
+from .scorecard import pd_to_score_array
+from .sketches import KLLSketch
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from xgboost import XGBClassifier
+
+    from .model_trainer import ModelBundle
+
+# Sketch size for calibration: ~0.1 % rank error, ~6k retained scores
+CALIBRATION_K = 2_000
+
+DEFAULT_A_SHARE = 0.20
+DEFAULT_C_SHARE = 0.45
+
+
+class ScoreCalibrator:
+    """
+    Thread-safe quantile sketch of credit scores, tagged with the model that
+    produced them.
+    """
+
+    def __init__(self, k: int = CALIBRATION_K, model_version: str | None = None):
+        self.k = k
+        self.model_version = model_version
+        self._sketch = KLLSketch(k)
+        self._lock = threading.Lock()
+
+    @property
+    def n(self) -> int:
+        return self._sketch.n
+
+    def update_scores(self, scores) -> ScoreCalibrator:
+        with self._lock:
+            self._sketch.update(scores)
+        return self
+
+    def update_pds(self, pds) -> ScoreCalibrator:
+        return self.update_scores(pd_to_score_array(pds))
+
+    def observe(self, model_version: str, pds) -> None:
+        """Add served PDs; starts over when the serving model changes."""
+        scores = pd_to_score_array(pds)
+        with self._lock:
+            if model_version != self.model_version:
+                self.model_version = model_version
+                self._sketch = KLLSketch(self.k)
+            self._sketch.update(scores)
+
+    def merge(self, other: ScoreCalibrator) -> ScoreCalibrator:
+        """Fold ``other`` (same model) into this calibrator."""
+        if None not in (self.model_version, other.model_version) and self.model_version != other.model_version:
+            raise ValueError(
+                f"Cannot merge scores of model {other.model_version} into {self.model_version}"
+            )
+        with self._lock:
+            self._sketch.merge(other._sketch)
+            self.model_version = self.model_version or other.model_version
+        return self
+
+    def thresholds(
+        self,
+        a_share: float = DEFAULT_A_SHARE,
+        c_share: float = DEFAULT_C_SHARE,
+    ) -> dict[str, float]:
+        """
+        A / B cut-offs that put ``a_share`` of scores in A and ``c_share`` in C.
+
+        Raises ValueError for shares outside (0, 1) that overlap, or if no
+        scores have been seen.
+        """
+        if not (0.0 < a_share < 1.0 and 0.0 < c_share < 1.0 and a_share + c_share <= 1.0):
+            raise ValueError(f"Need 0 < a_share, c_share and a_share + c_share <= 1, "
+                             f"got {a_share} / {c_share}")
+        with self._lock:
+            if self._sketch.n == 0:
+                raise ValueError("No scores to calibrate on")
+            return {
+                "A": self._sketch.quantile(1.0 - a_share),
+                "B": self._sketch.quantile(c_share),
+            }
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "model_version": self.model_version,
+                "n_rows": self._sketch.n,
+                "retained": self._sketch.num_retained(),
+            }
+
+
+def calibrate_pds(
+    pds: np.ndarray,
+    model_version: str | None = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> ScoreCalibrator:
+    """Sketch the scores of an in-memory PD vector, ``chunksize`` at a time."""
+    calibrator = ScoreCalibrator(model_version=model_version)
+    pds = np.asarray(pds)
+    for start in range(0, len(pds), chunksize):
+        calibrator.update_pds(pds[start:start + chunksize])
+    return calibrator
+
+
+def calibrate_chunks(
+    chunks: Iterable[pd.DataFrame],
+    model: XGBClassifier | None = None,
+    model_version: str | None = None,
+) -> ScoreCalibrator:
+    """Score each FEATURE_NAMES chunk with ``model`` and sketch the scores."""
+    model = model if model is not None else get_model()
+    calibrator = ScoreCalibrator(model_version=model_version)
+    for chunk in chunks:
+        calibrator.update_pds(model.predict_proba(chunk[FEATURE_NAMES].values)[:, 1])
+    return calibrator
+
+
+def calibrate_csv(
+    path: Path = DATA_PATH,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    medians: dict[str, float] | None = None,
+    model: XGBClassifier | None = None,
+    model_version: str | None = None,
+) -> ScoreCalibrator:
+    """
+    Calibrate on every row of the raw CSV; peak memory is one chunk.
+
+    Pass the model's ``imputation_medians`` to skip the medians pass of
+    ``iter_chunks``.
+    """
+    return calibrate_chunks(iter_chunks(path, chunksize, medians), model, model_version)
+
+
+def threshold_record(
+    calibrator: ScoreCalibrator,
+    source: str,
+    a_share: float = DEFAULT_A_SHARE,
+    c_share: float = DEFAULT_C_SHARE,
+) -> dict:
+    """The stored form of a calibration (``thresholds.json``)."""
+    thresholds = calibrator.thresholds(a_share, c_share)
+    return {
+        "A": round(thresholds["A"], 1),
+        "B": round(thresholds["B"], 1),
+        "a_share": a_share,
+        "c_share": c_share,
+        "n_rows": calibrator.n,
+        "source": source,
+        "fingerprint": calibrator.model_version,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def write_thresholds(record: dict, version: str, versions_dir: Path = VERSIONS_DIR) -> Path:
+    """Store ``record`` for registry ``version``; returns the file written."""
+    path = thresholds_path(version, versions_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(record, indent=2))
+    os.replace(tmp, path)  # atomic — a polling worker never reads half a file
+    return path
+
+
+def apply_thresholds(bundle: ModelBundle, record: dict | None) -> None:
+    """
+    Make ``bundle`` grade with ``record`` (None = scorecard defaults).
+
+    Raises ValueError if ``record`` was calibrated for a different model.
+    """
+    if record is not None and record.get("fingerprint") not in (None, bundle.version):
+        raise ValueError(
+            f"Thresholds were calibrated for model {record['fingerprint']}, not {bundle.version}"
+        )
+    set_bundle_thresholds(bundle, record)
+
+
+def sync_thresholds(bundle: ModelBundle | None = None, versions_dir: Path = VERSIONS_DIR) -> bool:
+    """
+    Re-read the serving version's stored thresholds and apply them if they
+    changed (e.g. written by another worker). Returns True if they did.
+    """
+    bundle = bundle if bundle is not None else get_active_bundle()
+    record = read_thresholds(thresholds_path(bundle.label, versions_dir))
+    if record is not None and record.get("fingerprint") not in (None, bundle.version):
+        record = None  # calibrated for a different booster under the same name
+    if record == bundle.thresholds:
+        return False
+    set_bundle_thresholds(bundle, record)
+    return True
+
+
+# Scores served since the current model was activated
+live_calibrator = ScoreCalibrator()
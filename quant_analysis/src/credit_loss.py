@@ -0,0 +1,223 @@
+"""
+credit_loss.py — Monte Carlo credit-loss distribution for the lender pool.
+
+Model (one-factor Vasicek / Gaussian copula)
+--------------------------------------------
+Each lender's pot is lent, in ``loan_size_gbp`` loans, to borrowers of the
+grade matching their appetite (Conservative → A, Balanced → B, Aggressive → C,
+as in ``calculate_portfolio_returns``); a grade's PD is its historical
+default rate from ``calculate_backtest_stats``. On each path a systematic
+factor Z ~ N(0, 1) moves every borrower together:
+
+    p_g(Z) = Φ( (Φ⁻¹(PD_g) − √ρ · Z) / √(1 − ρ) )
+
+and, given Z, lender i's defaults are Binomial(n_loans_i, p_g(Z)). Loss is
+defaults × loan exposure × LGD. E[p_g(Z)] = PD_g, so expected loss is exactly
+Σ exposure × PD × LGD and the simulation only adds the tail.
+
+Vectorisation and memory
+------------------------
+Paths are simulated in chunks of ``chunk_paths``: one (chunk, 3) matrix of
+conditional PDs and one (chunk, n_lenders) binomial draw per chunk. Only the
+per-path portfolio loss (8 bytes/path) and a per-lender histogram of default
+counts are kept — lender loss quantiles are read off the histogram exactly —
+so memory is independent of the number of paths.
+
+Each chunk draws from its own ``SeedSequence.spawn`` child, so a given seed
+gives the same result for any number of workers. Chunks run on threads
+(NumPy's generators release the GIL) or, with ``pool="process"``, on spawned
+processes.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+import numpy as np
+
+_MC_WORKERS = int(os.environ.get("QUANT_MC_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Grade each appetite lends to (see analytics.calculate_portfolio_returns)
+APPETITE_GRADE = {"Conservative": "A", "Balanced": "B", "Aggressive": "C"}
+_GRADES = ["A", "B", "C"]
+
+DEFAULT_RHO = 0.12           # Basel retail asset correlation range: 0.03–0.16
+DEFAULT_LGD = 0.65
+DEFAULT_LOAN_SIZE_GBP = 500.0
+CONFIDENCE_LEVELS = (0.95, 0.99, 0.999)
+LENDER_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _simulate_chunk(
+    seed: np.random.SeedSequence,
+    n_paths: int,
+    grade_pd: np.ndarray,
+    lender_grade: np.ndarray,
+    n_loans: np.ndarray,
+    loss_per_default: np.ndarray,
+    rho: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Portfolio loss per path and the (n_lenders, max_loans + 1) default-count histogram."""
+    from scipy.special import ndtr, ndtri
+
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal(n_paths)
+    # (paths, grades) conditional PDs — only 3 grades, gathered per lender below
+    cond_pd = ndtr((ndtri(grade_pd)[None, :] - math.sqrt(rho) * z[:, None]) / math.sqrt(1.0 - rho))
+    defaults = rng.binomial(n_loans[None, :], cond_pd[:, lender_grade])
+
+    losses = defaults @ loss_per_default
+    width = int(n_loans.max()) + 1
+    flat = (np.arange(len(n_loans)) * width)[None, :] + defaults
+    histogram = np.bincount(flat.ravel(), minlength=len(n_loans) * width).reshape(len(n_loans), width)
+    return losses, histogram
+
+
+def _tail(losses: np.ndarray, level: float) -> tuple[float, float]:
+    """(VaR, CVaR) at ``level``: the loss quantile and the mean loss beyond it."""
+    var = float(np.quantile(losses, level))
+    tail = losses[losses >= var]
+    return var, float(tail.mean()) if len(tail) else var
+
+
+def _histogram_quantiles(histogram: np.ndarray, qs: tuple[float, ...]) -> np.ndarray:
+    """(n_lenders, len(qs)) default-count quantiles from per-lender count histograms."""
+    cdf = np.cumsum(histogram, axis=1) / histogram.sum(axis=1, keepdims=True)
+    return np.stack([(cdf < q).sum(axis=1) for q in qs], axis=1)
+
+
+def simulate_credit_losses(
+    lenders: list[dict],
+    grade_default_rates: dict[str, dict],
+    n_paths: int = 100_000,
+    rho: float = DEFAULT_RHO,
+    lgd: float = DEFAULT_LGD,
+    loan_size_gbp: float = DEFAULT_LOAN_SIZE_GBP,
+    seed: int = 42,
+    chunk_paths: int = 2_000,
+    workers: int = _MC_WORKERS,
+    pool: str = "thread",
+) -> dict:
+    """
+    Simulate the lender pool's credit-loss distribution over ``n_paths`` paths.
+
+    Parameters
+    ----------
+    lenders             : ``simulation.simulate_lender_pool()`` output
+    grade_default_rates : ``calculate_backtest_stats()`` output (PD per grade)
+    rho                 : asset correlation with the systematic factor, in [0, 1)
+    lgd                 : loss given default, in (0, 1]
+    loan_size_gbp       : exposure per loan — sets each lender's loan count
+    chunk_paths         : paths per vectorised chunk (bounds memory)
+    workers / pool      : chunks run concurrently on ``"thread"`` or ``"process"``
+
+    Returns
+    -------
+    {
+        "n_paths", "n_lenders", "rho", "lgd", "grade_pd",
+        "total_exposure_gbp", "expected_loss_gbp", "expected_loss_pct",
+        "analytic_expected_loss_gbp",
+        "var_gbp":  {"95": float, "99": float, "99.9": float},
+        "cvar_gbp": {...},
+        "by_grade": {"A": {"exposure_gbp", "expected_loss_gbp"}, ...},
+        "lenders":  [{"lender_id", "risk_appetite", "pot_size_gbp",
+                      "expected_loss_gbp", "loss_p50_gbp", "loss_p95_gbp",
+                      "loss_p99_gbp"}, ...],
+        "elapsed_s": float,
+    }
+
+    Raises ValueError for parameters out of range.
+    """
+    if not 0.0 <= rho < 1.0:
+        raise ValueError(f"rho must be in [0, 1), got {rho}")
+    if not 0.0 < lgd <= 1.0:
+        raise ValueError(f"lgd must be in (0, 1], got {lgd}")
+    if n_paths < 1 or chunk_paths < 1 or loan_size_gbp <= 0:
+        raise ValueError("n_paths, chunk_paths and loan_size_gbp must be positive")
+    if pool not in ("thread", "process"):
+        raise ValueError(f"pool must be 'thread' or 'process', got {pool!r}")
+
+    start = time.perf_counter()
+    grade_pd = np.array([grade_default_rates[g]["default_rate"] for g in _GRADES], dtype=float)
+    lender_grade = np.array([_GRADES.index(APPETITE_GRADE[l["risk_appetite"]]) for l in lenders])
+    pots = np.array([l["pot_size_gbp"] for l in lenders], dtype=float)
+    n_loans = np.maximum(1, np.round(pots / loan_size_gbp)).astype(np.int64)
+    loss_per_default = pots / n_loans * lgd
+
+    sizes = [min(chunk_paths, n_paths - s) for s in range(0, n_paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = (grade_pd, lender_grade, n_loans, loss_per_default, rho)
+
+    losses = np.empty(n_paths)
+    histogram = np.zeros((len(lenders), int(n_loans.max()) + 1), dtype=np.int64)
+    offset = 0
+
+    def collect(results):
+        nonlocal offset, histogram
+        for chunk_losses, chunk_hist in results:
+            losses[offset:offset + len(chunk_losses)] = chunk_losses
+            offset += len(chunk_losses)
+            histogram += chunk_hist
+
+    if workers <= 1 or len(sizes) == 1:
+        collect(_simulate_chunk(s, n, *args) for s, n in zip(seeds, sizes))
+    else:
+        executor: Executor
+        if pool == "process":
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            executor = ThreadPoolExecutor(workers, thread_name_prefix="credit-mc")
+        with executor:
+            # map preserves chunk order, so results do not depend on scheduling
+            collect(executor.map(_simulate_chunk, seeds, sizes, *[[a] * len(sizes) for a in args]))
+
+    exposure = float(pots.sum())
+    expected_loss = float(losses.mean())
+    tails = {level: _tail(losses, level) for level in CONFIDENCE_LEVELS}
+    lender_q = _histogram_quantiles(histogram, LENDER_QUANTILES) * loss_per_default[:, None]
+    lender_el = (histogram @ np.arange(histogram.shape[1])) / n_paths * loss_per_default
+
+    by_grade = {}
+    for g_idx, grade in enumerate(_GRADES):
+        mask = lender_grade == g_idx
+        by_grade[grade] = {
+            "exposure_gbp": round(float(pots[mask].sum()), 2),
+            "expected_loss_gbp": round(float(lender_el[mask].sum()), 2),
+        }
+
+    return {
+        "n_paths": n_paths,
+        "n_lenders": len(lenders),
+        "rho": rho,
+        "lgd": lgd,
+        "grade_pd": dict(zip(_GRADES, grade_pd.tolist())),
+        "total_exposure_gbp": round(exposure, 2),
+        "expected_loss_gbp": round(expected_loss, 2),
+        "expected_loss_pct": round(100 * expected_loss / exposure, 4) if exposure else 0.0,
+        "analytic_expected_loss_gbp": round(float((pots * grade_pd[lender_grade]).sum() * lgd), 2),
+        "var_gbp": {_level_key(level): round(v, 2) for level, (v, _) in tails.items()},
+        "cvar_gbp": {_level_key(level): round(c, 2) for level, (_, c) in tails.items()},
+        "by_grade": by_grade,
+        "lenders": [
+            {
+                "lender_id": l["lender_id"],
+                "risk_appetite": l["risk_appetite"],
+                "pot_size_gbp": l["pot_size_gbp"],
+                "expected_loss_gbp": round(float(lender_el[i]), 2),
+                **{f"loss_p{round(q * 100)}_gbp": round(float(lender_q[i, j]), 2)
+                   for j, q in enumerate(LENDER_QUANTILES)},
+            }
+            for i, l in enumerate(lenders)
+        ],
+        "elapsed_s": round(time.perf_counter() - start, 3),
+    }
+
+
+def _level_key(level: float) -> str:
+    return f"{level * 100:g}"
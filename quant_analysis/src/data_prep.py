@@ -3,10 +3,47 @@ data_prep.py — Data loading and proxy column mapping.
 
 Loads the full application_train.csv dataset (~307k rows).
 Falls back to pre-serialized models/sample_data.joblib if CSV is missing.
+
+``iter_chunks`` streams the same cleaned frame in fixed-size chunks (only
+the 7 needed columns, float32 features) for datasets that do not fit in
+memory; ``streaming_medians`` computes the exact imputation medians in one
+bounded-memory pass.
+
+Compact layout
+--------------
+``load_data()`` returns the table as float32 features with int8 TARGET and
+failed_payment_cluster_risk (``COMPACT_DTYPES``) — 22 bytes per row instead of
+56. XGBoost scores in float32 anyway, so predictions and backtests are
+unchanged. Set QUANT_COMPACT_DATA=0 for the wide float64/int64 layout.
+
+Prepared-table cache
+--------------------
+The cleaned table (TARGET + FEATURE_NAMES) is cached as raw NumPy arrays in
+models/dataset/ — one 2-D block per dtype plus manifest.json. ``load_data()``
+memory-maps it — milliseconds instead of a multi-second CSV parse, and every
+worker process shares the same page-cache pages. The manifest records the
+source CSV's size and mtime; a changed CSV rebuilds the cache on next load.
+Set QUANT_DATA_CACHE=0 to bypass it. The cache is only written from the CSV,
+which the Docker image does not ship (data/ and models/dataset/ are
+dockerignored), so it speeds up local runs, not the container.
+
+pandas is imported on first load, not at module import, so the API process can
+bind its port before paying for it.
 """
 
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
 from pathlib import Path
-import pandas as pd
+from typing import TYPE_CHECKING, Iterator
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 DATA_PATH = Path(__file__).parent.parent / "data" / "application_train.csv"
 MODELS_DIR = Path(__file__).parent.parent / "models"
@@ -31,6 +68,24 @@ COLUMN_RENAME_MAP = {
 
 FEATURE_NAMES = list(COLUMN_RENAME_MAP.values())
 
+# Rows per chunk for the streaming readers (~3 MB of float32 features)
+DEFAULT_CHUNKSIZE = 100_000
+
+DATASET_CACHE_DIR = MODELS_DIR / "dataset"
+_USE_DATASET_CACHE = os.environ.get("QUANT_DATA_CACHE", "1") != "0"
+_CACHE_FORMAT = 2
+
+TABLE_COLUMNS = ["TARGET"] + FEATURE_NAMES
+
+# Resident dtypes of the analytics table: XGBoost casts features to float32
+# before scoring, and TARGET / the 1–3 region rating fit in a byte
+COMPACT_DTYPES = {
+    "TARGET": "int8",
+    **{col: "float32" for col in FEATURE_NAMES},
+    "failed_payment_cluster_risk": "int8",
+}
+_COMPACT_DATA = os.environ.get("QUANT_COMPACT_DATA", "1") != "0"
+
 
 def _load_sample() -> pd.DataFrame | None:
     """Load pre-serialized sample data if available."""
@@ -45,11 +100,11 @@ def _load_sample() -> pd.DataFrame | None:
 
 def _load_from_csv() -> pd.DataFrame:
     """Load and process from the full CSV (~307k rows)."""
-    print(f"Loading from CSV: {DATA_PATH}")
-    df = pd.read_csv(DATA_PATH)
+    import pandas as pd
 
+    print(f"Loading from CSV: {DATA_PATH}")
     cols = ["TARGET"] + FEATURE_COLUMNS
-    df = df[cols].copy()
+    df = pd.read_csv(DATA_PATH, usecols=cols)[cols]
 
     # DAYS_EMPLOYED is negative in raw data — convert to positive
     df["DAYS_EMPLOYED"] = df["DAYS_EMPLOYED"].abs()
@@ -64,16 +119,221 @@ def _load_from_csv() -> pd.DataFrame:
     return df
 
 
+def streaming_medians(
+    path: Path = DATA_PATH,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> dict[str, float]:
+    """
+    Exact per-feature medians (as used by ``_load_from_csv``) in one chunked pass.
+
+    Merges per-chunk value counts, so memory is bounded by the number of
+    distinct values per column rather than the number of rows.
+    """
+    import pandas as pd
+
+    counts: dict[str, pd.Series] = {col: pd.Series(dtype="int64") for col in FEATURE_COLUMNS}
+    reader = pd.read_csv(path, usecols=FEATURE_COLUMNS, dtype="float64", chunksize=chunksize)
+    for chunk in reader:
+        chunk["DAYS_EMPLOYED"] = chunk["DAYS_EMPLOYED"].abs()
+        for col in FEATURE_COLUMNS:
+            counts[col] = counts[col].add(chunk[col].value_counts(), fill_value=0)
+
+    medians: dict[str, float] = {}
+    for col, vc in counts.items():
+        vc = vc.sort_index()
+        cum = vc.cumsum().values
+        n = int(cum[-1]) if len(cum) else 0
+        if n == 0:
+            medians[COLUMN_RENAME_MAP[col]] = float("nan")
+            continue
+        # Same definition as Series.median(): mean of the two middle order statistics
+        lo = vc.index[np.searchsorted(cum, (n - 1) // 2 + 1)]
+        hi = vc.index[np.searchsorted(cum, n // 2 + 1)]
+        medians[COLUMN_RENAME_MAP[col]] = float((lo + hi) / 2)
+    return medians
+
+
+def iter_chunks(
+    path: Path = DATA_PATH,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    medians: dict[str, float] | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the cleaned dataset (FEATURE_NAMES + TARGET) ``chunksize`` rows at a time.
+
+    Each chunk gets the same treatment as ``_load_from_csv`` — abs(DAYS_EMPLOYED),
+    renamed columns, median imputation — with features as float32 (what
+    XGBoost scores in anyway) and TARGET as int8. Pass ``medians`` (e.g. the
+    ``imputation_medians`` stored in the model metadata) to skip the extra
+    pass that computes them.
+    """
+    import pandas as pd
+
+    if medians is None:
+        medians = streaming_medians(path, chunksize)
+
+    dtypes = {col: "float32" for col in FEATURE_COLUMNS}
+    dtypes["TARGET"] = "int8"
+    reader = pd.read_csv(path, usecols=["TARGET"] + FEATURE_COLUMNS, dtype=dtypes, chunksize=chunksize)
+    for chunk in reader:
+        chunk["DAYS_EMPLOYED"] = chunk["DAYS_EMPLOYED"].abs()
+        chunk = chunk.rename(columns=COLUMN_RENAME_MAP)
+        yield chunk.fillna(medians)[["TARGET"] + FEATURE_NAMES]
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return TARGET + FEATURE_NAMES of ``df`` in ``COMPACT_DTYPES``.
+
+    Each source column is cast straight into its slot of one preallocated
+    float32 block (pandas keeps it as a single block, no consolidation copy);
+    the int8 columns are rounded first so an imputed median never truncates.
+    """
+    import pandas as pd
+
+    float_cols = [col for col in TABLE_COLUMNS if COMPACT_DTYPES[col] == "float32"]
+    block = np.empty((len(df), len(float_cols)), dtype=np.float32)
+    for i, col in enumerate(float_cols):
+        block[:, i] = df[col].to_numpy()
+
+    out = pd.DataFrame(block, columns=float_cols, index=df.index, copy=False)
+    for loc, col in enumerate(TABLE_COLUMNS):
+        if COMPACT_DTYPES[col] == "int8":
+            out.insert(loc, col, np.rint(df[col].to_numpy()).astype(np.int8))
+    return out
+
+
+def _frame_layout(df: pd.DataFrame) -> str:
+    compact = all(str(df[col].dtype) == COMPACT_DTYPES[col] for col in TABLE_COLUMNS)
+    return "compact" if compact else "wide"
+
+
+def _source_stamp(path: Path) -> dict:
+    stat = path.stat()
+    return {"path": path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_dataset_cache(
+    df: pd.DataFrame,
+    cache_dir: Path = DATASET_CACHE_DIR,
+    source: Path | None = None,
+) -> Path:
+    """
+    Write TARGET + FEATURE_NAMES as one .npy block per dtype plus a manifest;
+    returns the manifest path. Dtypes are kept as-is (compact or wide).
+
+    The manifest is written last, so a half-written cache is never loaded.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = cache_dir / "manifest.json"
+    manifest_path.unlink(missing_ok=True)
+    for stale in cache_dir.glob("*.npy"):
+        stale.unlink()
+
+    groups: dict[str, list[str]] = {}
+    for col in TABLE_COLUMNS:
+        groups.setdefault(str(df[col].dtype), []).append(col)
+
+    blocks = []
+    for dtype, cols in groups.items():
+        block = np.empty((len(df), len(cols)), dtype=dtype)
+        for j, col in enumerate(cols):
+            block[:, j] = df[col].to_numpy()
+        filename = f"{dtype}.npy"
+        np.save(cache_dir / filename, block)
+        blocks.append({"file": filename, "dtype": dtype, "columns": cols})
+
+    manifest_path.write_text(json.dumps({
+        "format": _CACHE_FORMAT,
+        "n_rows": len(df),
+        "columns": TABLE_COLUMNS,
+        "layout": _frame_layout(df),
+        "blocks": blocks,
+        "source": _source_stamp(source) if source is not None and source.exists() else None,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }, indent=2))
+    return manifest_path
+
+
+def load_dataset_cache(
+    cache_dir: Path = DATASET_CACHE_DIR,
+    source: Path | None = None,
+    layout: str | None = None,
+) -> pd.DataFrame | None:
+    """
+    Memory-map the prepared-table cache as a DataFrame, or None if it is
+    missing, from another format or ``layout`` ("compact" / "wide"), or stale
+    relative to ``source``.
+
+    The largest block wraps the read-only memmap without copying; columns from
+    the smaller blocks are inserted alongside it.
+    """
+    manifest_path = cache_dir / "manifest.json"
+    if not manifest_path.exists():
+        return None
+    manifest = json.loads(manifest_path.read_text())
+    if manifest.get("format") != _CACHE_FORMAT or manifest.get("columns") != TABLE_COLUMNS:
+        return None
+    if layout is not None and manifest.get("layout") != layout:
+        return None
+    if source is not None and source.exists() and manifest.get("source") != _source_stamp(source):
+        return None
+
+    import pandas as pd
+
+    blocks = [
+        (b["columns"], np.load(cache_dir / b["file"], mmap_mode="r"))
+        for b in manifest["blocks"]
+    ]
+    base_cols, base = max(blocks, key=lambda b: b[1].nbytes)
+    df = pd.DataFrame(base, columns=base_cols, copy=False)
+    for loc, col in enumerate(TABLE_COLUMNS):
+        if col in base_cols:
+            continue
+        cols, block = next(b for b in blocks if col in b[0])
+        df.insert(loc, col, block[:, cols.index(col)])
+    return df
+
+
 def load_data() -> pd.DataFrame:
     """
-    Load full dataset — prefers CSV for complete data, falls back to joblib.
+    Load full dataset — memory-mapped cache first, then CSV (which refreshes
+    the cache), then the joblib sample. Compact dtypes unless
+    QUANT_COMPACT_DATA=0.
     """
+    layout = "compact" if _COMPACT_DATA else "wide"
+    if _USE_DATASET_CACHE:
+        cached = load_dataset_cache(source=DATA_PATH, layout=layout)
+        if cached is not None:
+            print(f"Loading prepared dataset from {DATASET_CACHE_DIR} (memory-mapped)")
+            return cached
     if DATA_PATH.exists():
-        return _load_from_csv()
+        df = _load_from_csv()
+        if _COMPACT_DATA:
+            df = compact_frame(df)
+        if _USE_DATASET_CACHE:
+            try:
+                write_dataset_cache(df, source=DATA_PATH)
+            except OSError as exc:  # read-only image: keep serving from the parsed CSV
+                print(f"Could not write dataset cache to {DATASET_CACHE_DIR}: {exc}")
+        return df
     sample = _load_sample()
     if sample is not None:
         print("CSV not found, using pre-serialized sample_data.joblib")
-        return sample
+        return compact_frame(sample) if _COMPACT_DATA else sample
     raise FileNotFoundError(
         f"No data source found. Place application_train.csv at {DATA_PATH}"
     )
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Short content hash of the modelling columns (FEATURE_NAMES + TARGET).
+
+    Uses ``pd.util.hash_pandas_object`` (vectorised, ~50 ms for 307k rows) so
+    analytics results can be memoized per dataset — see analytics_cache.py.
+    """
+    import pandas as pd
+
+    row_hashes = pd.util.hash_pandas_object(df[FEATURE_NAMES + ["TARGET"]], index=False)
+    return hashlib.sha256(row_hashes.values.tobytes()).hexdigest()[:12]
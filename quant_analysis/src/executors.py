@@ -0,0 +1,73 @@
+"""
+executors.py — Dedicated, size-limited thread pools per workload class.
+
+API endpoints are ``async def``; CPU-bound work is sent to the pool for its
+workload class so a burst of slow SHAP or backtest calls queues behind its
+own pool instead of starving /api/score:
+
+    scoring    batch scoring, stress tests       QUANT_SCORING_WORKERS   (default 4)
+    explain    SHAP explanations                 QUANT_EXPLAIN_WORKERS   (default 2)
+    forecast   Gamma spend forecasts             QUANT_FORECAST_WORKERS  (default 2)
+    analytics  backtest, EDA, book stress        QUANT_ANALYTICS_WORKERS (default 1)
+    admin      model activation / pointer sync   QUANT_ADMIN_WORKERS     (default 1)
+
+Single-row scoring does not use a pool at all — it awaits the micro-batching
+scheduler's Future directly.
+
+XGBoost's own OpenMP threads are capped separately by QUANT_XGB_NTHREAD (see
+model_trainer), so the worst case is sum(pool sizes) × QUANT_XGB_NTHREAD
+threads rather than every request fanning out to every core.
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+WORKLOAD_POOL_SIZES: dict[str, int] = {
+    "scoring": int(os.environ.get("QUANT_SCORING_WORKERS", "4")),
+    "explain": int(os.environ.get("QUANT_EXPLAIN_WORKERS", "2")),
+    "forecast": int(os.environ.get("QUANT_FORECAST_WORKERS", "2")),
+    "analytics": int(os.environ.get("QUANT_ANALYTICS_WORKERS", "1")),
+    "admin": int(os.environ.get("QUANT_ADMIN_WORKERS", "1")),
+}
+
+_pools: dict[str, ThreadPoolExecutor] = {}
+
+
+def get_executor(workload: str) -> ThreadPoolExecutor:
+    """Return (creating on first use) the pool for ``workload``."""
+    if workload not in WORKLOAD_POOL_SIZES:
+        raise KeyError(f"Unknown workload class: {workload}")
+    if workload not in _pools:
+        _pools[workload] = ThreadPoolExecutor(
+            max_workers=WORKLOAD_POOL_SIZES[workload],
+            thread_name_prefix=f"{workload}-worker",
+        )
+    return _pools[workload]
+
+
+async def run_in(workload: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run ``fn(*args, **kwargs)`` on the ``workload`` pool and await the result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(workload), functools.partial(fn, *args, **kwargs)
+    )
+
+
+def executor_stats() -> dict:
+    """Pool sizes and queued-task counts for /api/metrics."""
+    return {
+        name: {
+            "max_workers": size,
+            "queued": _pools[name]._work_queue.qsize() if name in _pools else 0,
+        }
+        for name, size in WORKLOAD_POOL_SIZES.items()
+    }
+
+
+def shutdown_executors() -> None:
+    for pool in _pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _pools.clear()
@@ -1,36 +1,143 @@
 """
 explainability.py — SHAP value generation for waterfall chart data.
+
+Two backends compute the same exact TreeSHAP values:
+
+    native  XGBoost's own ``Booster.predict(pred_contribs=True)`` — no shap
+            import, no explainer object (default)
+    shap    ``shap.TreeExplainer`` — kept for parity checks and for anything
+            that needs the shap package's richer outputs
+
+Pick one per call (``backend=``) or process-wide with QUANT_EXPLAIN_BACKEND.
+scripts/benchmark_explain.py compares their latency and checks parity.
+
+Global explanations (mean |SHAP|, per-feature SHAP distributions and
+dependence data over the sample set) are computed in one batched pass and
+stored next to the model artifact as global_explanations.json, so
+/api/explain/global only ever reads a cached artifact.
 """
 
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
 import numpy as np
-import pandas as pd
-import shap
 
 from .data_prep import FEATURE_NAMES
-from .model_trainer import get_model
+from .model_trainer import ModelBundle, get_active_bundle, version_paths
+from .pd_cache import quantize_features, shap_cache
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+    import shap
+
+EXPLAIN_BACKENDS = ("native", "shap")
+DEFAULT_BACKEND = os.environ.get("QUANT_EXPLAIN_BACKEND", "native")
+
+GLOBAL_EXPLANATIONS_FILE = "global_explanations.json"
+_SHAP_QUANTILES = (5, 25, 50, 75, 95)
+
+
+def build_explainer(bundle: ModelBundle) -> shap.TreeExplainer:
+    """Build the TreeExplainer for ``bundle`` — registered as a model_registry warmer."""
+    import shap  # deferred: importing shap costs seconds
 
-_explainer: shap.TreeExplainer | None = None
+    return shap.TreeExplainer(bundle.model)
 
 
-def _get_explainer() -> shap.TreeExplainer:
-    global _explainer
-    if _explainer is None:
-        model = get_model()
-        _explainer = shap.TreeExplainer(model)
-    return _explainer
+def _get_explainer(bundle: ModelBundle) -> shap.TreeExplainer:
+    # Lives on the bundle so a model swap brings its own (pre-warmed) explainer
+    explainer = bundle.derived.get("shap_explainer")
+    if explainer is None:
+        explainer = bundle.derived["shap_explainer"] = build_explainer(bundle)
+    return explainer
+
+
+def _base_value(explainer: shap.TreeExplainer) -> float:
+    expected = explainer.expected_value
+    if isinstance(expected, (list, np.ndarray)):
+        return float(np.ravel(expected)[-1])
+    return float(expected)
+
+
+def _native_matrix(bundle: ModelBundle, rows: list[tuple] | np.ndarray) -> tuple[np.ndarray, float]:
+    """SHAP values straight from the booster: ((n, n_features), base value)."""
+    from xgboost import DMatrix
+
+    booster = bundle.model.get_booster()
+    dmatrix = DMatrix(np.asarray(rows, dtype=float), feature_names=booster.feature_names)
+    # (n, n_features + 1): per-feature contributions, then the bias (base margin)
+    contribs = booster.predict(dmatrix, pred_contribs=True)
+    return contribs[:, :-1].astype(float), float(contribs[0, -1])
+
+
+def _shap_matrix(bundle: ModelBundle, rows: list[tuple] | np.ndarray) -> tuple[np.ndarray, float]:
+    """SHAP values for ``rows`` in one TreeExplainer pass: ((n, n_features), base value)."""
+    import pandas as pd
+
+    explainer = _get_explainer(bundle)
+    shap_values = explainer.shap_values(pd.DataFrame(rows, columns=FEATURE_NAMES))
+
+    # XGBoost binary: shap_values is shape (n, n_features) for class 1
+    if isinstance(shap_values, list):
+        shap_values = shap_values[1]
+    return np.asarray(shap_values, dtype=float).reshape(len(rows), -1), _base_value(explainer)
 
 
-def get_shap_explanation(features: list[float] | np.ndarray) -> dict:
+def _top_contributors(values: tuple[float, ...], base_value: float, top_k: int) -> dict:
+    paired = list(zip(FEATURE_NAMES, values))
+
+    positive = sorted(
+        [p for p in paired if p[1] > 0], key=lambda x: x[1], reverse=True
+    )[:top_k]
+    negative = sorted(
+        [p for p in paired if p[1] < 0], key=lambda x: x[1]
+    )[:top_k]
+
+    return {
+        "base_value": base_value,
+        "positive": [{"feature": f, "shap_value": round(v, 6)} for f, v in positive],
+        "negative": [{"feature": f, "shap_value": round(v, 6)} for f, v in negative],
+    }
+
+
+def contribution_matrix(
+    bundle: ModelBundle,
+    rows: list[tuple] | np.ndarray,
+    backend: str | None = None,
+) -> tuple[np.ndarray, float]:
+    """Uncached SHAP values for ``rows``: ((n, n_features) array, base value in log-odds)."""
+    backend = backend or DEFAULT_BACKEND
+    if backend == "native":
+        return _native_matrix(bundle, rows)
+    if backend == "shap":
+        return _shap_matrix(bundle, rows)
+    raise ValueError(f"Unknown explanation backend {backend!r}; expected one of {EXPLAIN_BACKENDS}")
+
+
+def get_shap_explanation(
+    features: list[float] | np.ndarray,
+    top_k: int = 3,
+    backend: str | None = None,
+) -> dict:
     """
     Compute SHAP values for a single borrower and return the top 3 positive
     and top 3 negative contributors as a JSON-serialisable dict.
 
+    SHAP vectors are memoized per (model version, quantized features) — see
+    pd_cache — and shared with ``get_shap_explanations_batch``.
+
     Parameters
     ----------
     features : array-like of length 6
         Ordered: annual_inflow, avg_monthly_balance, days_since_account_open,
         primary_bank_health_score, secondary_bank_health_score,
         failed_payment_cluster_risk
+    top_k : contributors returned per sign
+    backend : "native" or "shap" (default QUANT_EXPLAIN_BACKEND)
 
     Returns
     -------
@@ -40,33 +147,182 @@ def get_shap_explanation(features: list[float] | np.ndarray) -> dict:
         "base_value": float,
     }
     """
-    arr = np.array(features, dtype=float).reshape(1, -1)
-    df_row = pd.DataFrame(arr, columns=FEATURE_NAMES)
+    return get_shap_explanations_batch([features], top_k=top_k, backend=backend)[0]
 
-    explainer = _get_explainer()
-    shap_values = explainer.shap_values(df_row)
 
-    # XGBoost binary: shap_values is shape (1, n_features) for class 1
-    if isinstance(shap_values, list):
-        vals = shap_values[1][0]
-    else:
-        vals = shap_values[0]
+def get_shap_explanations_batch(
+    features: list[list[float]] | np.ndarray,
+    top_k: int = 3,
+    backend: str | None = None,
+) -> list[dict]:
+    """
+    Explain N borrowers with one vectorised TreeExplainer call.
 
-    paired = list(zip(FEATURE_NAMES, vals.tolist()))
+    Rows already in the SHAP cache are skipped and duplicate rows are
+    computed once, so a portfolio costs roughly one SHAP pass over its
+    distinct uncached borrowers.
 
-    positive = sorted(
-        [p for p in paired if p[1] > 0], key=lambda x: x[1], reverse=True
-    )[:3]
-    negative = sorted(
-        [p for p in paired if p[1] < 0], key=lambda x: x[1]
-    )[:3]
+    Parameters
+    ----------
+    features : array-like of shape (n_borrowers, 6), ordered as in
+        ``get_shap_explanation``
+    top_k : contributors returned per sign for every row
+    backend : "native" or "shap" (default QUANT_EXPLAIN_BACKEND)
+
+    Returns
+    -------
+    One ``get_shap_explanation``-shaped dict per row, in input order.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in EXPLAIN_BACKENDS:
+        raise ValueError(f"Unknown explanation backend {backend!r}; expected one of {EXPLAIN_BACKENDS}")
+
+    arr = np.asarray(features, dtype=float).reshape(-1, len(FEATURE_NAMES))
+    keys = [quantize_features(r) for r in arr]
+
+    bundle = get_active_bundle()
+    version = bundle.version
+    found: dict[tuple, tuple] = {}
+    for key in keys:
+        if key not in found:
+            cached = shap_cache.get(version, (backend,) + key)
+            if cached is not None:
+                found[key] = cached
+
+    # First row of each uncached key — the model explains the row as given
+    misses: dict[tuple, int] = {}
+    for i, key in enumerate(keys):
+        if key not in found and key not in misses:
+            misses[key] = i
+    if misses:
+        matrix, base_value = contribution_matrix(bundle, arr[list(misses.values())], backend)
+        for key, values in zip(misses, matrix):
+            # Cache the full vector so any top_k can be served from it
+            entry = (base_value, tuple(values.tolist()))
+            shap_cache.put(version, (backend,) + key, entry)
+            found[key] = entry
+
+    return [_top_contributors(found[key][1], found[key][0], top_k) for key in keys]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Global explanations
+# ─────────────────────────────────────────────────────────────────────────────
+
+def compute_global_explanations(
+    bundle: ModelBundle,
+    X: npt.ArrayLike,
+    backend: str | None = None,
+    n_bins: int = 20,
+    max_points: int = 500,
+    seed: int = 42,
+) -> dict:
+    """
+    Summarise SHAP values over a sample set in one batched computation.
+
+    Parameters
+    ----------
+    bundle     : model bundle to explain
+    X          : (n_rows, n_features) sample, columns ordered as FEATURE_NAMES
+    n_bins     : histogram bins for SHAP distributions / quantile bins for
+                 dependence curves
+    max_points : dependence scatter points kept per feature
+
+    Returns
+    -------
+    {
+        "model_version": str, "n_rows": int, "base_value": float,
+        "importance": [{"feature", "mean_abs_shap"}, ...],   # descending
+        "features": {
+            <feature>: {
+                "distribution": {"bin_edges", "counts", "quantiles": {"p5", ...}},
+                "dependence": {
+                    "points": {"feature_value": [...], "shap_value": [...]},
+                    "curve":  {"feature_value": [...], "mean_shap": [...], "n": [...]},
+                },
+            },
+        },
+    }
+    """
+    X = np.asarray(X, dtype=float).reshape(-1, len(FEATURE_NAMES))
+    contribs, base_value = contribution_matrix(bundle, X, backend)
+    mean_abs = np.abs(contribs).mean(axis=0)
 
-    base_value = float(explainer.expected_value)
-    if isinstance(explainer.expected_value, (list, np.ndarray)):
-        base_value = float(explainer.expected_value[1])
+    rng = np.random.default_rng(seed)
+    scatter_idx = rng.choice(len(X), size=min(max_points, len(X)), replace=False)
 
+    features: dict[str, dict] = {}
+    for i, name in enumerate(FEATURE_NAMES):
+        x, phi = X[:, i], contribs[:, i]
+
+        counts, edges = np.histogram(phi, bins=n_bins)
+        distribution = {
+            "bin_edges": np.round(edges, 6).tolist(),
+            "counts": counts.tolist(),
+            "quantiles": {f"p{q}": round(float(v), 6)
+                          for q, v in zip(_SHAP_QUANTILES, np.percentile(phi, _SHAP_QUANTILES))},
+        }
+
+        order = scatter_idx[np.argsort(x[scatter_idx], kind="stable")]
+        # Quantile bins of the feature; discrete features collapse to their distinct values
+        bin_edges = np.unique(np.quantile(x, np.linspace(0, 1, n_bins + 1)))
+        n_bins_x = max(len(bin_edges) - 1, 1)
+        bin_idx = np.clip(np.searchsorted(bin_edges, x, side="right") - 1, 0, n_bins_x - 1)
+        n_per_bin = np.bincount(bin_idx, minlength=n_bins_x)
+        occupied = n_per_bin > 0
+        mean_x = np.bincount(bin_idx, weights=x, minlength=n_bins_x)[occupied] / n_per_bin[occupied]
+        mean_phi = np.bincount(bin_idx, weights=phi, minlength=n_bins_x)[occupied] / n_per_bin[occupied]
+
+        features[name] = {
+            "distribution": distribution,
+            "dependence": {
+                "points": {
+                    "feature_value": np.round(x[order], 4).tolist(),
+                    "shap_value": np.round(phi[order], 6).tolist(),
+                },
+                "curve": {
+                    "feature_value": np.round(mean_x, 4).tolist(),
+                    "mean_shap": np.round(mean_phi, 6).tolist(),
+                    "n": n_per_bin[occupied].tolist(),
+                },
+            },
+        }
+
+    ranking = sorted(zip(FEATURE_NAMES, mean_abs.tolist()), key=lambda kv: kv[1], reverse=True)
     return {
-        "base_value": base_value,
-        "positive": [{"feature": f, "shap_value": round(v, 6)} for f, v in positive],
-        "negative": [{"feature": f, "shap_value": round(v, 6)} for f, v in negative],
+        "model_version": bundle.version,
+        "n_rows": len(X),
+        "base_value": round(base_value, 6),
+        "importance": [{"feature": f, "mean_abs_shap": round(v, 6)} for f, v in ranking],
+        "features": features,
     }
+
+
+def global_explanations_path(version: str) -> Path:
+    """Where a registry version's global explanations live (next to its model)."""
+    return version_paths(version)[0].parent / GLOBAL_EXPLANATIONS_FILE
+
+
+def load_global_explanations(
+    bundle: ModelBundle,
+    sample: Callable[[], npt.ArrayLike],
+    path: Path | None = None,
+) -> dict:
+    """
+    Return the stored global explanations for ``bundle``, computing and
+    storing them first if the artifact is missing or belongs to another model.
+
+    ``sample`` is only called on a miss — it returns the rows to explain.
+    """
+    path = path if path is not None else global_explanations_path(bundle.label)
+    if path.exists():
+        stored = json.loads(path.read_text())
+        if stored.get("model_version") == bundle.version:
+            return stored
+
+    result = compute_global_explanations(bundle, sample())
+    try:
+        path.write_text(json.dumps(result))
+    except OSError as exc:  # read-only image: serve from memory, recompute next boot
+        print(f"Could not store global explanations at {path}: {exc}")
+    return result
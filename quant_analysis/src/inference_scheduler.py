@@ -0,0 +1,243 @@
+"""
+inference_scheduler.py — Micro-batching between the API endpoints and the model.
+
+Concurrent /api/score, /api/transaction and /api/stress-test requests each
+need one or two PDs. Instead of every request thread calling the model on its
+own, requests enqueue their rows and a single worker thread:
+
+1. Blocks until the first job arrives
+2. Keeps collecting jobs for up to ``window_ms`` or until ``max_batch_rows``
+3. Runs ONE ``get_pd_batch`` call over the stacked rows (the tree engine for
+   up to QUANT_ENGINE_MAX_ROWS rows, ``predict_proba`` above that)
+4. Fans the PDs back to each waiting request's Future
+
+Single-borrower ``predict`` calls consult ``pd_cache`` first, so repeat
+borrowers never enter the queue.
+
+Configuration (env vars, read at construction):
+    QUANT_BATCH_WINDOW_MS     collection window in ms   (default 2; 0 = drain-only)
+    QUANT_BATCH_MAX_ROWS      rows per model call cap   (default 256)
+
+``python scripts/benchmark_scheduler.py`` compares throughput and latency
+against one model call per request, with the share of batches on each path.
+"""
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from .data_prep import FEATURE_NAMES
+from .model_trainer import get_model_version, get_pd_batch
+from .pd_cache import pd_cache, quantize_features
+
+_STOP = object()
+
+# Batch-size histogram buckets (inclusive upper bounds)
+_HISTOGRAM_BOUNDS = [1, 4, 16, 64, 256]
+
+
+class _Job:
+    __slots__ = ("rows", "future")
+
+    def __init__(self, rows: np.ndarray):
+        self.rows = rows
+        self.future: Future = Future()
+
+
+class InferenceScheduler:
+    """Coalesce concurrent PD requests into batched model calls."""
+
+    def __init__(
+        self,
+        predict_batch=get_pd_batch,
+        window_ms: float | None = None,
+        max_batch_rows: int | None = None,
+    ):
+        self._predict_batch = predict_batch
+        self.window_s = (
+            window_ms if window_ms is not None
+            else float(os.environ.get("QUANT_BATCH_WINDOW_MS", "2"))
+        ) / 1_000
+        self.max_batch_rows = (
+            max_batch_rows if max_batch_rows is not None
+            else int(os.environ.get("QUANT_BATCH_MAX_ROWS", "256"))
+        )
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._pending_rows = 0
+        self._max_pending_rows = 0
+        self._batches = 0
+        self._rows = 0
+        self._max_batch = 0
+        self._last_batch = 0
+        self._histogram = [0] * (len(_HISTOGRAM_BOUNDS) + 1)
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="inference-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def submit(self, rows: list[float] | list[list[float]] | np.ndarray) -> Future:
+        """Enqueue one or more feature rows; the Future resolves to their PD array."""
+        job = _Job(np.asarray(rows, dtype=float).reshape(-1, len(FEATURE_NAMES)))
+        if not self.running:
+            # No worker (e.g. module imported outside the app lifespan) — score inline
+            try:
+                job.future.set_result(self._predict_batch(job.rows))
+            except Exception as exc:
+                job.future.set_exception(exc)
+            return job.future
+
+        with self._lock:
+            self._pending_rows += len(job.rows)
+            self._max_pending_rows = max(self._max_pending_rows, self._pending_rows)
+        self._queue.put(job)
+        return job.future
+
+    def predict_batch(self, rows: list[list[float]] | np.ndarray) -> np.ndarray:
+        """Blocking batched PDs for ``rows`` — drop-in for ``get_pd_batch``."""
+        return self.submit(rows).result()
+
+    def predict(self, features: list[float] | np.ndarray) -> float:
+        """
+        Blocking PD for one borrower — drop-in for ``get_pd``.
+
+        Cache hits (see pd_cache) return immediately without being queued.
+        """
+        row = np.asarray(features, dtype=float).reshape(-1)
+        key = quantize_features(row)
+        version = get_model_version()
+        cached = pd_cache.get(version, key)
+        if cached is not None:
+            return cached
+
+        pd_value = float(self.submit(row).result()[0])
+        pd_cache.put(version, key, pd_value)
+        return pd_value
+
+    async def predict_async(self, features: list[float] | np.ndarray) -> float:
+        """Awaitable ``predict`` — the event loop is free while the batch runs."""
+        row = np.asarray(features, dtype=float).reshape(-1)
+        key = quantize_features(row)
+        version = get_model_version()
+        cached = pd_cache.get(version, key)
+        if cached is not None:
+            return cached
+
+        pd_value = float((await asyncio.wrap_future(self.submit(row)))[0])
+        pd_cache.put(version, key, pd_value)
+        return pd_value
+
+    def metrics(self) -> dict:
+        """Queue-depth and batch-size counters for /api/metrics."""
+        with self._lock:
+            labels = []
+            lo = 1
+            for hi in _HISTOGRAM_BOUNDS:
+                labels.append(str(lo) if lo == hi else f"{lo}-{hi}")
+                lo = hi + 1
+            labels.append(f"{lo}+")
+            return {
+                "running": self.running,
+                "window_ms": round(self.window_s * 1_000, 3),
+                "max_batch_rows": self.max_batch_rows,
+                "queue_depth_rows": self._pending_rows,
+                "max_queue_depth_rows": self._max_pending_rows,
+                "batches_total": self._batches,
+                "rows_total": self._rows,
+                "mean_batch_rows": round(self._rows / self._batches, 3) if self._batches else 0.0,
+                "max_batch_rows_seen": self._max_batch,
+                "last_batch_rows": self._last_batch,
+                "batch_rows_histogram": dict(zip(labels, self._histogram)),
+            }
+
+    # ── Worker ────────────────────────────────────────────────────────────────
+
+    def _collect(self, first: _Job) -> tuple[list[_Job], bool]:
+        """Gather jobs behind ``first`` until the window closes or the batch fills."""
+        jobs = [first]
+        n_rows = len(first.rows)
+        deadline = time.monotonic() + self.window_s
+        while n_rows < self.max_batch_rows:
+            timeout = deadline - time.monotonic()
+            try:
+                job = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is _STOP:
+                return jobs, True
+            jobs.append(job)
+            n_rows += len(job.rows)
+        return jobs, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            jobs, stopping = self._collect(first)
+            self._execute(jobs)
+
+        # Drain anything that raced in behind the stop sentinel
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not _STOP:
+                self._execute([job])
+
+    def _execute(self, jobs: list[_Job]) -> None:
+        rows = np.vstack([job.rows for job in jobs]) if len(jobs) > 1 else jobs[0].rows
+        n_rows = len(rows)
+
+        with self._lock:
+            self._pending_rows -= n_rows
+            self._batches += 1
+            self._rows += n_rows
+            self._max_batch = max(self._max_batch, n_rows)
+            self._last_batch = n_rows
+            bucket = next(
+                (i for i, hi in enumerate(_HISTOGRAM_BOUNDS) if n_rows <= hi),
+                len(_HISTOGRAM_BOUNDS),
+            )
+            self._histogram[bucket] += 1
+
+        try:
+            pds = self._predict_batch(rows)
+        except Exception as exc:
+            for job in jobs:
+                job.future.set_exception(exc)
+            return
+
+        offset = 0
+        for job in jobs:
+            n = len(job.rows)
+            job.future.set_result(pds[offset:offset + n])
+            offset += n
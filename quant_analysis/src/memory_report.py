@@ -0,0 +1,108 @@
+"""
+memory_report.py — What the API process keeps resident.
+
+``resident_report`` breaks the process RSS down into the pieces this service
+owns: the analytics table (per column, and whether it is a file mapping), the
+active model's booster and tree engine, and the result caches. It is served
+under ``memory`` in /api/metrics; ``scripts/memory_report.py`` compares the
+compact and wide table layouts in fresh interpreters.
+
+RSS comes from /proc/self/status (VmRSS / VmHWM) on Linux and falls back to
+``resource.getrusage`` peak RSS elsewhere.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .model_trainer import ModelBundle
+
+_MB = 1024 * 1024
+
+# TreeEngine arrays (see tree_engine.py)
+_ENGINE_ARRAYS = ("feature", "threshold", "children", "default_right", "leaf_value", "roots")
+
+
+def process_memory() -> dict:
+    """Current and peak resident set size of this process, in MB."""
+    try:
+        with open("/proc/self/status") as fh:
+            fields = dict(line.split(":", 1) for line in fh if ":" in line)
+        return {
+            "rss_mb": round(int(fields["VmRSS"].split()[0]) / 1024, 1),
+            "peak_rss_mb": round(int(fields["VmHWM"].split()[0]) / 1024, 1),
+        }
+    except (OSError, KeyError, ValueError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KB on Linux, bytes on macOS
+        peak_mb = peak / _MB if sys.platform == "darwin" else peak / 1024
+        return {"rss_mb": None, "peak_rss_mb": round(peak_mb, 1)}
+
+
+def _is_memmap(values: np.ndarray) -> bool:
+    base = values
+    while base is not None:
+        if isinstance(base, np.memmap):
+            return True
+        base = getattr(base, "base", None)
+    return False
+
+
+def frame_memory(df: pd.DataFrame) -> dict:
+    """Bytes held by each column of ``df`` (shallow — numeric columns only here)."""
+    columns = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        columns[col] = {
+            "dtype": str(values.dtype),
+            "mb": round(values.nbytes / _MB, 3),
+            "memory_mapped": _is_memmap(values),
+        }
+    return {
+        "rows": len(df),
+        "mb": round(float(df.memory_usage(index=True, deep=False).sum()) / _MB, 3),
+        "columns": columns,
+    }
+
+
+def bundle_memory(bundle: ModelBundle) -> dict:
+    """Serialized booster size and tree-engine array bytes for a model bundle."""
+    booster_bytes = len(bundle.model.get_booster().save_raw("ubj"))
+    engine_bytes = 0
+    if bundle.engine is not None:
+        engine_bytes = sum(getattr(bundle.engine, name).nbytes for name in _ENGINE_ARRAYS)
+    return {
+        "version": bundle.label,
+        "booster_mb": round(booster_bytes / _MB, 3),
+        "engine_mb": round(engine_bytes / _MB, 3),
+        "derived": sorted(bundle.derived),
+    }
+
+
+def resident_report(
+    df: pd.DataFrame | None = None,
+    bundle: ModelBundle | None = None,
+    caches: dict | None = None,
+) -> dict:
+    """
+    Process RSS plus the table, model and cache sizes that make it up.
+
+    ``caches`` maps a name to an object with ``stats()`` (pd/shap/analytics
+    caches); only their entry counts are reported.
+    """
+    report = {"process": process_memory()}
+    if df is not None:
+        report["dataset"] = frame_memory(df)
+    if bundle is not None:
+        report["model"] = bundle_memory(bundle)
+    if caches:
+        report["caches"] = {name: cache.stats().get("size") for name, cache in caches.items()}
+    return report
@@ -0,0 +1,287 @@
+"""
+model_registry.py — Versioned model artifacts with zero-downtime activation.
+
+Layout
+------
+    models/xgboost_model.ubj               version "default" (the baked-in artifact)
+    models/versions/<version>/xgboost_model.ubj
+    models/versions/<version>/metadata.json
+    models/versions/<version>/global_explanations.json   (written on first activation)
+    models/versions/<version>/thresholds.json            (calibrated grade cut-offs, optional)
+    models/versions/ACTIVE                 name of the version to serve
+
+Activating a version
+--------------------
+1. Load the artifact into a fresh ``ModelBundle`` (model + tree engine) while
+   the current bundle keeps serving.
+2. Probe it: one predict_proba call (initialises the booster's predictor) and
+   a tree-engine parity check — the engine is dropped if they disagree.
+3. Run the registered warmers (SHAP explainer, backtest stats, thresholds…),
+   storing each result in ``bundle.derived``.
+4. ``model_trainer.activate_bundle`` swaps it in with one reference
+   assignment. pd/shap caches are keyed by content hash and self-invalidate.
+5. The previous bundle is kept in memory for an instant rollback, and the
+   ACTIVE pointer is rewritten so restarts and sibling workers
+   (``sync_with_pointer``) converge on the same version.
+
+Nothing else in the process is touched — USER_STATE, the scheduler, executors
+and open connections all carry on.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+import numpy as np
+
+from .data_prep import FEATURE_NAMES
+from .model_trainer import (
+    ACTIVE_POINTER,
+    DEFAULT_VERSION,
+    LEGACY_MODEL_PATH,
+    MODEL_PATH,
+    VERSIONS_DIR,
+    ModelBundle,
+    activate_bundle,
+    get_active_bundle,
+    load_version,
+    model_fingerprint,
+    read_active_pointer,
+    read_metadata,
+    read_thresholds,
+    save_pretrained,
+    thresholds_path,
+    version_paths,
+)
+
+if TYPE_CHECKING:
+    from xgboost import XGBClassifier
+
+# Previous bundles kept in memory for instant rollback
+_HISTORY_SIZE = int(os.environ.get("QUANT_MODEL_HISTORY", "2"))
+
+# Max |engine - predict_proba| on the probe rows before the engine is disabled
+_ENGINE_PARITY_TOL = 1e-5
+
+# Metadata keys surfaced by list_versions()
+_LISTED_METADATA = ("timestamp", "training_rows", "n_estimators", "max_depth", "artifact_sha256")
+
+
+class ModelRegistry:
+    """
+    List, register, activate and roll back model versions for this process.
+
+    Parameters
+    ----------
+    versions_dir : where registered versions live (default models/versions)
+    history_size : previous bundles kept in memory for ``rollback``
+    """
+
+    def __init__(self, versions_dir: Path = VERSIONS_DIR, history_size: int = _HISTORY_SIZE):
+        self.versions_dir = versions_dir
+        self.pointer_path = versions_dir / ACTIVE_POINTER.name
+        self._warmers: dict[str, Callable[[ModelBundle], Any]] = {}
+        self._history: deque[ModelBundle] = deque(maxlen=history_size)
+        # Serialises activate / rollback; serving never takes this lock
+        self._lock = threading.Lock()
+        self._last_activation: dict = {}
+        self._unloadable_pointer: str | None = None
+
+    # ── Warmers ──────────────────────────────────────────────────────────────
+
+    def register_warmer(self, name: str, fn: Callable[[ModelBundle], Any]) -> None:
+        """
+        Precompute ``fn(bundle)`` into ``bundle.derived[name]`` before activation.
+
+        Warmers run in registration order, so later ones may read earlier
+        results from ``bundle.derived``.
+        """
+        self._warmers[name] = fn
+
+    def derive(self, name: str, bundle: ModelBundle | None = None) -> Any:
+        """Return ``bundle.derived[name]``, computing it with its warmer on first use."""
+        bundle = bundle if bundle is not None else get_active_bundle()
+        if name not in bundle.derived:
+            bundle.derived[name] = self._warmers[name](bundle)
+        return bundle.derived[name]
+
+    def warm(self, bundle: ModelBundle) -> dict[str, float]:
+        """Run every warmer on ``bundle``; returns per-warmer seconds (failures are skipped)."""
+        timings: dict[str, float] = {}
+        for name, fn in self._warmers.items():
+            if name in bundle.derived:
+                continue
+            start = time.perf_counter()
+            try:
+                bundle.derived[name] = fn(bundle)
+            except Exception as exc:  # noqa: BLE001 — a cache that fails to warm is rebuilt lazily
+                print(f"Warmer {name!r} failed for {bundle.label}: {exc}")
+                continue
+            timings[name] = round(time.perf_counter() - start, 4)
+        return timings
+
+    # ── Versions ─────────────────────────────────────────────────────────────
+
+    def list_versions(self) -> list[dict]:
+        """All loadable versions, oldest registered first, ``default`` first of all."""
+        active = get_active_bundle().label
+        names = []
+        if MODEL_PATH.exists() or LEGACY_MODEL_PATH.exists():
+            names.append(DEFAULT_VERSION)
+        if self.versions_dir.exists():
+            names += sorted(
+                d.name for d in self.versions_dir.iterdir()
+                if d.is_dir() and (d / MODEL_PATH.name).exists()
+            )
+
+        versions = []
+        for name in names:
+            metadata = read_metadata(version_paths(name, self.versions_dir)[1])
+            versions.append({
+                "version": name,
+                "active": name == active,
+                **{k: metadata[k] for k in _LISTED_METADATA if k in metadata},
+            })
+        return versions
+
+    def register(self, model: XGBClassifier, metadata: dict | None = None,
+                 version: str | None = None) -> str:
+        """
+        Save ``model`` as a new version (not activated) and return its name.
+
+        The default name is ``<UTC timestamp>-<content hash>`` so versions sort
+        chronologically.
+        """
+        if version is None:
+            version = f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{model_fingerprint(model)[:8]}"
+        self.check_new_version(version)
+        model_path, metadata_path = version_paths(version, self.versions_dir)
+        save_pretrained(model, metadata, model_path=model_path, metadata_path=metadata_path)
+        return version
+
+    def check_new_version(self, version: str) -> None:
+        """
+        Raise ValueError unless ``register`` could save ``version``.
+
+        Training scripts call this before fitting so a reserved or taken name
+        fails fast instead of after the run.
+        """
+        if version == DEFAULT_VERSION:
+            raise ValueError(f"{DEFAULT_VERSION!r} is reserved for the root artifact")
+        if version_paths(version, self.versions_dir)[0].exists():
+            raise ValueError(f"Version {version} already exists")
+
+    # ── Activation ───────────────────────────────────────────────────────────
+
+    def load(self, version: str) -> tuple[ModelBundle, dict[str, float]]:
+        """Load, probe and warm ``version`` without activating it."""
+        start = time.perf_counter()
+        bundle = ModelBundle(
+            load_version(version, self.versions_dir), label=version,
+            thresholds=read_thresholds(thresholds_path(version, self.versions_dir)),
+        )
+        load_s = time.perf_counter() - start
+        self._probe(bundle)
+        timings = {"load": round(load_s, 4), **self.warm(bundle)}
+        return bundle, timings
+
+    def activate(self, version: str, persist: bool = True) -> dict:
+        """
+        Load and warm ``version`` in the calling thread, then swap it in.
+
+        Raises FileNotFoundError for an unknown version and ValueError if the
+        artifact does not match FEATURE_NAMES; the serving model is unchanged
+        in either case.
+        """
+        with self._lock:
+            current = get_active_bundle()
+            if version == current.label:
+                return self._record(current, {}, swapped=False)
+            bundle, timings = self.load(version)
+            return self._swap(bundle, timings, persist)
+
+    def rollback(self) -> dict:
+        """
+        Reactivate the previously served bundle (already warm — no reload).
+
+        Raises LookupError when there is nothing to roll back to.
+        """
+        with self._lock:
+            if not self._history:
+                raise LookupError("No previous model version to roll back to")
+            bundle = self._history.pop()
+            previous = activate_bundle(bundle)
+            self._write_pointer(bundle.label)
+            result = self._record(bundle, {}, swapped=True)
+            result["rolled_back_from"] = previous.label if previous else None
+            return result
+
+    def sync_with_pointer(self) -> bool:
+        """
+        Activate the version named by the ACTIVE pointer if this process is
+        serving something else. Used by workers to follow an activation
+        made through a sibling process. Returns True if it swapped.
+        """
+        pointer = read_active_pointer(self.pointer_path)
+        if pointer in (None, self._unloadable_pointer) or pointer == get_active_bundle().label:
+            return False
+        try:
+            return self.activate(pointer, persist=False)["swapped"]
+        except (FileNotFoundError, ValueError):
+            self._unloadable_pointer = pointer  # don't retry a bad pointer every poll
+            raise
+
+    def status(self) -> dict:
+        active = get_active_bundle()
+        return {
+            "active": active.summary(),
+            "history": [b.label for b in reversed(self._history)],
+            "last_activation": self._last_activation,
+        }
+
+    # ── Internals ────────────────────────────────────────────────────────────
+
+    def _swap(self, bundle: ModelBundle, timings: dict, persist: bool) -> dict:
+        previous = activate_bundle(bundle)
+        if previous is not None:
+            self._history.append(previous)
+        if persist:
+            self._write_pointer(bundle.label)
+        result = self._record(bundle, timings, swapped=True)
+        result["previous"] = previous.label if previous else None
+        return result
+
+    def _record(self, bundle: ModelBundle, timings: dict, swapped: bool) -> dict:
+        result = {"swapped": swapped, **bundle.summary(), "timings_s": timings}
+        if swapped:
+            self._last_activation = {"at": time.time(), **result}
+        return result
+
+    def _write_pointer(self, version: str) -> None:
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.pointer_path.with_suffix(".tmp")
+        tmp.write_text(version)
+        os.replace(tmp, self.pointer_path)  # atomic — readers never see a partial name
+
+    @staticmethod
+    def _probe(bundle: ModelBundle) -> None:
+        """One real prediction, plus engine/predict_proba parity on the probe rows."""
+        rng = np.random.default_rng(0)
+        probe = rng.uniform(0.0, 1.0, size=(8, len(FEATURE_NAMES))) * [
+            100_000, 10_000, 3_000, 1.0, 1.0, 3.0,
+        ]
+        expected = bundle.model.predict_proba(probe)[:, 1]
+        if bundle.engine is not None:
+            drift = float(np.max(np.abs(bundle.engine.predict_proba(probe) - expected)))
+            if drift > _ENGINE_PARITY_TOL:
+                print(f"Tree engine disagrees with predict_proba for {bundle.label} "
+                      f"(max |Δ| {drift:.2e}); disabling it")
+                bundle.engine = None
+
+
+registry = ModelRegistry()
@@ -0,0 +1,241 @@
+"""
+out_of_core.py — Train on data larger than RAM through an XGBoost ``DataIter``.
+
+``load_data()`` + ``train_test_split`` hold the whole table twice. Here the
+training set is never materialised. XGBoost pulls it one chunk at a time
+through a ``DataIter``, from either source:
+
+    CSVChunks    the raw CSV via ``data_prep.iter_chunks``. The same renaming,
+                 abs(DAYS_EMPLOYED) and median imputation run per chunk, with
+                 medians from one ``streaming_medians`` pass (or the model
+                 metadata).
+    CacheChunks  the memory-mapped dataset cache (models/dataset/), which is
+                 already cleaned; chunks are sliced from the mapping.
+
+Train / valid split
+-------------------
+A row goes to the validation set if a hash of its global row number falls
+below ``valid_fraction``. Membership does not depend on the chunk size, so
+both iterators (and the label pass that sets ``scale_pos_weight``) agree on
+the split without storing it.
+
+DMatrix modes
+-------------
+``"external"`` — external-memory DMatrix: XGBoost writes quantised pages
+to ``cache_dir`` and streams them each boosting round, so RAM holds only a
+page at a time. ``"quantile"`` — QuantileDMatrix built from the same
+iterator: the quantised matrix stays in RAM (about 1 byte per feature per
+row). It is much faster when that fits, and raw rows are still never held.
+
+Training matches ``training.fit_candidate``: hist, early stopping on
+validation AUC, and the booster trimmed to its best iteration.
+
+Imports xgboost at module level (DataIter is subclassed here); only training
+code imports this module.
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+import xgboost as xgb
+
+from .data_prep import (
+    DATA_PATH,
+    DATASET_CACHE_DIR,
+    DEFAULT_CHUNKSIZE,
+    FEATURE_NAMES,
+    iter_chunks,
+    load_dataset_cache,
+    streaming_medians,
+)
+from .training import DEFAULT_PARAMS
+
+DMATRIX_MODES = ("external", "quantile")
+
+# sklearn-wrapper parameter names → native xgb.train names
+_NATIVE_NAMES = {"random_state": "seed", "n_jobs": "nthread"}
+
+
+class CSVChunks:
+    """Cleaned (X, y) chunks of the raw CSV; re-iterable."""
+
+    def __init__(
+        self,
+        path: Path = DATA_PATH,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        medians: dict[str, float] | None = None,
+    ):
+        self.path = path
+        self.chunksize = chunksize
+        self.medians = medians if medians is not None else streaming_medians(path, chunksize)
+
+    def __iter__(self) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        for chunk in iter_chunks(self.path, self.chunksize, self.medians):
+            yield chunk[FEATURE_NAMES].to_numpy(dtype=np.float32), chunk["TARGET"].to_numpy(dtype=np.int8)
+
+    def labels(self) -> Iterator[np.ndarray]:
+        """TARGET only, in the same chunks — parses one column."""
+        import pandas as pd
+
+        for chunk in pd.read_csv(self.path, usecols=["TARGET"], dtype="int8", chunksize=self.chunksize):
+            yield chunk["TARGET"].to_numpy()
+
+
+class CacheChunks:
+    """(X, y) chunks sliced from the memory-mapped dataset cache; re-iterable."""
+
+    def __init__(self, cache_dir: Path = DATASET_CACHE_DIR, chunksize: int = DEFAULT_CHUNKSIZE):
+        self.table = load_dataset_cache(cache_dir)
+        if self.table is None:
+            raise FileNotFoundError(f"No dataset cache in {cache_dir} (run load_data() once to build it)")
+        self.chunksize = chunksize
+
+    def __iter__(self) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        for start in range(0, len(self.table), self.chunksize):
+            chunk = self.table.iloc[start:start + self.chunksize]
+            yield chunk[FEATURE_NAMES].to_numpy(dtype=np.float32), chunk["TARGET"].to_numpy(dtype=np.int8)
+
+    def labels(self) -> Iterator[np.ndarray]:
+        targets = self.table["TARGET"].to_numpy()
+        for start in range(0, len(targets), self.chunksize):
+            yield targets[start:start + self.chunksize]
+
+
+def valid_mask(row_ids: np.ndarray, valid_fraction: float, seed: int = 42) -> np.ndarray:
+    """True for rows in the validation split (multiplicative hash of the row number)."""
+    h = (row_ids.astype(np.uint64) + np.uint64(seed)) * np.uint64(0x9E3779B97F4A7C15)
+    return (h >> np.uint64(40)) % np.uint64(1 << 20) < np.uint64(int(valid_fraction * (1 << 20)))
+
+
+class ChunkIter(xgb.DataIter):
+    """Feeds one split of a chunk source to XGBoost, a chunk per ``next`` call."""
+
+    def __init__(self, source, split: str, valid_fraction: float, seed: int, cache_prefix: str | None = None):
+        self.source = source
+        self.keep_valid = split == "valid"
+        self.valid_fraction = valid_fraction
+        self.seed = seed
+        self._chunks: Iterator | None = None
+        self._offset = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data: Callable) -> int:
+        if self._chunks is None:
+            self._chunks = iter(self.source)
+        for X, y in self._chunks:
+            ids = np.arange(self._offset, self._offset + len(y))
+            self._offset += len(y)
+            mask = valid_mask(ids, self.valid_fraction, self.seed) == self.keep_valid
+            if mask.any():
+                input_data(data=X[mask], label=y[mask])
+                return 1
+        return 0
+
+    def reset(self) -> None:
+        self._chunks = None
+        self._offset = 0
+
+
+def _split_label_counts(source, valid_fraction: float, seed: int) -> tuple[int, int]:
+    """(negatives, positives) in the training split, from one label-only pass."""
+    neg = pos = offset = 0
+    for y in source.labels():
+        train = ~valid_mask(np.arange(offset, offset + len(y)), valid_fraction, seed)
+        offset += len(y)
+        n_pos = int(y[train].sum())
+        pos += n_pos
+        neg += int(train.sum()) - n_pos
+    return neg, pos
+
+
+def _native_params(params: dict, n_jobs: int) -> tuple[dict, int, int]:
+    config = {**DEFAULT_PARAMS, **params, "n_jobs": n_jobs}
+    rounds = config.pop("n_estimators")
+    patience = config.pop("early_stopping_rounds")
+    native = {_NATIVE_NAMES.get(k, k): v for k, v in config.items()}
+    native["objective"] = "binary:logistic"
+    return native, rounds, patience
+
+
+def train_out_of_core(
+    source: CSVChunks | CacheChunks,
+    params: dict | None = None,
+    valid_fraction: float = 0.2,
+    seed: int = 42,
+    dmatrix: str = "external",
+    cache_dir: Path | None = None,
+    n_jobs: int = -1,
+) -> tuple[xgb.XGBClassifier, dict]:
+    """
+    Train an early-stopped classifier from ``source`` without loading it whole.
+
+    ``params`` override ``training.DEFAULT_PARAMS`` (sklearn names);
+    ``cache_dir`` holds external-memory pages (a temporary directory, removed
+    afterwards, by default).
+
+    Returns (XGBClassifier, evaluation) with evaluation
+    ``{"params", "dmatrix", "train_rows", "valid_rows", "n_trees", "auc",
+    "gini", "fit_s", "elapsed_s"}``.
+
+    Raises ValueError for an unknown ``dmatrix`` or ``valid_fraction`` outside (0, 1).
+    """
+    if dmatrix not in DMATRIX_MODES:
+        raise ValueError(f"Unknown dmatrix mode {dmatrix!r}; expected one of {DMATRIX_MODES}")
+    if not 0.0 < valid_fraction < 1.0:
+        raise ValueError(f"valid_fraction must be in (0, 1), got {valid_fraction}")
+
+    start = time.perf_counter()
+    native, rounds, patience = _native_params(params or {}, n_jobs)
+    if "scale_pos_weight" not in native:
+        neg, pos = _split_label_counts(source, valid_fraction, seed)
+        native["scale_pos_weight"] = neg / max(pos, 1)
+
+    workdir = Path(cache_dir) if cache_dir is not None else Path(tempfile.mkdtemp(prefix="xgb-ext-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    try:
+        external = dmatrix == "external"
+        train_it = ChunkIter(source, "train", valid_fraction, seed,
+                             str(workdir / "train") if external else None)
+        valid_it = ChunkIter(source, "valid", valid_fraction, seed,
+                             str(workdir / "valid") if external else None)
+        if external:
+            dtrain = xgb.DMatrix(train_it, nthread=n_jobs)
+            dvalid = xgb.DMatrix(valid_it, nthread=n_jobs)
+        else:
+            dtrain = xgb.QuantileDMatrix(train_it, nthread=n_jobs)
+            dvalid = xgb.QuantileDMatrix(valid_it, ref=dtrain, nthread=n_jobs)
+
+        fit_start = time.perf_counter()
+        booster = xgb.train(
+            native, dtrain, num_boost_round=rounds, evals=[(dvalid, "valid")],
+            early_stopping_rounds=patience, verbose_eval=False,
+        )
+        fit_s = time.perf_counter() - fit_start
+        n_trees = booster.best_iteration + 1
+        auc = float(booster.best_score)
+        raw = booster[:n_trees].save_raw(raw_format="ubj")
+        train_rows, valid_rows = dtrain.num_row(), dvalid.num_row()
+        del dtrain, dvalid
+    finally:
+        if cache_dir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    model = xgb.XGBClassifier(n_jobs=n_jobs)
+    model.load_model(bytearray(raw))
+    return model, {
+        "params": {**DEFAULT_PARAMS, **(params or {})},
+        "dmatrix": dmatrix,
+        "train_rows": train_rows,
+        "valid_rows": valid_rows,
+        "n_trees": n_trees,
+        "auc": round(auc, 5),
+        "gini": round(2 * auc - 1, 5),
+        "fit_s": round(fit_s, 3),
+        "elapsed_s": round(time.perf_counter() - start, 3),
+    }
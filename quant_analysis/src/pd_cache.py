@@ -0,0 +1,117 @@
+"""
+pd_cache.py — Bounded LRU/TTL memoization of per-borrower model outputs.
+
+The web dashboard and the match-trade Edge Function keep re-scoring the same
+borrowers with the same six feature values. Results are cached under
+
+    (model_version, quantized feature tuple)
+
+so a repeat score or SHAP explanation never reaches the model. Quantization
+absorbs float noise (e.g. 42000.000001 vs 42000.0) well below the precision
+the features are produced at. The quantized tuple is only the key: callers
+score the row as given, so a miss returns exactly what ``get_pd_batch`` does,
+and a hit returns the result of the first row seen in that grid cell.
+
+When a lookup arrives with a different model version than the cache holds,
+every entry is dropped — a model change invalidates the whole cache.
+
+Configuration (env vars):
+    QUANT_PD_CACHE_SIZE      max PD entries          (default 100000)
+    QUANT_SHAP_CACHE_SIZE    max explanation entries (default 10000)
+    QUANT_CACHE_TTL_S        entry lifetime, seconds (default 3600; 0 = no expiry)
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+# Decimal places kept per feature (FEATURE_NAMES order): £ to the penny,
+# days to 0.1, health scores to 4 dp (as _compute_features rounds them),
+# region/failed-payment bucket to 0.1.
+_QUANT_DECIMALS = (2, 2, 1, 4, 4, 1)
+
+
+def quantize_features(features) -> tuple[float, ...]:
+    """Round a 6-feature row to the cache key grid."""
+    return tuple(round(float(v), d) for v, d in zip(features, _QUANT_DECIMALS))
+
+
+class ResultCache:
+    """Thread-safe LRU cache with TTL expiry and model-version invalidation."""
+
+    def __init__(self, maxsize: int, ttl_s: float):
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self._data: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._version: str | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _sync_version(self, version: str) -> None:
+        if version != self._version:
+            if self._data:
+                self.invalidations += 1
+            self._data.clear()
+            self._version = version
+
+    def get(self, version: str, key: tuple) -> Any | None:
+        """Return the cached value for ``key`` under ``version``, or None."""
+        if self.maxsize <= 0:
+            return None
+        with self._lock:
+            self._sync_version(version)
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if self.ttl_s > 0 and time.monotonic() > expires_at:
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, version: str, key: tuple, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._sync_version(version)
+            self._data[key] = (time.monotonic() + self.ttl_s, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._version = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl_s,
+                "model_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_TTL_S = float(os.environ.get("QUANT_CACHE_TTL_S", "3600"))
+
+pd_cache = ResultCache(int(os.environ.get("QUANT_PD_CACHE_SIZE", "100000")), _TTL_S)
+shap_cache = ResultCache(int(os.environ.get("QUANT_SHAP_CACHE_SIZE", "10000")), _TTL_S)
@@ -13,10 +13,19 @@ Factor = PDO / ln(2)
 Offset = θ - Factor × ln(Ω)
 Score  = Offset + Factor × ln(Odds)
        where Odds = (1 - PD) / PD
+
+``pd_to_score_array`` / ``get_risk_grade_array`` are the NumPy equivalents for
+scoring and grading whole arrays of PDs (backtest, calibration, batch scoring).
+
+Grade cut-offs are runtime state: each model version may store calibrated
+thresholds (see calibration.py), applied with ``set_grade_thresholds`` when
+that version is activated. Until then the defaults below are used.
 """
 
 import math
 
+import numpy as np
+
 # Scorecard anchor constants
 _TARGET_SCORE = 600.0
 _TARGET_ODDS = 50.0
@@ -28,6 +37,15 @@ _OFFSET = _TARGET_SCORE - _FACTOR * math.log(_TARGET_ODDS)
 _SCORE_MIN = 300.0
 _SCORE_MAX = 850.0
 
+# Default grade cut-offs (see get_risk_grade for calibration notes)
+DEFAULT_GRADE_A_MIN = 521.0
+DEFAULT_GRADE_B_MIN = 495.0
+
+# (A min, B min) in force — replaced as one tuple so readers never see a mix
+_thresholds = (DEFAULT_GRADE_A_MIN, DEFAULT_GRADE_B_MIN)
+
+GRADE_LABELS = np.array(["C", "B", "A"])
+
 
 def pd_to_score(pd_value: float) -> float:
     """
@@ -43,24 +61,102 @@ def pd_to_score(pd_value: float) -> float:
     return float(max(_SCORE_MIN, min(_SCORE_MAX, raw_score)))
 
 
+def grade_thresholds() -> dict[str, float]:
+    """Minimum score for grades A and B, as used by ``get_risk_grade``."""
+    a_min, b_min = _thresholds
+    return {"A": a_min, "B": b_min}
+
+
+def set_grade_thresholds(thresholds: dict | None) -> None:
+    """
+    Replace the cut-offs used by every grading function.
+
+    ``thresholds`` needs "A" and "B" keys (extra keys are ignored); None
+    restores the defaults. Raises ValueError unless B <= A.
+    """
+    global _thresholds
+    if thresholds is None:
+        _thresholds = (DEFAULT_GRADE_A_MIN, DEFAULT_GRADE_B_MIN)
+        return
+    a_min, b_min = float(thresholds["A"]), float(thresholds["B"])
+    if not b_min <= a_min:
+        raise ValueError(f"Grade B cut-off ({b_min}) must not exceed grade A cut-off ({a_min})")
+    _thresholds = (a_min, b_min)
+
+
 def get_risk_grade(score: float) -> str:
     """Return risk grade A (best), B (mid), or C (worst) for a credit score.
 
     Thresholds are calibrated against the actual score distribution produced by
-    the XGBoost model on the Home Credit sample (run scripts/calibrate_thresholds.py
-    to recompute after any model or data change).
+    the XGBoost model on the Home Credit data (``python scripts/calibrate_thresholds.py
+    --write`` recomputes and stores them for the serving model version; they
+    take effect without a code change).
 
     The model uses scale_pos_weight to up-weight defaulters, so predicted PDs are
     higher than the raw 8% base rate — scores cluster in the 460–540 range rather
     than the full 300–850 scale. Thresholds are set at the 80th / 45th percentile
     of the training sample to give an intentional 20% / 35% / 45% A / B / C split.
 
+    Defaults, used until a version has stored thresholds:
+
       A >= 521  — low risk   (~top 20%, observed default rate ~2.3%)
       B >= 495  — medium risk (~mid 35%, observed default rate ~5.3%)
       C <  495  — high risk  (~bottom 45%, observed default rate ~12.4%)
     """
-    if score >= 521:
+    a_min, b_min = _thresholds
+    if score >= a_min:
         return "A"
-    if score >= 495:
+    if score >= b_min:
         return "B"
     return "C"
+
+
+def pd_to_score_array(pd_values: np.ndarray | list[float]) -> np.ndarray:
+    """
+    Vectorised ``pd_to_score``: clipped log-odds transform over an array of PDs.
+
+    Non-finite PDs score as in the scalar path: NaN and +inf → 300, -inf → 850.
+    """
+    p = np.clip(np.nan_to_num(np.asarray(pd_values, dtype=float), nan=1.0), 1e-6, 1 - 1e-6)
+    raw_scores = _OFFSET + _FACTOR * np.log((1.0 - p) / p)
+    return np.clip(raw_scores, _SCORE_MIN, _SCORE_MAX)
+
+
+def grade_indices(
+    scores: np.ndarray | list[float],
+    thresholds: dict[str, float] | None = None,
+) -> np.ndarray:
+    """
+    Grade of each score as an index into ``GRADE_LABELS`` (0 = C, 1 = B, 2 = A).
+
+    ``thresholds`` ({"A", "B"}) overrides the cut-offs in force — used to grade
+    for a model version that is not (yet) the active one. A NaN score is grade
+    C, as in ``get_risk_grade`` (``searchsorted`` alone would sort it into A).
+    """
+    a_min, b_min = _thresholds if thresholds is None else (thresholds["A"], thresholds["B"])
+    bins = np.array([b_min, a_min])
+    scores = np.asarray(scores, dtype=float)
+    return np.searchsorted(bins, np.where(np.isnan(scores), -np.inf, scores), side="right")
+
+
+def get_risk_grade_array(scores: np.ndarray | list[float]) -> np.ndarray:
+    """Vectorised ``get_risk_grade``: returns an array of "A" / "B" / "C"."""
+    return GRADE_LABELS[grade_indices(scores)]
+
+
+def recommend_thresholds(
+    scores: np.ndarray | list[float],
+    a_share: float = 0.20,
+    c_share: float = 0.45,
+) -> dict[str, float]:
+    """
+    Grade cut-offs that put ``a_share`` of ``scores`` in A and ``c_share`` in C.
+
+    The defaults reproduce the 20% / 35% / 45% split behind DEFAULT_GRADE_A_MIN
+    and DEFAULT_GRADE_B_MIN (80th / 45th percentiles).
+    """
+    scores = np.asarray(scores, dtype=float)
+    return {
+        "A": float(np.percentile(scores, 100 * (1 - a_share))),
+        "B": float(np.percentile(scores, 100 * c_share)),
+    }
@@ -0,0 +1,178 @@
+"""
+sketches.py — Mergeable streaming summaries: quantile sketch and co-moments.
+
+Both summaries take rows in batches, in any order. Two summaries built on
+different chunks or processes merge into the summary of the union, and
+memory stays bounded however many rows are seen.
+
+KLLSketch
+    Karnin–Lang–Liberty quantile sketch. Level h holds items of weight 2^h;
+    a full level is sorted and every other item (random offset) is promoted
+    to the next level. Capacity shrinks geometrically (factor 2/3) below the
+    top level, so the sketch holds O(k) items. Rank error is roughly
+    1.7 / k of n. While fewer than k items have been seen the sketch is exact.
+
+StreamingMoments
+    Count, mean vector and co-moment matrix Σ(x - μ)(x - μ)ᵀ. A batch is
+    summarised exactly with NumPy, then combined with the pairwise update of
+    Chan et al. (Welford's update, generalised to batches and matrices). This
+    avoids the cancellation of the naïve Σx² formula. Variance, std and the
+    Pearson correlation matrix are derived on demand.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+DEFAULT_K = 400
+
+
+class KLLSketch:
+    """Mergeable approximate quantiles of a stream of floats (NaNs are ignored)."""
+
+    def __init__(self, k: int = DEFAULT_K, seed: int | None = 0):
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._levels: list[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def exact(self) -> bool:
+        """True while no compaction has happened (quantiles are exact)."""
+        return len(self._levels) == 1
+
+    def update(self, values) -> KLLSketch:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.n += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: KLLSketch) -> KLLSketch:
+        """Fold ``other`` into this sketch (``other`` is left unchanged)."""
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for h, items in enumerate(other._levels):
+            self._levels[h] = np.concatenate([self._levels[h], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile; linear interpolation (as pandas) while exact."""
+        if self.n == 0:
+            return math.nan
+        if self.exact:
+            return float(np.quantile(self._levels[0], q))
+        items, cum = self._weighted()
+        target = q * cum[-1]
+        idx = min(int(np.searchsorted(cum, target, side="left")), len(items) - 1)
+        return float(np.clip(items[idx], self.min, self.max))
+
+    def quantiles(self, qs) -> np.ndarray:
+        return np.array([self.quantile(q) for q in qs])
+
+    def rank(self, x: float) -> float:
+        """Approximate fraction of the stream ≤ ``x``."""
+        if self.n == 0:
+            return math.nan
+        items, cum = self._weighted()
+        idx = int(np.searchsorted(items, x, side="right"))
+        return float(cum[idx - 1] / cum[-1]) if idx else 0.0
+
+    def num_retained(self) -> int:
+        return sum(len(items) for items in self._levels)
+
+    # ── Internals ────────────────────────────────────────────────────────────
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self._levels):
+            items = self._levels[h]
+            if len(items) <= self._capacity(h):
+                h += 1
+                continue
+            if h + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item out stays at this level so no weight is lost
+            keep, items = (items[:1], items[1:]) if len(items) % 2 else (items[:0], items)
+            promoted = items[int(self._rng.integers(2))::2]
+            self._levels[h] = keep
+            self._levels[h + 1] = np.concatenate([self._levels[h + 1], promoted])
+            # A new top level shrinks every capacity below it — recheck from the bottom
+            h = 0
+
+    def _weighted(self) -> tuple[np.ndarray, np.ndarray]:
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([
+            np.full(len(level), 2.0 ** h) for h, level in enumerate(self._levels)
+        ])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+
+class StreamingMoments:
+    """Mergeable count, mean and co-moment matrix of ``n_features``-wide rows."""
+
+    def __init__(self, n_features: int):
+        self.n = 0
+        self.mean = np.zeros(n_features)
+        self.comoment = np.zeros((n_features, n_features))
+
+    def update(self, rows) -> StreamingMoments:
+        """Add a (n_rows, n_features) batch; rows must be complete (no NaN)."""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(self.mean))
+        if len(rows) == 0:
+            return self
+        batch_mean = rows.mean(axis=0)
+        centered = rows - batch_mean
+        self._combine(len(rows), batch_mean, centered.T @ centered)
+        return self
+
+    def merge(self, other: StreamingMoments) -> StreamingMoments:
+        self._combine(other.n, other.mean, other.comoment)
+        return self
+
+    def variance(self, ddof: int = 1) -> np.ndarray:
+        if self.n <= ddof:
+            return np.full(len(self.mean), math.nan)
+        return np.diag(self.comoment) / (self.n - ddof)
+
+    def std(self, ddof: int = 1) -> np.ndarray:
+        return np.sqrt(self.variance(ddof))
+
+    def correlation(self) -> np.ndarray:
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = self.comoment / np.outer(scale, scale)
+        return np.clip(corr, -1.0, 1.0)
+
+    def _combine(self, n_b: int, mean_b: np.ndarray, comoment_b: np.ndarray) -> None:
+        if n_b == 0:
+            return
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.comoment = self.comoment + comoment_b + np.outer(delta, delta) * (self.n * n_b / n)
+        self.mean = self.mean + delta * (n_b / n)
+        self.n = n
@@ -20,7 +20,6 @@ from datetime import date, timedelta
 from typing import Optional
 
 import numpy as np
-from scipy import stats
 
 
 # ── Data contracts ─────────────────────────────────────────────────────────────
@@ -141,6 +140,8 @@ def _fit_gamma(values: np.ndarray) -> tuple[float, float, float] | None:
     clean = values[values <= m + _OUTLIER_SIGMA * s]
     if len(clean) < 2:
         clean = values
+    from scipy import stats  # deferred: scipy.stats dominates API import time
+
     try:
         k, loc, theta = stats.gamma.fit(clean, floc=0)
         if k <= 0 or theta <= 0:
@@ -154,6 +155,8 @@ def _gamma_stats(
     params: tuple[float, float, float],
 ) -> tuple[float, float, float]:
     """Return (mean, p10, p90) from fitted Gamma parameters."""
+    from scipy import stats
+
     dist = stats.gamma(*params)
     return float(dist.mean()), float(dist.ppf(0.10)), float(dist.ppf(0.90))
 
@@ -0,0 +1,289 @@
+"""
+training.py — Model training with early stopping and a parallel parameter search.
+
+Every fit uses XGBoost's ``hist`` tree method and stops early on AUC over the
+held-out split, so ``n_estimators`` is only an upper bound. The booster is cut
+back to its best iteration before it is evaluated or returned. That way the
+saved artifact, the NumPy tree engine and the reported latency all describe
+the model that would actually be served.
+
+Search
+------
+``search`` fits one candidate per point of a parameter grid on a spawned
+process pool. Each job runs ``threads_per_job`` XGBoost threads; ``workers``
+jobs run at once, so workers × threads should not exceed the cores. The
+train/valid arrays reach each worker once, through the pool initializer, not
+once per candidate. Every candidate reports:
+
+    fit_s            wall time of the early-stopped fit
+    auc / gini       on the held-out split (gini = 2·AUC − 1)
+    n_trees          trees kept (best iteration + 1)
+    latency          serving cost, in microseconds:
+                       engine_row_us     p50 TreeEngine, one row (the /api/score path)
+                       predict_row_us    p50 predict_proba, one row
+                       batch_row_us      predict_proba per row on a 10k-row batch
+    pareto           True if no other candidate is at least as accurate and
+                     as fast to serve (single-row latency), and better on one
+
+``select_candidate`` picks the most accurate candidate within a latency budget.
+
+These fits hold the split in memory; out_of_core.py trains the same way from
+chunks when the data does not fit.
+
+sklearn and xgboost are imported on first use.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .data_prep import FEATURE_NAMES
+from .tree_engine import compile_booster
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from xgboost import XGBClassifier
+
+# XGBoost threads per search job, and jobs run concurrently
+_SEARCH_THREADS = int(os.environ.get("QUANT_SEARCH_THREADS", "2"))
+_SEARCH_WORKERS = int(os.environ.get(
+    "QUANT_SEARCH_WORKERS", str(max(1, (os.cpu_count() or 1) // _SEARCH_THREADS)),
+))
+
+DEFAULT_PARAMS = {
+    "tree_method": "hist",
+    "n_estimators": 1_000,        # upper bound — early stopping picks the count
+    "early_stopping_rounds": 30,
+    "max_depth": 4,
+    "learning_rate": 0.05,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+    "eval_metric": "auc",
+    "random_state": 42,
+}
+
+DEFAULT_GRID = {
+    "max_depth": [3, 4, 6],
+    "learning_rate": [0.05, 0.1],
+    "min_child_weight": [1, 20],
+}
+
+_LATENCY_CALLS = 200
+_LATENCY_BATCH_ROWS = 10_000
+
+
+def param_grid(grid: dict[str, list]) -> list[dict]:
+    """Every combination of ``grid`` values, in a stable order."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def split_dataset(
+    df: pd.DataFrame,
+    test_size: float = 0.2,
+    seed: int = 42,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(X_train, X_valid, y_train, y_valid) as float32 / int8 arrays, stratified on TARGET."""
+    from sklearn.model_selection import train_test_split
+
+    X = df[FEATURE_NAMES].to_numpy(dtype=np.float32)
+    y = df["TARGET"].to_numpy(dtype=np.int8)
+    return train_test_split(X, y, test_size=test_size, random_state=seed, stratify=y)
+
+
+def fit_candidate(
+    params: dict,
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_valid: np.ndarray,
+    y_valid: np.ndarray,
+    n_jobs: int = _SEARCH_THREADS,
+) -> tuple[XGBClassifier, float]:
+    """
+    Fit ``DEFAULT_PARAMS`` updated with ``params``, early-stopped on the valid split.
+
+    Returns the model cut back to its best iteration and the fit wall time.
+    """
+    from xgboost import XGBClassifier
+
+    config = {**DEFAULT_PARAMS, **params}
+    config.setdefault("scale_pos_weight", float((y_train == 0).sum() / max((y_train == 1).sum(), 1)))
+    model = XGBClassifier(**config, n_jobs=n_jobs)
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train, eval_set=[(X_valid, y_valid)], verbose=False)
+    fit_s = time.perf_counter() - start
+
+    n_trees = model.best_iteration + 1
+    if n_trees < model.get_booster().num_boosted_rounds():
+        # Drop the trees fitted after the best iteration (the patience window)
+        best = XGBClassifier(n_jobs=n_jobs)
+        best.load_model(bytearray(model.get_booster()[:n_trees].save_raw(raw_format="ubj")))
+        model = best
+    return model, fit_s
+
+
+def _p50_us(fn, rows: np.ndarray) -> float:
+    timings = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        t0 = time.perf_counter_ns()
+        fn(row)
+        timings[i] = (time.perf_counter_ns() - t0) / 1_000
+    return round(float(np.median(timings)), 1)
+
+
+def inference_latency(model: XGBClassifier, X: np.ndarray) -> dict[str, float | None]:
+    """Per-row serving latency of ``model`` on rows of ``X`` (see module docstring)."""
+    rows = X[:_LATENCY_CALLS].reshape(-1, 1, X.shape[1])
+    try:
+        engine = compile_booster(model.get_booster(), X.shape[1])
+        engine_row_us = _p50_us(engine.predict_proba, rows)
+    except ValueError:
+        engine_row_us = None
+    batch = np.resize(X, (_LATENCY_BATCH_ROWS, X.shape[1]))
+    best = min(_timed(model.predict_proba, batch) for _ in range(3))
+    return {
+        "engine_row_us": engine_row_us,
+        "predict_row_us": _p50_us(model.predict_proba, rows),
+        "batch_row_us": round(best * 1e6 / len(batch), 3),
+    }
+
+
+def _timed(fn, arg) -> float:
+    start = time.perf_counter()
+    fn(arg)
+    return time.perf_counter() - start
+
+
+def evaluate_candidate(model: XGBClassifier, X_valid: np.ndarray, y_valid: np.ndarray) -> dict:
+    """Held-out AUC / Gini, tree count and serving latency of a fitted model."""
+    from sklearn.metrics import roc_auc_score
+
+    auc = float(roc_auc_score(y_valid, model.predict_proba(X_valid)[:, 1]))
+    return {
+        "auc": round(auc, 5),
+        "gini": round(2 * auc - 1, 5),
+        "n_trees": model.get_booster().num_boosted_rounds(),
+        "latency": inference_latency(model, X_valid),
+    }
+
+
+# Per-process train/valid split for search(workers > 1)
+_search_data: tuple | None = None
+
+
+def _init_search_worker(X_train, y_train, X_valid, y_valid) -> None:
+    global _search_data
+    _search_data = (X_train, y_train, X_valid, y_valid)
+
+
+def _run_candidate(params: dict, n_jobs: int, data: tuple | None = None) -> dict:
+    X_train, y_train, X_valid, y_valid = data if data is not None else _search_data
+    model, fit_s = fit_candidate(params, X_train, y_train, X_valid, y_valid, n_jobs)
+    return {
+        "params": params,
+        "fit_s": round(fit_s, 3),
+        **evaluate_candidate(model, X_valid, y_valid),
+        "raw_model": bytes(model.get_booster().save_raw(raw_format="ubj")),
+    }
+
+
+def _row_us(candidate: dict) -> float:
+    """Single-row serving latency: the tree engine's, else predict_proba's."""
+    latency = candidate["latency"]
+    return latency["engine_row_us"] if latency["engine_row_us"] is not None else latency["predict_row_us"]
+
+
+def _mark_pareto(candidates: list[dict]) -> None:
+    for c in candidates:
+        c["pareto"] = not any(
+            o is not c and o["auc"] >= c["auc"] and _row_us(o) <= _row_us(c)
+            and (o["auc"] > c["auc"] or _row_us(o) < _row_us(c))
+            for o in candidates
+        )
+
+
+def search(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_valid: np.ndarray,
+    y_valid: np.ndarray,
+    grid: dict[str, list] = DEFAULT_GRID,
+    workers: int = _SEARCH_WORKERS,
+    threads_per_job: int = _SEARCH_THREADS,
+) -> dict:
+    """
+    Fit and evaluate every grid point; candidates are returned best AUC first.
+
+    Returns
+    -------
+    {
+        "candidates": [{"params", "fit_s", "auc", "gini", "n_trees", "latency",
+                        "pareto", "raw_model"}, ...],
+        "workers": int, "threads_per_job": int, "wall_s": float,
+    }
+
+    ``raw_model`` is the candidate's UBJSON booster; ``load_candidate`` turns
+    it back into a model.
+    """
+    candidates = param_grid(grid)
+    start = time.perf_counter()
+    data = (X_train, y_train, X_valid, y_valid)
+
+    if workers <= 1 or len(candidates) == 1:
+        results = [_run_candidate(p, threads_per_job, data) for p in candidates]
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(candidates)),
+            mp_context=multiprocessing.get_context("spawn"),  # never fork a live OpenMP runtime
+            initializer=_init_search_worker,
+            initargs=data,
+        ) as pool:
+            results = list(pool.map(_run_candidate, candidates, [threads_per_job] * len(candidates)))
+
+    _mark_pareto(results)
+    results.sort(key=lambda c: c["auc"], reverse=True)
+    return {
+        "candidates": results,
+        "workers": workers,
+        "threads_per_job": threads_per_job,
+        "wall_s": round(time.perf_counter() - start, 3),
+    }
+
+
+def select_candidate(candidates: list[dict], max_latency_us: float | None = None) -> dict:
+    """
+    Most accurate candidate whose single-row engine latency (predict_proba if
+    the engine is unavailable) is within ``max_latency_us``.
+
+    Raises ValueError if none qualifies.
+    """
+    eligible = [c for c in candidates if max_latency_us is None or _row_us(c) <= max_latency_us]
+    if not eligible:
+        raise ValueError(f"No candidate scores a row within {max_latency_us} µs")
+    return max(eligible, key=lambda c: c["auc"])
+
+
+def load_candidate(candidate: dict, n_jobs: int = -1) -> XGBClassifier:
+    """Rebuild the model of a ``search`` candidate."""
+    from xgboost import XGBClassifier
+
+    model = XGBClassifier(n_jobs=n_jobs)
+    model.load_model(bytearray(candidate["raw_model"]))
+    return model
+
+
+def train_model(df: pd.DataFrame, params: dict | None = None, n_jobs: int = -1) -> tuple[XGBClassifier, dict]:
+    """Fit one early-stopped model on ``df``; returns it with its evaluation."""
+    X_train, X_valid, y_train, y_valid = split_dataset(df)
+    model, fit_s = fit_candidate(params or {}, X_train, y_train, X_valid, y_valid, n_jobs)
+    return model, {"params": {**DEFAULT_PARAMS, **(params or {})}, "fit_s": round(fit_s, 3),
+                   **evaluate_candidate(model, X_valid, y_valid)}
@@ -0,0 +1,197 @@
+"""
+tree_engine.py — Pure-NumPy evaluator for the XGBoost booster.
+
+``predict_proba`` on a single row builds a DMatrix and crosses the sklearn
+wrapper, which costs far more than walking 200 depth-4 trees. This module
+flattens the booster's JSON dump into contiguous node arrays once, then scores
+a row (or a small batch) with a handful of vectorised gathers:
+
+1. Evaluate every split condition for the row in one shot  → go_right[node]
+2. Walk all trees in lock-step, one level per iteration    → leaf per tree
+3. Sum leaf values + base margin, apply the logistic link  → PD
+
+Leaves point to themselves, so the walk is branch-free and runs exactly
+``max_depth`` iterations regardless of where each tree terminates.
+
+Split semantics match XGBoost: inputs are cast to float32, a row goes left
+when ``x < split_condition`` and follows ``default_left`` when x is NaN.
+"""
+
+import json
+import math
+
+import numpy as np
+
+# Rows per block when evaluating a batch — bounds the (rows × nodes) bool matrix
+_BLOCK_ROWS = 1_024
+
+
+class TreeEngine:
+    """Flattened gradient-boosted tree ensemble for binary:logistic boosters."""
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        default_right: np.ndarray,
+        leaf_value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        base_margin: float,
+        n_features: int,
+    ):
+        self.feature = feature              # (n_nodes,) int32 — split feature index
+        self.threshold = threshold          # (n_nodes,) float32 — split condition
+        self.children = children            # (2 * n_nodes,) int32 — [left, right] pairs
+        self.default_right = default_right  # (n_nodes,) bool — NaN direction
+        self.leaf_value = leaf_value        # (n_nodes,) float64 — 0 for internal nodes
+        self.roots = roots                  # (n_trees,) int32 — root node index per tree
+        self.max_depth = max_depth
+        self.base_margin = base_margin
+        self.n_features = n_features
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def predict_margin(self, X: list[float] | list[list[float]] | np.ndarray) -> np.ndarray:
+        """Return raw margins (log-odds) of shape (n_rows,)."""
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.n_features)
+        if len(X) <= _BLOCK_ROWS:
+            return self._margin_block(X)
+        return np.concatenate([
+            self._margin_block(X[i:i + _BLOCK_ROWS])
+            for i in range(0, len(X), _BLOCK_ROWS)
+        ])
+
+    def predict_proba(self, X: list[float] | list[list[float]] | np.ndarray) -> np.ndarray:
+        """Return PD (class-1 probability) of shape (n_rows,)."""
+        return 1.0 / (1.0 + np.exp(-self.predict_margin(X)))
+
+    def _margin_block(self, X: np.ndarray) -> np.ndarray:
+        xf = X[:, self.feature]                      # (rows, n_nodes)
+        go_right = xf >= self.threshold
+        nan_mask = np.isnan(xf)
+        if nan_mask.any():
+            go_right = np.where(nan_mask, self.default_right, go_right)
+
+        n_rows = len(X)
+        if n_rows == 1:
+            go_right = go_right[0]
+            node = self.roots
+            for _ in range(self.max_depth):
+                node = self.children[2 * node + go_right[node]]
+            margins = np.array([self.leaf_value[node].sum()])
+        else:
+            rows = np.arange(n_rows)[:, None]
+            node = np.broadcast_to(self.roots, (n_rows, self.n_trees))
+            for _ in range(self.max_depth):
+                node = self.children[2 * node + go_right[rows, node]]
+            margins = self.leaf_value[node].sum(axis=1)
+
+        return margins + self.base_margin
+
+
+def _parse_base_score(raw: str) -> float:
+    """``learner_model_param.base_score`` is "5E-1" in 2.x and "[5E-1]" in 3.x."""
+    return float(raw.strip("[]").split(",")[0])
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    """
+    Depth of one tree, walking breadth-first from the root (node 0).
+
+    The JSON dump does not promise that a parent's id is lower than its
+    children's, so depth is not derived from the ``parents`` array. Raises
+    ValueError unless every node is reached exactly once.
+    """
+    n_nodes = len(left)
+    seen = np.zeros(n_nodes, dtype=bool)
+    level = np.zeros(1, dtype=np.int64)
+    depth = -1
+    while len(level):
+        if ((level < 0) | (level >= n_nodes)).any() or len(np.unique(level)) < len(level) or seen[level].any():
+            raise ValueError("Malformed tree in booster dump")
+        seen[level] = True
+        depth += 1
+        inner = level[left[level] != -1]
+        level = np.concatenate([left[inner], right[inner]])
+    if not seen.all():
+        raise ValueError("Malformed tree in booster dump")
+    return depth
+
+
+def compile_booster(booster, n_features: int) -> TreeEngine:
+    """
+    Flatten an ``xgboost.Booster`` into a ``TreeEngine``.
+
+    Only ``gbtree`` boosters with the ``binary:logistic`` objective and
+    numerical splits are supported — anything else raises ``ValueError``
+    so callers can fall back to ``predict_proba``.
+    """
+    learner = json.loads(booster.save_raw(raw_format="json"))["learner"]
+
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise ValueError(f"Unsupported objective for tree engine: {objective}")
+    gbm = learner["gradient_booster"]
+    if gbm["name"] != "gbtree":
+        raise ValueError(f"Unsupported booster for tree engine: {gbm['name']}")
+
+    trees = gbm["model"]["trees"]
+    # predict_proba stops at best_iteration when early stopping was used
+    best_iteration = booster.attr("best_iteration")
+    if best_iteration is not None:
+        trees = trees[: int(best_iteration) + 1]
+
+    feature_parts, threshold_parts, children_parts = [], [], []
+    default_right_parts, leaf_parts, roots = [], [], []
+    offset = 0
+    max_depth = 0
+
+    for tree in trees:
+        if any(int(t) != 0 for t in tree.get("split_type", [])):
+            raise ValueError("Categorical splits are not supported by the tree engine")
+
+        left = np.asarray(tree["left_children"], dtype=np.int64)
+        right = np.asarray(tree["right_children"], dtype=np.int64)
+        cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+        n_nodes = len(left)
+        local = np.arange(n_nodes)
+        is_leaf = left == -1
+        max_depth = max(max_depth, _tree_depth(left, right))
+
+        # Leaves loop back onto themselves so extra walk iterations are no-ops
+        left = np.where(is_leaf, local, left) + offset
+        right = np.where(is_leaf, local, right) + offset
+        children_parts.append(np.stack([left, right], axis=1).ravel())
+
+        feature_parts.append(np.where(is_leaf, 0, tree["split_indices"]))
+        threshold_parts.append(np.where(is_leaf, np.float32(0.0), cond))
+        default_right_parts.append(
+            ~np.asarray(tree["default_left"], dtype=bool) & ~is_leaf
+        )
+        leaf_parts.append(np.where(is_leaf, cond.astype(np.float64), 0.0))
+        roots.append(offset)
+
+        offset += n_nodes
+
+    base_score = _parse_base_score(learner["learner_model_param"]["base_score"])
+    base_margin = math.log(base_score / (1.0 - base_score))
+
+    return TreeEngine(
+        feature=np.concatenate(feature_parts).astype(np.int32),
+        threshold=np.concatenate(threshold_parts).astype(np.float32),
+        children=np.concatenate(children_parts).astype(np.int32),
+        default_right=np.concatenate(default_right_parts),
+        leaf_value=np.concatenate(leaf_parts),
+        roots=np.asarray(roots, dtype=np.int32),
+        max_depth=max_depth,
+        base_margin=base_margin,
+        n_features=n_features,
+    )